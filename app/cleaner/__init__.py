@@ -0,0 +1,11 @@
+from app.cleaner.cache import CleanerCache
+from app.cleaner.service import CleanerService
+from utils.app.manager import listener_service
+from utils.redisdb import RedisDB
+
+
+@listener_service()
+def create_cleaner_service(redis: RedisDB):
+    _cache = CleanerCache(redis)
+    _service = CleanerService(_cache)
+    return _service
@@ -0,0 +1,33 @@
+from typing import Iterable, List, Tuple
+
+from utils.redisdb import RedisDB
+
+
+class CleanerCache:
+    """等待删除的消息 成员为 chat_id|message_id 分数为删除时间"""
+
+    def __init__(self, redis: RedisDB):
+        self.client = redis.client
+        self.qname = "cleaner:due"
+
+    async def add_many(self, messages: Iterable[Tuple[int, int, float]]):
+        """:param messages: (chat_id, message_id, 删除时间戳)"""
+        mapping = {f"{chat_id}|{message_id}": timestamp for chat_id, message_id, timestamp in messages}
+        if mapping:
+            await self.client.zadd(self.qname, mapping)
+
+    async def pop_due(self, now: float, limit: int) -> List[Tuple[int, int]]:
+        """取出已经到期的消息 ZREM 成功的才属于本次调用 多个进程同时取出时不会重复删除"""
+        members = await self.client.zrangebyscore(self.qname, "-inf", now, start=0, num=limit)
+        if not members:
+            return []
+        async with self.client.pipeline(transaction=False) as pipe:
+            for member in members:
+                pipe.zrem(self.qname, member)
+            removed = await pipe.execute()
+        result = []
+        for member, count in zip(members, removed):
+            if count:
+                chat_id, message_id = member.decode().split("|")
+                result.append((int(chat_id), int(message_id)))
+        return result
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from app.cleaner.cache import CleanerCache
+from logger import Log
+
+
+async def delete_message(bot: Bot, chat_id: int, message_id: int) -> bool:
+    """删除失败时返回 False 只有 RetryAfter 和 Forbidden 会抛出 由调用者决定如何处理同一个会话中的其他消息"""
+    try:
+        await bot.delete_message(chat_id=chat_id, message_id=message_id)
+        return True
+    except BadRequest as error:
+        if "not found" in str(error):
+            Log.warning(f"定时删除消息 chat_id[{chat_id}] message_id[{message_id}]失败 消息不存在")
+        elif "Message can't be deleted" in str(error):
+            Log.warning(f"定时删除消息 chat_id[{chat_id}] message_id[{message_id}]失败 消息无法删除 可能是没有授权")
+        else:
+            Log.warning(f"定时删除消息 chat_id[{chat_id}] message_id[{message_id}]失败 \n", error)
+    except (RetryAfter, Forbidden) as error:
+        raise error
+    except TelegramError as error:
+        Log.warning(f"定时删除消息 chat_id[{chat_id}] message_id[{message_id}]失败 \n", error)
+    return False
+
+
+class CleanerService:
+    """定时删除消息 所有消息保存在 Redis 有序集合中 由一个定时任务统一删除 重启后不会丢失
+
+    添加消息时先放在本地 下一次事件循环时一次写入 Redis 同一个命令添加的多条消息只需要一次请求
+    """
+
+    def __init__(self, cache: CleanerCache, batch_size: int = 500, concurrency: int = 8):
+        """
+        :param batch_size: 每次最多删除的消息数 剩下的留到下一次
+        :param concurrency: 同时删除消息的会话数 同一个会话中的消息按顺序删除
+        """
+        self._cache = cache
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._pending: List[Tuple[int, int, float]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def add(self, chat_id: int, message_id: int, delete_seconds: int = 60):
+        self._pending.append((chat_id, message_id, time.time() + delete_seconds))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self):
+        # 写入期间添加的消息不会再启动新的任务 由这里继续写入
+        while self._pending:
+            pending, self._pending = self._pending, []
+            try:
+                await self._cache.add_many(pending)
+            except Exception as exc:
+                Log.error(f"保存 {len(pending)} 条定时删除消息失败", exc)
+
+    async def sweep(self, bot: Bot) -> int:
+        """删除所有已经到期的消息
+
+        :return: 本次取出的消息数
+        """
+        messages = await self._cache.pop_due(time.time(), self.batch_size)
+        if not messages:
+            return 0
+        chats: Dict[int, List[int]] = {}
+        for chat_id, message_id in messages:
+            chats.setdefault(chat_id, []).append(message_id)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def clean_chat(chat_id: int, message_ids: List[int]):
+            message_ids = sorted(message_ids)
+            async with semaphore:
+                for index, message_id in enumerate(message_ids):
+                    try:
+                        await delete_message(bot, chat_id, message_id)
+                    except RetryAfter as exc:
+                        # 已经从有序集合中取出 放回去等限制结束后再删除
+                        retry_at = time.time() + exc.retry_after
+                        await self._cache.add_many((chat_id, _message_id, retry_at)
+                                                   for _message_id in message_ids[index:])
+                        Log.warning(f"定时删除消息 chat_id[{chat_id}] 被限流 {exc.retry_after} 秒后重试")
+                        return
+                    except Forbidden as exc:
+                        # BOT 已经不在会话中 剩下的消息也无法删除
+                        Log.warning(f"定时删除消息 chat_id[{chat_id}] 失败 BOT没有权限", exc)
+                        return
+
+        await asyncio.gather(*(clean_chat(chat_id, message_ids) for chat_id, message_ids in chats.items()))
+        return len(messages)
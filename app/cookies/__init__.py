@@ -1,11 +1,14 @@
+from app.cookies.cache import CookiesCache
 from app.cookies.repositories import CookiesRepository
 from app.cookies.service import CookiesService
 from utils.app.manager import listener_service
 from utils.mysql import MySQL
+from utils.redisdb import RedisDB
 
 
 @listener_service()
-def create_cookie_service(mysql: MySQL):
+def create_cookie_service(mysql: MySQL, redis: RedisDB):
     _repository = CookiesRepository(mysql)
-    _service = CookiesService(_repository)
+    _cache = CookiesCache(redis)
+    _service = CookiesService(_repository, _cache)
     return _service
@@ -0,0 +1,29 @@
+from typing import Optional
+
+import ujson
+
+from model.base import RegionEnum
+from utils.redisdb import RedisDB
+
+
+class CookiesCache:
+    def __init__(self, redis: RedisDB, ttl: int = 3600):
+        self.client = redis.client
+        self.qname = "cookie"
+        self.ttl = ttl
+
+    def _get_qname(self, user_id: int, region: RegionEnum) -> str:
+        return f"{self.qname}:{region.name.lower()}:{user_id}"
+
+    async def get_cookies(self, user_id: int, region: RegionEnum) -> Optional[dict]:
+        """:return: 没有缓存时返回 None 没有绑定时返回空字典"""
+        data = await self.client.get(self._get_qname(user_id, region))
+        if data is None:
+            return None
+        return ujson.loads(data)
+
+    async def set_cookies(self, user_id: int, region: RegionEnum, cookies: dict):
+        await self.client.set(self._get_qname(user_id, region), ujson.dumps(cookies), ex=self.ttl)
+
+    async def del_cookies(self, user_id: int, region: RegionEnum):
+        await self.client.delete(self._get_qname(user_id, region))
@@ -1,6 +1,6 @@
 import ujson
 
-from model.base import ServiceEnum
+from model.base import RegionEnum
 from utils.error import NotFoundError
 from utils.mysql import MySQL
 
@@ -9,14 +9,14 @@ class CookiesRepository:
     def __init__(self, mysql: MySQL):
         self.mysql = mysql
 
-    async def update_cookie(self, user_id: int, cookies: str, default_service: ServiceEnum):
-        if default_service == ServiceEnum.HYPERION:
+    async def update_cookie(self, user_id: int, cookies: str, default_service: RegionEnum):
+        if default_service == RegionEnum.HYPERION:
             query = """
             UPDATE `mihoyo_cookie`
             SET cookie=%s
             WHERE user_id=%s;
             """
-        elif default_service == ServiceEnum.HOYOLAB:
+        elif default_service == RegionEnum.HOYOLAB:
             query = """
             UPDATE `hoyoverse_cookie`
             SET cookie=%s
@@ -27,8 +27,8 @@ class CookiesRepository:
         query_args = (cookies, user_id)
         await self.mysql.execute_and_fetchall(query, query_args)
 
-    async def set_cookie(self, user_id: int, cookies: str, default_service: ServiceEnum):
-        if default_service == ServiceEnum.HYPERION:
+    async def set_cookie(self, user_id: int, cookies: str, default_service: RegionEnum):
+        if default_service == RegionEnum.HYPERION:
             query = """
             INSERT INTO  `mihoyo_cookie`
             (user_id,cookie)
@@ -37,7 +37,7 @@ class CookiesRepository:
             ON DUPLICATE KEY UPDATE
             cookie=VALUES(cookie);
             """
-        elif default_service == ServiceEnum.HOYOLAB:
+        elif default_service == RegionEnum.HOYOLAB:
             query = """
             INSERT INTO `hoyoverse_cookie`
             (user_id,cookie)
@@ -51,14 +51,14 @@ class CookiesRepository:
         query_args = (user_id, cookies)
         await self.mysql.execute_and_fetchall(query, query_args)
 
-    async def read_cookies(self, user_id, default_service: ServiceEnum) -> dict:
-        if default_service == ServiceEnum.HYPERION:
+    async def read_cookies(self, user_id, default_service: RegionEnum) -> dict:
+        if default_service == RegionEnum.HYPERION:
             query = """
             SELECT cookie
             FROM `mihoyo_cookie`
             WHERE user_id=%s;
             """
-        elif default_service == ServiceEnum.HOYOLAB:
+        elif default_service == RegionEnum.HOYOLAB:
             query = """
             SELECT cookie
             FROM `hoyoverse_cookie`
@@ -70,10 +70,10 @@ class CookiesRepository:
         data = await self.mysql.execute_and_fetchall(query, query_args)
         if len(data) == 0:
             return {}
-        (cookies,) = data
+        (cookies,) = data[0]
         return ujson.loads(cookies)
 
 
 class DefaultServiceNotFoundError(NotFoundError):
-    entity_name: str = "ServiceEnum"
+    entity_name: str = "RegionEnum"
     entity_value_name: str = "default_service"
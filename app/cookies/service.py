@@ -1,16 +1,35 @@
+from app.cookies.cache import CookiesCache
 from app.cookies.repositories import CookiesRepository
-from model.base import ServiceEnum
+from model.base import RegionEnum
+from utils.lru import LRUCache
 
 
 class CookiesService:
-    def __init__(self, user_repository: CookiesRepository) -> None:
+    def __init__(self, user_repository: CookiesRepository, cache: CookiesCache) -> None:
         self._repository: CookiesRepository = user_repository
+        self._cache = cache
+        self._local: LRUCache[dict] = LRUCache(maxsize=4096, ttl=30)
 
-    async def update_cookie(self, user_id: int, cookies: str, default_service: ServiceEnum):
+    async def _del_cache(self, user_id: int, default_service: RegionEnum):
+        self._local.delete((user_id, default_service))
+        await self._cache.del_cookies(user_id, default_service)
+
+    async def update_cookie(self, user_id: int, cookies: str, default_service: RegionEnum):
         await self._repository.update_cookie(user_id, cookies, default_service)
+        await self._del_cache(user_id, default_service)
 
-    async def set_cookie(self, user_id: int, cookies: str, default_service: ServiceEnum):
+    async def set_cookie(self, user_id: int, cookies: str, default_service: RegionEnum):
         await self._repository.set_cookie(user_id, cookies, default_service)
+        await self._del_cache(user_id, default_service)
 
-    async def read_cookies(self, user_id: int, default_service: ServiceEnum):
-        return await self._repository.read_cookies(user_id, default_service)
+    async def read_cookies(self, user_id: int, default_service: RegionEnum) -> dict:
+        """依次从进程内缓存 Redis 数据库读取 没有绑定时返回空字典"""
+        key = (user_id, default_service)
+        cookies = self._local.get(key)
+        if cookies is None:
+            cookies = await self._cache.get_cookies(user_id, default_service)
+            if cookies is None:
+                cookies = await self._repository.read_cookies(user_id, default_service)
+                await self._cache.set_cookies(user_id, default_service, cookies)
+            self._local.set(key, cookies)
+        return cookies
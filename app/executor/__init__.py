@@ -0,0 +1,9 @@
+from app.executor.service import ExecutorService
+from utils.aioexecutor import AioExecutor
+from utils.app.manager import listener_service
+
+
+@listener_service()
+def create_executor_service(executor: AioExecutor):
+    _service = ExecutorService(executor)
+    return _service
@@ -0,0 +1,21 @@
+from model.types import Func
+from utils.aioexecutor import AioExecutor
+
+
+class ExecutorService:
+    def __init__(self, executor: AioExecutor):
+        self._executor = executor
+
+    async def run(self, func: Func, *args, **kwargs):
+        """在进程池中执行CPU密集任务（图片处理等） 避免阻塞事件循环
+        :param func: 模块级别的函数 函数和参数必须可以被 pickle
+        :return: func 的返回值
+        """
+        return await self._executor.run(func, *args, **kwargs)
+
+    async def run_in_thread(self, func: Func, *args, **kwargs):
+        """在线程池中执行会阻塞的任务
+        :param func: 要执行的函数
+        :return: func 的返回值
+        """
+        return await self._executor.run_in_thread(func, *args, **kwargs)
@@ -0,0 +1,11 @@
+from app.flood.cache import FloodCache
+from app.flood.service import FloodService, FloodStatus
+from utils.app.manager import listener_service
+from utils.redisdb import RedisDB
+
+
+@listener_service()
+def create_flood_service(redis: RedisDB):
+    _cache = FloodCache(redis)
+    _service = FloodService(_cache)
+    return _service
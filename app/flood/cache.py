@@ -0,0 +1,111 @@
+import asyncio
+import time
+from typing import Optional, Tuple
+
+from redis.exceptions import RedisError, ResponseError
+
+from logger import Log
+from utils.lru import LRUCache
+from utils.redisdb import RedisDB
+
+# GCRA 每次命令把该命令的理论到达时间 (tat) 推后 interval 超过 burst 个 interval 时拒绝
+# 每个命令分别计算间隔 被拒绝的次数和封禁按用户计算 所有命令共用
+# 被拒绝的次数达到 max_strikes 后封禁 ban 毫秒 允许的命令会抵消一次被拒绝的次数
+# KEYS[1] 用户 KEYS[2] 用户的命令  ARGV[1] interval ARGV[2] burst ARGV[3] max_strikes ARGV[4] ban (毫秒)
+# 返回 0 允许 1 拒绝 2 封禁中 3 本次触发封禁
+_GCRA_SCRIPT = """
+redis.replicate_commands()
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_strikes = tonumber(ARGV[3])
+local ban = tonumber(ARGV[4])
+local now_time = redis.call('TIME')
+local now = tonumber(now_time[1]) * 1000 + math.floor(tonumber(now_time[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'strikes', 'banned')
+if (tonumber(state[2]) or 0) > now then
+    return 2
+end
+local tat = math.max(tonumber(redis.call('GET', KEYS[2])) or now, now)
+local strikes = tonumber(state[1]) or 0
+if tat + interval - now > burst * interval then
+    strikes = strikes + 1
+    if strikes >= max_strikes then
+        redis.call('HSET', KEYS[1], 'strikes', 0, 'banned', now + ban)
+        redis.call('PEXPIRE', KEYS[1], ban)
+        return 3
+    end
+    redis.call('HSET', KEYS[1], 'strikes', strikes, 'banned', 0)
+    redis.call('PEXPIRE', KEYS[1], ban)
+    return 1
+end
+tat = tat + interval
+redis.call('SET', KEYS[2], tat, 'PX', math.max(tat - now, 1))
+if strikes > 0 then
+    redis.call('HSET', KEYS[1], 'strikes', strikes - 1, 'banned', 0)
+    redis.call('PEXPIRE', KEYS[1], ban)
+end
+return 0
+"""
+
+
+class FloodCache:
+    """命令频率限制的状态保存在 Redis 中 多个进程共享 通过脚本原子更新
+
+    flood:{user_id} Hash strikes 被拒绝的次数 banned 封禁结束时间 (毫秒时间戳)
+    flood:{user_id}:{command} 该命令的理论到达时间 (毫秒时间戳)
+    没有 Redis 或 Redis 不支持脚本 (例如 fakeredis) 时在进程内计算 访问 Redis 失败时该次在进程内计算
+    """
+
+    def __init__(self, redis: Optional[RedisDB] = None, local_maxsize: int = 65536):
+        self.qname = "flood"
+        self.client = None if redis is None else redis.client
+        self._script = None if redis is None else self.client.register_script(_GCRA_SCRIPT)
+        # user_id -> (strikes, banned)
+        self._local: LRUCache[Tuple[int, float]] = LRUCache(maxsize=local_maxsize)
+        # (user_id, command) -> tat
+        self._local_tat: LRUCache[float] = LRUCache(maxsize=local_maxsize)
+
+    def _local_check(self, user_id: int, command: str, interval: float, burst: int, max_strikes: int,
+                     ban: float) -> int:
+        now = time.monotonic() * 1000
+        strikes, banned = self._local.get(user_id) or (0, 0)
+        if banned > now:
+            return 2
+        tat = max(self._local_tat.get((user_id, command)) or now, now)
+        if tat + interval - now > burst * interval:
+            strikes += 1
+            if strikes >= max_strikes:
+                self._local.set(user_id, (0, now + ban), ttl=ban / 1000)
+                return 3
+            self._local.set(user_id, (strikes, 0), ttl=ban / 1000)
+            return 1
+        tat += interval
+        self._local_tat.set((user_id, command), tat, ttl=(tat - now) / 1000)
+        if strikes > 0:
+            self._local.set(user_id, (strikes - 1, 0), ttl=ban / 1000)
+        return 0
+
+    async def check(self, user_id: int, command: str, interval: float, burst: int, max_strikes: int,
+                    ban: float) -> int:
+        """
+        :param command: 命令名称 每个命令分别计算间隔
+        :param interval: 两次命令之间的间隔 毫秒
+        :param burst: 允许连续使用的次数
+        :param max_strikes: 被拒绝多少次后封禁
+        :param ban: 封禁的时间 毫秒
+        :return: 0 允许 1 拒绝 2 封禁中 3 本次触发封禁
+        """
+        if self._script is not None:
+            try:
+                return int(await self._script(keys=[f"{self.qname}:{user_id}",
+                                                    f"{self.qname}:{user_id}:{command}"],
+                                              args=[int(interval), burst, max_strikes, int(ban)]))
+            except ResponseError as exc:
+                if "unknown command" not in str(exc):
+                    raise exc
+                Log.warning("Redis 不支持脚本 洪水防御只在当前进程内生效")
+                self._script = None
+            except (RedisError, asyncio.TimeoutError) as exc:
+                # Redis 不可用时本次在进程内计算 不能让所有命令都失败
+                Log.warning("洪水防御访问 Redis 失败 本次只在当前进程内限制", exc)
+        return self._local_check(user_id, command, interval, burst, max_strikes, ban)
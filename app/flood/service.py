@@ -0,0 +1,32 @@
+from enum import IntEnum
+
+from app.flood.cache import FloodCache
+
+
+class FloodStatus(IntEnum):
+    ALLOWED = 0  # 允许
+    REJECTED = 1  # 使用太频繁
+    BANNED = 2  # 封禁中
+    JUST_BANNED = 3  # 本次触发封禁 需要提醒用户
+
+
+class FloodService:
+    """洪水防御 每个命令按用户分别限制频率 被拒绝的次数和封禁按用户计算"""
+
+    def __init__(self, cache: FloodCache, max_strikes: int = 5, ban_seconds: int = 5 * 60):
+        """
+        :param max_strikes: 使用太频繁多少次后封禁
+        :param ban_seconds: 封禁的秒数
+        """
+        self._cache = cache
+        self.max_strikes = max_strikes
+        self.ban_seconds = ban_seconds
+
+    async def check(self, user_id: int, command: str, interval: float, burst: int = 1) -> FloodStatus:
+        """
+        :param command: 命令名称
+        :param interval: 该命令两次使用之间的秒数
+        :param burst: 允许连续使用的次数
+        """
+        return FloodStatus(await self._cache.check(user_id, command, interval * 1000, burst, self.max_strikes,
+                                                   self.ban_seconds * 1000))
@@ -0,0 +1,12 @@
+from app.gacha.cache import GachaCache
+from app.gacha.service import GachaService
+from utils.aioexecutor import AioExecutor
+from utils.app.manager import listener_service
+from utils.redisdb import RedisDB
+
+
+@listener_service()
+def create_gacha_service(redis: RedisDB, executor: AioExecutor):
+    _cache = GachaCache(redis)
+    _service = GachaService(_cache, executor)
+    return _service
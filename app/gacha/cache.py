@@ -0,0 +1,77 @@
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import ujson
+
+from model.gacha.common import PlayerGachaBannerInfo
+from utils.redisdb import RedisDB
+
+# pity5 pity4 failedFeaturedItemPulls5 failedFeaturedItemPulls4 pityPool5 pityPool4 failedChosenItemPulls
+_PITY_STRUCT = struct.Struct("<9I")
+
+
+def pack_banner_info(banner_info: PlayerGachaBannerInfo) -> bytes:
+    """定长的计数后面跟着定轨物品的名称"""
+    data = _PITY_STRUCT.pack(banner_info.pity5, banner_info.pity4, banner_info.failedFeaturedItemPulls5,
+                             banner_info.failedFeaturedItemPulls4, *banner_info.pityPool5, *banner_info.pityPool4,
+                             banner_info.failedChosenItemPulls)
+    if banner_info.wishItemId is not None:
+        data += str(banner_info.wishItemId).encode("utf-8")
+    return data
+
+
+def unpack_banner_info(data: bytes) -> PlayerGachaBannerInfo:
+    banner_info = PlayerGachaBannerInfo()
+    values = _PITY_STRUCT.unpack_from(data)
+    banner_info.pity5, banner_info.pity4 = values[0], values[1]
+    banner_info.failedFeaturedItemPulls5, banner_info.failedFeaturedItemPulls4 = values[2], values[3]
+    banner_info.pityPool5, banner_info.pityPool4 = list(values[4:6]), list(values[6:8])
+    banner_info.failedChosenItemPulls = values[8]
+    if len(data) > _PITY_STRUCT.size:
+        banner_info.wishItemId = data[_PITY_STRUCT.size:].decode("utf-8")
+    return banner_info
+
+
+class GachaCache:
+    """卡池列表会随版本变化 只缓存较短的时间 卡池详情按 gacha_id 区分 内容不会再变化"""
+
+    def __init__(self, redis: RedisDB, list_ttl: int = 600, info_ttl: int = 86400, pity_ttl: int = 86400 * 30):
+        self.client = redis.client
+        self.qname = "gacha"
+        self.list_ttl = list_ttl
+        self.info_ttl = info_ttl
+        self.pity_ttl = pity_ttl
+
+    async def get_list(self) -> Optional[List[dict]]:
+        data = await self.client.get(f"{self.qname}:list")
+        if data is None:
+            return None
+        return ujson.loads(data)
+
+    async def set_list(self, gacha_list: List[dict]):
+        await self.client.set(f"{self.qname}:list", ujson.dumps(gacha_list), ex=self.list_ttl)
+
+    async def get_info(self, gacha_id: str) -> Optional[dict]:
+        data = await self.client.get(f"{self.qname}:info:{gacha_id}")
+        if data is None:
+            return None
+        return ujson.loads(data)
+
+    async def set_info(self, gacha_id: str, gacha_info: dict):
+        await self.client.set(f"{self.qname}:info:{gacha_id}", ujson.dumps(gacha_info), ex=self.info_ttl)
+
+    async def get_pity(self, user_id: int, banner_key: str) -> Optional[PlayerGachaBannerInfo]:
+        """保底计数按用户保存在 Hash 中 字段为卡池类型"""
+        data = await self.client.hget(f"{self.qname}:pity:{user_id}", banner_key)
+        if data is None:
+            return None
+        return unpack_banner_info(data)
+
+    async def set_pity_many(self, pity: Dict[Tuple[int, str], PlayerGachaBannerInfo]):
+        """一次写入多个用户的保底计数"""
+        async with self.client.pipeline(transaction=False) as pipe:
+            for (user_id, banner_key), banner_info in pity.items():
+                qname = f"{self.qname}:pity:{user_id}"
+                pipe.hset(qname, banner_key, pack_banner_info(banner_info))
+                pipe.expire(qname, self.pity_ttl)
+            await pipe.execute()
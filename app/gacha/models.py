@@ -0,0 +1,20 @@
+from typing import Dict, Optional
+
+from model.gacha.banner import GachaBanner, create_banner_from_gacha_info, get_item_types
+
+
+class GachaBannerData:
+    def __init__(self, gacha_id: str, gacha_name: str, gacha_info: dict):
+        """卡池数据 卡池和物品类型在创建时建立 抽卡时不需要再访问网络
+
+        :param gacha_id: 卡池ID
+        :param gacha_name: 卡池名称 如 角色活动
+        :param gacha_info: 官方卡池详情
+        """
+        self.gacha_id = gacha_id
+        self.gacha_name = gacha_name
+        self.title: str = gacha_info.get("title", "")
+        self.banner: GachaBanner = create_banner_from_gacha_info(gacha_info)
+        self.item_types: Dict[str, str] = get_item_types(gacha_info)
+        # 物品图片的图集清单 生成失败时为 None
+        self.atlas: Optional[dict] = None
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.gacha.cache import GachaCache
+from app.gacha.models import GachaBannerData
+from logger import Log
+from model.apihelper.gacha import GachaInfo
+from model.gacha.atlas import build_atlas
+from model.gacha.banner import GACHA_TYPE_BANNER, GachaBanner
+from model.gacha.common import PlayerGachaBannerInfo
+from utils.aioexecutor import AioExecutor
+
+
+class GachaService:
+    """卡池数据保存在内存中 过期后先返回旧数据 同时在后台刷新"""
+
+    # 不指定卡池时使用的卡池
+    DEFAULT_GACHA_NAME = "角色活动"
+
+    def __init__(self, cache: GachaCache, executor: AioExecutor, ttl: int = 1800):
+        self._cache = cache
+        self._executor = executor
+        self.resources_dir = os.path.join(os.getcwd(), "resources", "genshin", "gacha")
+        self.atlas_dir = os.path.join(os.getcwd(), "cache", "gacha_atlas")
+        self._gacha = GachaInfo()
+        self._ttl = ttl
+        # 卡池名称 -> 卡池数据 顺序与官方列表一致
+        self._banners: Dict[str, GachaBannerData] = {}
+        self._updated_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def _get_gacha_list(self) -> List[dict]:
+        gacha_list = await self._cache.get_list()
+        if gacha_list is not None:
+            return gacha_list
+        gacha_list_info = await self._gacha.get_gacha_list_info()
+        if gacha_list_info.error:
+            raise RuntimeError(f"获取卡池列表失败 {gacha_list_info.message}")
+        gacha_list = gacha_list_info.data["list"]
+        await self._cache.set_list(gacha_list)
+        return gacha_list
+
+    async def _get_gacha_info(self, gacha_id: str) -> dict:
+        gacha_info = await self._cache.get_info(gacha_id)
+        if gacha_info is not None:
+            return gacha_info
+        gacha_info = await self._gacha.get_gacha_info(gacha_id)
+        if not gacha_info:
+            raise RuntimeError(f"获取卡池 {gacha_id} 详情失败")
+        await self._cache.set_info(gacha_id, gacha_info)
+        return gacha_info
+
+    async def refresh(self):
+        """重新获取卡池列表 已经加载的卡池不会重新获取详情"""
+        async with self._refresh_lock:
+            gacha_list = await self._get_gacha_list()
+            current = {data.gacha_id: data for data in self._banners.values()}
+            banners: Dict[str, GachaBannerData] = {}
+            for gacha in gacha_list:
+                gacha_id, gacha_name = gacha["gacha_id"], gacha["gacha_name"]
+                data = current.get(gacha_id)
+                if data is None:
+                    # 单个卡池失败时跳过 其他卡池照常刷新
+                    try:
+                        data = await self._load_banner(gacha_id, gacha_name)
+                    except Exception as exc:
+                        Log.warning(f"加载卡池 {gacha_name}[{gacha_id}] 失败", exc)
+                        continue
+                    if data is None:
+                        continue
+                banners.setdefault(gacha_name, data)
+            self._banners = banners
+            self._updated_at = time.monotonic()
+
+    async def _load_banner(self, gacha_id: str, gacha_name: str) -> Optional[GachaBannerData]:
+        """:return: 不支持的卡池类型返回 None"""
+        gacha_info = await self._get_gacha_info(gacha_id)
+        if gacha_info.get("gacha_type") not in GACHA_TYPE_BANNER:
+            Log.warning(f"不支持的卡池类型 {gacha_info.get('gacha_type')} 跳过卡池 {gacha_name}[{gacha_id}]")
+            return None
+        data = GachaBannerData(gacha_id, gacha_name, gacha_info)
+        data.atlas = await self._build_atlas(data)
+        return data
+
+    async def _build_atlas(self, data: GachaBannerData) -> Optional[dict]:
+        """卡池变化时在进程池中生成新的图集 物品不变时直接读取之前的清单"""
+        try:
+            return await self._executor.run(build_atlas, self.resources_dir, data.item_types, self.atlas_dir)
+        except Exception as exc:
+            Log.warning(f"生成卡池 {data.gacha_name} 的图集失败", exc)
+            return None
+
+    async def _refresh_in_background(self):
+        try:
+            await self.refresh()
+        except Exception as exc:
+            Log.warning("后台刷新卡池数据失败", exc)
+
+    async def get_banner(self, gacha_name: str = DEFAULT_GACHA_NAME) -> Optional[GachaBannerData]:
+        """
+        :param gacha_name: 卡池名称 默认为角色活动卡池
+        :return: 找不到时返回 None
+        """
+        if not self._banners:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                Log.warning("加载卡池数据失败", exc)
+                return None
+        elif time.monotonic() - self._updated_at > self._ttl and \
+                (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
+        return self._banners.get(gacha_name)
+
+    @staticmethod
+    def _pity_key(user_id: int, banner: GachaBanner) -> Tuple[int, str]:
+        # 同一类卡池共享保底
+        return user_id, banner.bannerType.name.lower()
+
+    async def get_pity(self, user_id: int, banner: GachaBanner) -> PlayerGachaBannerInfo:
+        """获取用户在该类卡池的保底计数"""
+        banner_info = await self._cache.get_pity(*self._pity_key(user_id, banner))
+        return PlayerGachaBannerInfo() if banner_info is None else banner_info
+
+    async def set_pity(self, user_id: int, banner: GachaBanner, banner_info: PlayerGachaBannerInfo):
+        """保存保底计数 每次抽卡后立即写入 重启后不会丢失"""
+        await self._cache.set_pity_many({self._pity_key(user_id, banner): banner_info})
@@ -0,0 +1,2 @@
+from app.ratelimit.cache import RateLimitCache
+from app.ratelimit.service import RateLimitService
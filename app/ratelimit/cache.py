@@ -0,0 +1,93 @@
+import math
+import time
+from typing import Dict, Tuple
+
+from redis.exceptions import ResponseError
+
+from logger import Log
+from utils.redisdb import RedisDB
+
+# 预约式令牌桶 令牌不足时也会扣除 返回需要等待的毫秒数 后来的请求排在后面
+# KEYS[1] 令牌桶 KEYS[2] 速率系数  ARGV[1] 每秒令牌数 ARGV[2] 容量
+_TOKEN_BUCKET_SCRIPT = """
+redis.replicate_commands()
+local factor = tonumber(redis.call('GET', KEYS[2]) or '1')
+local rate = tonumber(ARGV[1]) * factor
+local capacity = tonumber(ARGV[2])
+local now_time = redis.call('TIME')
+local now = tonumber(now_time[1]) * 1000 + math.floor(tonumber(now_time[2]) / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000) - 1
+local wait = 0
+if tokens < 0 then
+    wait = math.ceil(-tokens * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + wait + 1000)
+return wait
+"""
+
+
+class RateLimitCache:
+    """令牌桶保存在 Redis 中 多个进程共享限制
+
+    ratelimit:{name}:bucket   Hash tokens 剩余令牌 ts 上次更新的毫秒时间戳
+    ratelimit:{family}:factor 被限流后降低的速率系数 0 到 1 之间
+    Redis 不支持脚本时 (例如 fakeredis) 在进程内计算
+    """
+
+    FACTOR_TTL = 3600
+
+    def __init__(self, redis: RedisDB):
+        self.client = redis.client
+        self.qname = "ratelimit"
+        self._script = self.client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._use_script = True
+        # name -> (剩余令牌, 上次更新时间)
+        self._local_buckets: Dict[str, Tuple[float, float]] = {}
+        self._local_factors: Dict[str, float] = {}
+
+    def _local_reserve(self, name: str, family: str, rate: float, capacity: int) -> float:
+        rate *= self._local_factors.get(family, 1.0)
+        now = time.monotonic()
+        tokens, ts = self._local_buckets.get(name, (capacity, now))
+        tokens = min(capacity, tokens + (now - ts) * rate) - 1
+        self._local_buckets[name] = (tokens, now)
+        return -tokens / rate if tokens < 0 else 0.0
+
+    async def reserve(self, name: str, family: str, rate: float, capacity: int) -> float:
+        """预约一个令牌
+        :param name: 令牌桶名称
+        :param family: 使用该接口类别的速率系数
+        :param rate: 每秒产生的令牌数
+        :param capacity: 令牌桶容量 允许的突发请求数
+        :return: 需要等待的秒数
+        """
+        if self._use_script:
+            try:
+                wait = await self._script(keys=[f"{self.qname}:{name}:bucket", f"{self.qname}:{family}:factor"],
+                                          args=[rate, capacity])
+                return int(wait) / 1000
+            except ResponseError as exc:
+                if "unknown command" not in str(exc):
+                    raise exc
+                Log.warning("Redis 不支持脚本 限流只在当前进程内生效")
+                self._use_script = False
+        return self._local_reserve(name, family, rate, capacity)
+
+    async def get_factor(self, family: str) -> float:
+        if not self._use_script:
+            return self._local_factors.get(family, 1.0)
+        factor = await self.client.get(f"{self.qname}:{family}:factor")
+        return 1.0 if factor is None else float(factor)
+
+    async def set_factor(self, family: str, factor: float):
+        if not self._use_script:
+            self._local_factors[family] = factor
+            return
+        if math.isclose(factor, 1.0):
+            await self.client.delete(f"{self.qname}:{family}:factor")
+        else:
+            await self.client.set(f"{self.qname}:{family}:factor", factor, ex=self.FACTOR_TTL)
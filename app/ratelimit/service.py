@@ -0,0 +1,94 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from aiohttp import ClientResponseError
+from genshin import GenshinException
+
+from app.ratelimit.cache import RateLimitCache
+from logger import Log
+
+T = TypeVar("T")
+
+# 表示请求太频繁的 retcode 每日查询次数用完 (10101) 不属于这一类
+THROTTLE_RETCODES = {-110, 1028, -500004, -3006, -1004}
+
+
+class RateLimit:
+    def __init__(self, rate: float, capacity: int):
+        """
+        :param rate: 每秒允许的请求数
+        :param capacity: 允许的突发请求数
+        """
+        self.rate = rate
+        self.capacity = capacity
+
+
+class RateLimitService:
+    """按接口类别和账号限制请求米哈游API的速率 超过速率时排队等待而不是失败
+
+    被限流后按比例降低该类别的速率 之后每次成功的请求慢慢恢复 (AIMD)
+    """
+
+    FAMILIES: Dict[str, RateLimit] = {
+        "record": RateLimit(5, 10),
+        "sign": RateLimit(2, 4),
+    }
+    ACCOUNT = RateLimit(0.5, 3)
+    MIN_FACTOR = 0.1
+    DECREASE = 0.5
+    INCREASE = 0.05
+
+    def __init__(self, cache: RateLimitCache, retries: int = 2):
+        """
+        :param retries: 被限流后重新排队的次数
+        """
+        self._cache = cache
+        self._retries = retries
+
+    async def acquire(self, family: str, account: Optional[Hashable] = None):
+        """等待直到可以发送请求"""
+        limit = self.FAMILIES[family]
+        wait = await self._cache.reserve(family, family, limit.rate, limit.capacity)
+        if account is not None:
+            wait = max(wait, await self._cache.reserve(f"{family}:{account}", family, self.ACCOUNT.rate,
+                                                       self.ACCOUNT.capacity))
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    def is_throttled(exc: Exception) -> bool:
+        if isinstance(exc, GenshinException):
+            return exc.retcode in THROTTLE_RETCODES
+        if isinstance(exc, ClientResponseError):
+            return exc.status == 429
+        return False
+
+    async def on_throttled(self, family: str):
+        factor = max(self.MIN_FACTOR, await self._cache.get_factor(family) * self.DECREASE)
+        await self._cache.set_factor(family, factor)
+        Log.warning(f"请求 {family} 被限流 速率降低为 {factor:.2f} 倍")
+
+    async def on_success(self, family: str):
+        """速率系数从 Redis 读取 没有看到限流的进程也会逐渐恢复速率"""
+        factor = await self._cache.get_factor(family)
+        if factor >= 1:
+            return
+        await self._cache.set_factor(family, min(1.0, factor + self.INCREASE))
+
+    async def call(self, family: str, account: Optional[Hashable], func: Callable[[], Awaitable[T]]) -> T:
+        """限速执行请求 被限流时降低速率后重新排队
+        :param family: 接口类别
+        :param account: 账号 为空时只按类别限制
+        :param func: 返回请求的协程
+        """
+        for retry in range(self._retries + 1):
+            await self.acquire(family, account)
+            try:
+                result = await func()
+            except Exception as exc:
+                if not self.is_throttled(exc) or retry == self._retries:
+                    raise exc
+                await self.on_throttled(family)
+                continue
+            await self.on_success(family)
+            return result
@@ -0,0 +1,11 @@
+from app.ratelimit import RateLimitCache, RateLimitService
+from app.record.service import RecordService
+from utils.app.manager import listener_service
+from utils.redisdb import RedisDB
+
+
+@listener_service()
+def create_record_service(redis: RedisDB):
+    _rate_limit = RateLimitService(RateLimitCache(redis))
+    _service = RecordService(_rate_limit)
+    return _service
@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional, Set, Tuple
+
+from genshin import Client
+from genshin.models import Diary, GenshinUserStats, Notes, RecordCard, SpiralAbyss
+
+from app.ratelimit import RateLimitService
+from logger import Log
+from utils.lru import LRUCache
+from utils.singleflight import SingleFlight
+
+
+class RecordEndpoint:
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0):
+        """
+        :param name: 接口名称 作为缓存 key 的一部分
+        :param ttl: 在这段时间内直接返回缓存
+        :param stale_ttl: 缓存过期后的这段时间内先返回旧数据 同时在后台刷新 为0时等待刷新完成
+        """
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+
+class RecordService:
+    """游戏战绩接口的响应缓存 按 (接口, 查询的账号, UID, 参数) 缓存 请求失败时不缓存
+
+    不同账号查询同一个UID的结果不共享 未公开数据的玩家查询自己的结果不会被其他人读到
+
+    实时便笺变化很快只缓存很短的时间 深渊和玩家信息变化较慢 过去月份的札记不会再变化
+    """
+
+    NOTES = RecordEndpoint("notes", 30)
+    SPIRAL_ABYSS = RecordEndpoint("spiral_abyss", 3600, 6 * 3600)
+    GENSHIN_USER = RecordEndpoint("genshin_user", 1800, 6 * 3600)
+    RECORD_CARD = RecordEndpoint("record_card", 1800, 6 * 3600)
+    DIARY = RecordEndpoint("diary", 600, 3600)
+    DIARY_PAST = RecordEndpoint("diary", 86400)
+
+    def __init__(self, rate_limit: RateLimitService, maxsize: int = 4096):
+        self._rate_limit = rate_limit
+        # key -> (获取时间, 响应)
+        self._cache: LRUCache[Tuple[float, Any]] = LRUCache(maxsize=maxsize)
+        self._refreshing: Set[Hashable] = set()
+        # 保存后台刷新的任务 避免任务在完成前被回收
+        self._tasks: Set[asyncio.Task] = set()
+        # 多人同时查询同一个UID时只请求一次
+        self._single_flight = SingleFlight()
+
+    async def _refresh(self, key: Hashable, endpoint: RecordEndpoint, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        async def _fetch():
+            # 按查询的账号 (Cookie) 限速 而不是按被查询的UID
+            value = await self._rate_limit.call("record", key[1], fetch)
+            self._cache.set(key, (time.monotonic(), value), ttl=endpoint.ttl + endpoint.stale_ttl)
+            return value
+
+        return await self._single_flight.do(key, _fetch)
+
+    async def _refresh_in_background(self, key: Hashable, endpoint: RecordEndpoint,
+                                     fetch: Callable[[], Awaitable[Any]]):
+        try:
+            await self._refresh(key, endpoint, fetch)
+        except Exception as exc:
+            Log.warning(f"后台刷新 {key} 失败", exc)
+        finally:
+            self._refreshing.discard(key)
+
+    @staticmethod
+    def _account(client: Client) -> Optional[int]:
+        """客户端 Cookie 对应的米游社账号ID 旧版本的 genshin.py 为 hoyolab_uid"""
+        return getattr(client, "hoyolab_id", None) or getattr(client, "hoyolab_uid", None)
+
+    async def _get(self, endpoint: RecordEndpoint, client: Client, uid: int, args: Tuple[Hashable, ...],
+                   fetch: Callable[[], Awaitable[Any]]) -> Any:
+        key = (endpoint.name, self._account(client), uid, args)
+        item: Optional[Tuple[float, Any]] = self._cache.get(key)
+        if item is not None:
+            fetched_at, value = item
+            age = time.monotonic() - fetched_at
+            if age < endpoint.ttl:
+                return value
+            if age < endpoint.ttl + endpoint.stale_ttl:
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    task = asyncio.create_task(self._refresh_in_background(key, endpoint, fetch))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return value
+        return await self._refresh(key, endpoint, fetch)
+
+    async def get_genshin_notes(self, client: Client, uid: Optional[int] = None) -> Notes:
+        uid = uid or client.uid
+        return await self._get(self.NOTES, client, uid, (), lambda: client.get_genshin_notes(uid))
+
+    async def get_spiral_abyss(self, client: Client, uid: Optional[int] = None, previous: bool = False) -> SpiralAbyss:
+        uid = uid or client.uid
+        return await self._get(self.SPIRAL_ABYSS, client, uid, (previous,),
+                               lambda: client.get_spiral_abyss(uid, previous=previous))
+
+    async def get_genshin_user(self, client: Client, uid: Optional[int] = None) -> GenshinUserStats:
+        uid = uid or client.uid
+        return await self._get(self.GENSHIN_USER, client, uid, (), lambda: client.get_genshin_user(uid))
+
+    async def get_record_card(self, client: Client, uid: Optional[int] = None) -> Optional[RecordCard]:
+        """:param uid: 为空时查询客户端账号自己的卡片"""
+        if uid is None:
+            return await self._get(self.RECORD_CARD, client, client.uid, ("self",),
+                                   lambda: client.get_record_card())
+        return await self._get(self.RECORD_CARD, client, uid, (), lambda: client.get_record_card(uid))
+
+    async def get_diary(self, client: Client, uid: Optional[int] = None, month: Optional[int] = None) -> Diary:
+        uid = uid or client.uid
+        current_month = datetime.datetime.now().month
+        endpoint = self.DIARY if month is None or month == current_month else self.DIARY_PAST
+        return await self._get(endpoint, client, uid, (month or current_month,),
+                               lambda: client.get_diary(uid, month=month))
@@ -0,0 +1,11 @@
+from app.reminder.cache import ReminderCache
+from app.reminder.service import ReminderService
+from utils.app.manager import listener_service
+from utils.redisdb import RedisDB
+
+
+@listener_service()
+def create_reminder_service(redis: RedisDB):
+    _cache = ReminderCache(redis)
+    _service = ReminderService(_cache)
+    return _service
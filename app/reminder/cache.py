@@ -0,0 +1,84 @@
+from typing import List, Optional
+
+import ujson
+from redis.exceptions import ResponseError
+
+from app.reminder.models import Reminder
+from logger import Log
+from utils.redisdb import RedisDB
+
+# 把到期的成员的分数改为租约到期的时间 处理完成前进程退出时租约到期后会再次被取出
+# KEYS[1] 有序集合  ARGV[1] 当前时间 ARGV[2] 租约到期时间 ARGV[3] 最多取出的数量
+_LEASE_SCRIPT = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+for _, member in ipairs(members) do
+    redis.call('ZADD', KEYS[1], 'XX', ARGV[2], member)
+end
+return members
+"""
+
+
+class ReminderCache:
+    """订阅保存在哈希表中 下一次检查的时间保存在有序集合中 只需要取出分数已经到期的成员
+
+    Redis 不支持脚本 (例如 fakeredis) 时按顺序执行 只适合单个进程
+    """
+
+    def __init__(self, redis: RedisDB):
+        self.client = redis.client
+        self.qname = "reminder"
+        self._script = self.client.register_script(_LEASE_SCRIPT)
+
+    @property
+    def _due_key(self) -> str:
+        return f"{self.qname}:due"
+
+    @property
+    def _subscription_key(self) -> str:
+        return f"{self.qname}:subscription"
+
+    async def get_reminder(self, user_id: int) -> Optional[Reminder]:
+        data = await self.client.hget(self._subscription_key, str(user_id))
+        if data is None:
+            return None
+        return Reminder.from_json(ujson.loads(data))
+
+    async def set_reminder(self, reminder: Reminder):
+        await self.client.hset(self._subscription_key, str(reminder.user_id), ujson.dumps(reminder.to_json()))
+
+    async def update_reminder(self, reminder: Reminder) -> bool:
+        """只在订阅还存在时更新 避免处理期间取消的订阅被重新写入
+
+        :return: 订阅是否还存在
+        """
+        if not await self.client.hexists(self._subscription_key, str(reminder.user_id)):
+            return False
+        await self.set_reminder(reminder)
+        return True
+
+    async def del_reminder(self, user_id: int):
+        await self.client.hdel(self._subscription_key, str(user_id))
+        await self.client.zrem(self._due_key, str(user_id))
+
+    async def schedule(self, user_id: int, timestamp: float):
+        await self.client.zadd(self._due_key, {str(user_id): timestamp})
+
+    async def reschedule(self, user_id: int, timestamp: float):
+        """只修改还在有序集合中的成员 已经取消的订阅不会被重新加入"""
+        await self.client.zadd(self._due_key, {str(user_id): timestamp}, xx=True)
+
+    async def lease_due(self, now: float, lease: float, limit: int) -> List[int]:
+        """取出已经到期的用户 同时把它们的检查时间推迟到租约到期 处理完成后需要调用 reschedule"""
+        if self._script is not None:
+            try:
+                members = await self._script(keys=[self._due_key], args=[now, now + lease, limit])
+                return [int(member) for member in members]
+            except ResponseError as exc:
+                if "unknown command" not in str(exc):
+                    raise exc
+                Log.warning("Redis 不支持脚本 树脂提醒只适合单个进程")
+                self._script = None
+        members = await self.client.zrangebyscore(self._due_key, "-inf", now, start=0, num=limit)
+        if members:
+            await self.client.zadd(self._due_key, {member: now + lease for member in members}, xx=True)
+        return [int(member) for member in members]
@@ -0,0 +1,85 @@
+from typing import List, Optional, Tuple
+
+from genshin.models import Notes
+
+from model.baseobject import BaseObject
+
+# 每点树脂的恢复时间
+RESIN_RECOVERY_SECONDS = 8 * 60
+# 已经提醒过但用户还没有消耗时 隔这么久再检查一次 用来重置提醒状态
+RECHECK_SECONDS = 2 * 3600
+# 最长的检查间隔 使用浓缩树脂等会让预测的时间提前
+MAX_INTERVAL_SECONDS = 6 * 3600
+
+
+class Reminder(BaseObject):
+    """树脂和探索派遣提醒的订阅"""
+
+    def __init__(self, user_id: int = 0, resin_threshold: int = 0, expedition: bool = True,
+                 resin_notified: bool = False, expedition_notified: bool = False):
+        """
+        :param resin_threshold: 树脂达到这个数量时提醒 为0时不提醒
+        :param expedition: 探索派遣全部完成时是否提醒
+        :param resin_notified: 已经提醒过树脂 树脂低于提醒数量后重置
+        :param expedition_notified: 已经提醒过探索派遣 重新派遣后重置
+        """
+        self.user_id = user_id
+        self.resin_threshold = resin_threshold
+        self.expedition = expedition
+        self.resin_notified = resin_notified
+        self.expedition_notified = expedition_notified
+
+    def to_json(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "resin_threshold": self.resin_threshold,
+            "expedition": self.expedition,
+            "resin_notified": self.resin_notified,
+            "expedition_notified": self.expedition_notified,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Reminder":
+        return cls(data["user_id"], data["resin_threshold"], data["expedition"], data["resin_notified"],
+                   data["expedition_notified"])
+
+
+def check_notes(reminder: Reminder, notes: Notes, now: float) -> Tuple[List[str], float]:
+    """根据实时便笺计算需要发送的提醒和下一次检查的时间 会修改 reminder 的提醒状态
+
+    :param now: 当前时间戳
+    :return: (提醒文本, 下一次检查的时间戳)
+    """
+    messages = []
+    wakeups = [now + MAX_INTERVAL_SECONDS]
+    if reminder.resin_threshold:
+        threshold = min(reminder.resin_threshold, notes.max_resin)
+        if notes.current_resin >= threshold:
+            if not reminder.resin_notified:
+                reminder.resin_notified = True
+                messages.append(f"树脂已经恢复到 {notes.current_resin}/{notes.max_resin} 了哦~")
+            wakeups.append(now + RECHECK_SECONDS)
+        else:
+            reminder.resin_notified = False
+            # 恢复满的剩余时间减去提醒数量到上限之间的恢复时间
+            remaining = notes.remaining_resin_recovery_time.total_seconds() - \
+                (notes.max_resin - threshold) * RESIN_RECOVERY_SECONDS
+            wakeups.append(now + max(remaining, 60))
+    if reminder.expedition:
+        expeditions = notes.expeditions
+        remaining: Optional[float] = max((expedition.remaining_time.total_seconds() for expedition in expeditions),
+                                         default=None)
+        if remaining is None:
+            # 没有派遣时只能等用户重新派遣
+            reminder.expedition_notified = False
+            wakeups.append(now + RECHECK_SECONDS)
+        elif remaining <= 0:
+            if not reminder.expedition_notified:
+                reminder.expedition_notified = True
+                messages.append(f"{len(expeditions)} 个探索派遣已经全部完成了哦~")
+            wakeups.append(now + RECHECK_SECONDS)
+        else:
+            reminder.expedition_notified = False
+            wakeups.append(now + remaining)
+    return messages, min(wakeups)
+
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from genshin import GenshinException, InvalidCookies
+from genshin.models import Notes
+from telegram import Bot
+from telegram.error import Forbidden, TelegramError
+
+from app.reminder.cache import ReminderCache
+from app.reminder.models import Reminder, check_notes
+from app.user.repositories import UserNotFoundError
+from logger import Log
+
+
+class ReminderService:
+    """树脂和探索派遣提醒 每个订阅只在预计到达提醒条件的时间被检查 不需要定时轮询所有订阅"""
+
+    # 请求失败后隔这么久重试
+    RETRY_SECONDS = 30 * 60
+    # 取出的订阅在这段时间内没有处理完成 (例如进程退出) 时会再次被取出
+    LEASE_SECONDS = 10 * 60
+
+    def __init__(self, cache: ReminderCache, concurrency: int = 4, batch_size: int = 100):
+        """
+        :param concurrency: 同时检查的订阅数
+        :param batch_size: 每次最多取出的到期订阅数 剩下的留到下一次
+        """
+        self._cache = cache
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+
+    async def get_reminder(self, user_id: int) -> Optional[Reminder]:
+        return await self._cache.get_reminder(user_id)
+
+    async def subscribe(self, user_id: int, resin_threshold: int, expedition: bool = True) -> Reminder:
+        """订阅后立即检查一次 之后按实时便笺计算检查时间"""
+        reminder = Reminder(user_id, resin_threshold, expedition)
+        await self._cache.set_reminder(reminder)
+        await self._cache.schedule(user_id, time.time())
+        return reminder
+
+    async def unsubscribe(self, user_id: int):
+        await self._cache.del_reminder(user_id)
+
+    async def _process(self, bot: Bot, user_id: int, get_notes: Callable[[int], Awaitable[Notes]]):
+        reminder = await self._cache.get_reminder(user_id)
+        if reminder is None:
+            # 订阅已经取消 移除有序集合中剩下的成员
+            await self._cache.del_reminder(user_id)
+            return
+        try:
+            notes = await get_notes(user_id)
+        except (UserNotFoundError, InvalidCookies):
+            Log.info(f"用户 {user_id} 的账号已经失效 取消树脂提醒")
+            await self._cache.del_reminder(user_id)
+            return
+        except (GenshinException, asyncio.TimeoutError) as exc:
+            Log.warning(f"用户 {user_id} 获取实时便笺失败 稍后重试", exc)
+            await self._cache.reschedule(user_id, time.time() + self.RETRY_SECONDS)
+            return
+        now = time.time()
+        messages, next_time = check_notes(reminder, notes, now)
+        for message in messages:
+            try:
+                await bot.send_message(user_id, message)
+            except Forbidden:
+                Log.info(f"用户 {user_id} 已经屏蔽BOT 取消树脂提醒")
+                await self._cache.del_reminder(user_id)
+                return
+            except TelegramError as exc:
+                Log.warning(f"发送树脂提醒给用户 {user_id} 失败", exc)
+        # 处理期间取消订阅时不要重新写入
+        if await self._cache.update_reminder(reminder):
+            await self._cache.reschedule(user_id, next_time)
+
+    async def run_due(self, bot: Bot, get_notes: Callable[[int], Awaitable[Notes]]) -> int:
+        """检查所有已经到期的订阅
+
+        :param get_notes: 获取用户实时便笺的函数
+        :return: 本次检查的订阅数
+        """
+        user_ids = await self._cache.lease_due(time.time(), self.LEASE_SECONDS, self.batch_size)
+        if not user_ids:
+            return 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def process(user_id: int):
+            async with semaphore:
+                try:
+                    await self._process(bot, user_id, get_notes)
+                except Exception as exc:
+                    Log.error(f"检查用户 {user_id} 的树脂提醒失败", exc)
+                    await self._cache.reschedule(user_id, time.time() + self.RETRY_SECONDS)
+
+        await asyncio.gather(*(process(user_id) for user_id in user_ids))
+        return len(user_ids)
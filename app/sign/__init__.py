@@ -0,0 +1,16 @@
+from app.ratelimit import RateLimitCache, RateLimitService
+from app.sign.cache import SignCache
+from app.sign.repositories import SignRepository
+from app.sign.service import SignService
+from utils.app.manager import listener_service
+from utils.mysql import MySQL
+from utils.redisdb import RedisDB
+
+
+@listener_service()
+def create_sign_service(mysql: MySQL, redis: RedisDB):
+    _repository = SignRepository(mysql)
+    _rate_limit = RateLimitService(RateLimitCache(redis))
+    _cache = SignCache(redis)
+    _service = SignService(_repository, _cache, _rate_limit)
+    return _service
@@ -0,0 +1,12 @@
+from utils.redisdb import RedisDB
+
+
+class SignCache:
+    def __init__(self, redis: RedisDB, lock_ttl: int = 86400):
+        self.client = redis.client
+        self.qname = "sign"
+        self.lock_ttl = lock_ttl
+
+    async def acquire_daily_lock(self, date: str) -> bool:
+        """每天只有一个进程可以执行自动签到 锁不会主动释放 过期后第二天可以再次获取"""
+        return bool(await self.client.set(f"{self.qname}:lock:{date}", 1, nx=True, ex=self.lock_ttl))
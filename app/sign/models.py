@@ -0,0 +1,27 @@
+from enum import Enum
+
+from model.base import RegionEnum
+from model.baseobject import BaseObject
+
+
+class SignStatusEnum(int, Enum):
+    OK = 1  # 签到成功
+    ALREADY_SIGNED = 2  # 今天已经签到过了
+    FAILED = 3  # 签到失败
+
+
+class SignAccount(BaseObject):
+    """需要自动签到的账号 只签到用户默认的服务器"""
+
+    def __init__(self, user_id: int = 0, region: RegionEnum = RegionEnum.NULL, uid: int = 0, cookies: dict = None):
+        self.user_id = user_id
+        self.region = region
+        self.uid = uid
+        self.cookies = cookies or {}
+
+
+class SignResult(BaseObject):
+    def __init__(self, user_id: int = 0, status: SignStatusEnum = SignStatusEnum.FAILED, message: str = ""):
+        self.user_id = user_id
+        self.status = status
+        self.message = message
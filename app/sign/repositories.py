@@ -0,0 +1,70 @@
+from typing import AsyncIterator, List
+
+import ujson
+
+from app.sign.models import SignAccount, SignResult
+from model.base import RegionEnum
+from utils.mysql import MySQL
+
+
+class SignRepository:
+    # 服务器 -> (Cookie表, 该服务器的UID字段)
+    TABLES = {
+        RegionEnum.HYPERION: ("mihoyo_cookie", "mihoyo_game_uid"),
+        RegionEnum.HOYOLAB: ("hoyoverse_cookie", "hoyoverse_game_uid"),
+    }
+
+    def __init__(self, mysql: MySQL):
+        self.mysql = mysql
+
+    async def count_accounts(self) -> int:
+        count = 0
+        for region, (table, _) in self.TABLES.items():
+            query = f"""
+            SELECT COUNT(*)
+            FROM `user` INNER JOIN `{table}` ON `{table}`.user_id=`user`.user_id
+            WHERE `user`.service=%s;
+            """
+            data = await self.mysql.execute_and_fetchall(query, (region.value,))
+            count += data[0][0]
+        return count
+
+    async def get_accounts(self, region: RegionEnum, after_user_id: int, limit: int) -> List[SignAccount]:
+        """按用户ID分页读取 使用上一页最后的用户ID定位 不需要 OFFSET 扫描前面的行"""
+        table, uid_field = self.TABLES[region]
+        query = f"""
+        SELECT `user`.user_id,`user`.{uid_field},`{table}`.cookie
+        FROM `user` INNER JOIN `{table}` ON `{table}`.user_id=`user`.user_id
+        WHERE `user`.service=%s AND `user`.user_id>%s
+        ORDER BY `user`.user_id
+        LIMIT %s;
+        """
+        query_args = (region.value, after_user_id, limit)
+        data = await self.mysql.execute_and_fetchall(query, query_args)
+        return [SignAccount(user_id, region, uid, ujson.loads(cookies)) for (user_id, uid, cookies) in data]
+
+    async def iter_accounts(self, page_size: int = 500) -> AsyncIterator[SignAccount]:
+        for region in self.TABLES:
+            after_user_id = 0
+            while True:
+                accounts = await self.get_accounts(region, after_user_id, page_size)
+                for account in accounts:
+                    yield account
+                if len(accounts) < page_size:
+                    break
+                after_user_id = accounts[-1].user_id
+
+    async def save_results(self, results: List[SignResult]):
+        """一次写入一批签到结果 sign 表的结构见 README"""
+        if not results:
+            return
+        query = """
+        INSERT INTO `sign`
+        (user_id,status)
+        VALUES
+        (%s,%s)
+        ON DUPLICATE KEY UPDATE
+        status=VALUES(status),time_updated=CURRENT_TIMESTAMP;
+        """
+        query_args = [(result.user_id, result.status.value) for result in results]
+        await self.mysql.executemany(query, query_args)
@@ -0,0 +1,197 @@
+import asyncio
+import datetime
+import random
+import time
+from collections import Counter
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+from genshin import AlreadyClaimed, Client, Game, GenshinException
+from genshin.models import DailyReward
+from telegram import Bot
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+from app.ratelimit import RateLimitService
+from app.sign.cache import SignCache
+from app.sign.models import SignAccount, SignResult, SignStatusEnum
+from app.sign.repositories import SignRepository
+from logger import Log
+from utils.helpers import create_genshin_client
+
+CN_TIMEZONE = datetime.timezone(datetime.timedelta(hours=8))
+
+
+class SignService:
+    """每日签到 自动签到时分页读取所有账号 由固定数量的协程并发签到
+
+    签到请求按 RateLimitService 的 sign 速率发送 所以完成时间大约为 账号数 × 每个账号的请求数 ÷ 速率
+    """
+
+    # 每个账号签到需要的请求数 签到信息和领取奖励 每月奖励列表同一个月只需要获取一次
+    REQUESTS_PER_ACCOUNT = 2
+
+    def __init__(self, repository: SignRepository, cache: SignCache, rate_limit: RateLimitService,
+                 workers: int = 8, page_size: int = 500, jitter: float = 1.0, batch_size: int = 200,
+                 notify_rate: float = 20):
+        """
+        :param workers: 同时签到的账号数
+        :param page_size: 每次从数据库读取的账号数
+        :param jitter: 每个账号签到前随机等待的最长秒数 避免请求集中在同一时刻
+        :param batch_size: 签到结果每满这么多条写入一次数据库
+        :param notify_rate: 每秒最多发送的通知数 Telegram 限制为每秒30条
+        """
+        self._repository = repository
+        self._cache = cache
+        self._rate_limit = rate_limit
+        self.workers = workers
+        self.page_size = page_size
+        self.jitter = jitter
+        self.batch_size = batch_size
+        self.notify_rate = notify_rate
+        # (服务器, 月份) -> 每月奖励列表
+        self._rewards: Dict[Tuple[Hashable, str], Sequence[DailyReward]] = {}
+
+    async def _get_monthly_rewards(self, client: Client) -> Sequence[DailyReward]:
+        month = datetime.datetime.now(CN_TIMEZONE).strftime("%Y-%m")
+        key = (client.region, month)
+        rewards = self._rewards.get(key)
+        if rewards is None:
+            rewards = await self._rate_limit.call("sign", None, lambda: client.get_monthly_rewards(
+                game=Game.GENSHIN, lang="zh-cn"))
+            self._rewards = {_key: value for _key, value in self._rewards.items() if _key[1] == month}
+            self._rewards[key] = rewards
+        return rewards
+
+    async def sign(self, client: Client) -> Tuple[SignStatusEnum, str]:
+        """签到并生成签到结果的文本"""
+        try:
+            daily_reward_info = await self._rate_limit.call("sign", client.uid, lambda: client.get_reward_info(
+                game=Game.GENSHIN, lang="zh-cn"))
+        except GenshinException as error:
+            Log.error(f"UID {client.uid} 获取签到状态失败，API返回信息为 {str(error)}")
+            return SignStatusEnum.FAILED, f"获取签到状态失败，API返回信息为 {str(error)}"
+        try:
+            rewards = await self._get_monthly_rewards(client)
+        except GenshinException as error:
+            Log.error(f"UID {client.uid} 获取签到信息失败，API返回信息为 {str(error)}")
+            return SignStatusEnum.FAILED, f"获取签到信息失败，API返回信息为 {str(error)}"
+        if not daily_reward_info.signed_in:
+            try:
+                request_daily_reward = await self._rate_limit.call(
+                    "sign", client.uid,
+                    lambda: client.request_daily_reward("sign", method="POST", game=Game.GENSHIN, lang="zh-cn"))
+                Log.info(f"UID {client.uid} 签到请求 {request_daily_reward}")
+            except AlreadyClaimed:
+                status, result = SignStatusEnum.ALREADY_SIGNED, "今天旅行者已经签到过了~"
+            except GenshinException as error:
+                Log.error(f"UID {client.uid} 签到失败，API返回信息为 {str(error)}")
+                return SignStatusEnum.FAILED, f"获取签到状态失败，API返回信息为 {str(error)}"
+            else:
+                status, result = SignStatusEnum.OK, "OK"
+        else:
+            status, result = SignStatusEnum.ALREADY_SIGNED, "今天旅行者已经签到过了~"
+        Log.info(f"UID {client.uid} 签到结果 {result}")
+        reward = rewards[daily_reward_info.claimed_rewards - (1 if daily_reward_info.signed_in else 0)]
+        today = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        now = datetime.datetime.now(CN_TIMEZONE)
+        missed_days = now.day - daily_reward_info.claimed_rewards
+        if not daily_reward_info.signed_in:
+            missed_days -= 1
+        message = f"#### {today} (UTC+8) ####\n" \
+                  f"UID: {client.uid}\n" \
+                  f"今日奖励: {reward.name} × {reward.amount}\n" \
+                  f"本月漏签次数：{missed_days}\n" \
+                  f"签到结果: {result}"
+        return status, message
+
+    async def _sign_account(self, account: SignAccount) -> SignResult:
+        # 自动签到的账号大多只用一次 不放入客户端池 避免挤掉正在使用的客户端
+        try:
+            client = create_genshin_client(account.region, account.cookies, account.uid)
+            status, message = await self.sign(client)
+        except Exception as exc:
+            Log.error(f"用户 {account.user_id} 自动签到失败", exc)
+            status, message = SignStatusEnum.FAILED, f"自动签到失败 {str(exc)}"
+        return SignResult(account.user_id, status, message)
+
+    async def _save_results(self, results: List[SignResult]):
+        try:
+            await self._repository.save_results(results)
+        except Exception as exc:
+            Log.error(f"保存 {len(results)} 条签到结果失败", exc)
+
+    async def _notify(self, bot: Bot, result: SignResult):
+        text = f"自动签到\n{result.message}"
+        try:
+            await bot.send_message(result.user_id, text)
+        except RetryAfter as exc:
+            await asyncio.sleep(exc.retry_after)
+            await self._notify(bot, result)
+        except Forbidden:
+            Log.debug(f"用户 {result.user_id} 没有私聊过BOT或已经屏蔽BOT 跳过签到通知")
+        except TelegramError as exc:
+            Log.warning(f"发送签到通知给用户 {result.user_id} 失败", exc)
+
+    async def sign_all(self, bot: Bot) -> Dict[SignStatusEnum, int]:
+        """为所有绑定了账号的用户签到 签到成功和失败时私聊通知用户 已经签到过的不通知
+
+        有多个 BOT 进程时只有当天第一个获取到锁的进程会执行
+
+        :return: 每种签到结果的账号数
+        """
+        today = datetime.datetime.now(CN_TIMEZONE).strftime("%Y-%m-%d")
+        if not await self._cache.acquire_daily_lock(today):
+            Log.info(f"{today} 的自动签到已经由其他进程执行 跳过")
+            return {}
+        total = await self._repository.count_accounts()
+        limit = self._rate_limit.FAMILIES["sign"]
+        Log.info(f"开始自动签到 共 {total} 个账号 预计需要 "
+                 f"{total * self.REQUESTS_PER_ACCOUNT / limit.rate / 60:.1f} 分钟")
+        start = time.monotonic()
+        # 队列有长度限制 数据库只需要比签到快一点 不会一次把所有账号读入内存
+        accounts: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        notices: asyncio.Queue = asyncio.Queue()
+        results: List[SignResult] = []
+        counter: Counter = Counter()
+
+        async def produce():
+            try:
+                async for account in self._repository.iter_accounts(self.page_size):
+                    await accounts.put(account)
+            except Exception as exc:
+                Log.error("读取自动签到账号失败", exc)
+            finally:
+                for _ in range(self.workers):
+                    await accounts.put(None)
+
+        async def work():
+            while True:
+                account = await accounts.get()
+                if account is None:
+                    return
+                await asyncio.sleep(random.uniform(0, self.jitter))
+                result = await self._sign_account(account)
+                counter[result.status] += 1
+                results.append(result)
+                if len(results) >= self.batch_size:
+                    batch = results[:]
+                    results.clear()
+                    await self._save_results(batch)
+                if result.status != SignStatusEnum.ALREADY_SIGNED:
+                    notices.put_nowait(result)
+
+        async def notify():
+            while True:
+                result = await notices.get()
+                if result is None:
+                    return
+                await self._notify(bot, result)
+                await asyncio.sleep(1 / self.notify_rate)
+
+        notifier = asyncio.create_task(notify())
+        await asyncio.gather(produce(), *(work() for _ in range(self.workers)))
+        await self._save_results(results)
+        notices.put_nowait(None)
+        await notifier
+        Log.info(f"自动签到完成 用时 {time.monotonic() - start:.0f} 秒 成功 {counter[SignStatusEnum.OK]} "
+                 f"已签到 {counter[SignStatusEnum.ALREADY_SIGNED]} 失败 {counter[SignStatusEnum.FAILED]}")
+        return dict(counter)
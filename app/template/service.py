@@ -1,3 +1,4 @@
+import hashlib
 import os
 import time
 from typing import Optional
@@ -8,6 +9,7 @@ from playwright.async_api import ViewportSize
 from config import config
 from logger import Log
 from utils.aiobrowser import AioBrowser
+from utils.singleflight import SingleFlight
 
 
 class TemplateService:
@@ -20,6 +22,8 @@ class TemplateService:
             os.mkdir(self._output_dir)
         self._jinja2_env = {}
         self._jinja2_template = {}
+        # 同时渲染相同的页面时只截图一次
+        self._single_flight = SingleFlight()
 
     def get_template(self, package_path: str, template_name: str, auto_escape: bool = True) -> Template:
         if config.DEBUG:
@@ -57,6 +61,13 @@ class TemplateService:
         template_data["res_path"] = f"file://{self._current_dir}"
         html = await template.render_async(**template_data)
         Log.debug(f"{template_name} 模板渲染使用了 {str(time.time() - start_time)}")
+        key = hashlib.sha1(f"{template.filename}\0{html}\0{sorted(viewport.items())}\0{full_page}\0{evaluate}"
+                           .encode("utf-8")).hexdigest()
+        return await self._single_flight.do(
+            key, lambda: self._screenshot(template, template_name, html, viewport, full_page, evaluate))
+
+    async def _screenshot(self, template: Template, template_name: str, html: str, viewport: ViewportSize,
+                          full_page: bool, evaluate: Optional[str]) -> bytes:
         browser = await self._browser.get_browser()
         start_time = time.time()
         page = await browser.new_page(viewport=viewport)
@@ -1,11 +1,14 @@
+from app.user.cache import UserCache
 from app.user.repositories import UserRepository
 from app.user.services import UserService
 from utils.app.manager import listener_service
 from utils.mysql import MySQL
+from utils.redisdb import RedisDB
 
 
 @listener_service()
-def create_user_service(mysql: MySQL):
+def create_user_service(mysql: MySQL, redis: RedisDB):
     _repository = UserRepository(mysql)
-    _service = UserService(_repository)
+    _cache = UserCache(redis)
+    _service = UserService(_repository, _cache)
     return _service
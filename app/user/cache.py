@@ -0,0 +1,43 @@
+from typing import Optional, Tuple
+
+import ujson
+
+from app.user.models import User
+from model.base import RegionEnum
+from utils.redisdb import RedisDB
+
+
+class UserCache:
+    """用户信息缓存 不存在的用户也会缓存一段较短的时间 避免反复查询数据库"""
+
+    def __init__(self, redis: RedisDB, ttl: int = 3600, negative_ttl: int = 60):
+        self.client = redis.client
+        self.qname = "user"
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    async def get_user(self, user_id: int) -> Tuple[bool, Optional[User]]:
+        """:return: (是否命中, 用户) 命中但用户为 None 表示用户不存在"""
+        data = await self.client.get(f"{self.qname}:{user_id}")
+        if data is None:
+            return False, None
+        if not data:
+            return True, None
+        user = ujson.loads(data)
+        return True, User(user["user_id"], user["yuanshen_game_uid"], user["genshin_game_uid"],
+                          RegionEnum(user["region"]))
+
+    async def set_user(self, user_id: int, user: Optional[User]):
+        if user is None:
+            await self.client.set(f"{self.qname}:{user_id}", "", ex=self.negative_ttl)
+            return
+        data = {
+            "user_id": user.user_id,
+            "yuanshen_game_uid": user.yuanshen_game_uid,
+            "genshin_game_uid": user.genshin_game_uid,
+            "region": user.region.value,
+        }
+        await self.client.set(f"{self.qname}:{user_id}", ujson.dumps(data), ex=self.ttl)
+
+    async def del_user(self, user_id: int):
+        await self.client.delete(f"{self.qname}:{user_id}")
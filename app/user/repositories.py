@@ -1,5 +1,5 @@
 from app.user.models import User
-from model.base import ServiceEnum
+from model.base import RegionEnum
 from utils.error import NotFoundError
 from utils.mysql import MySQL
 
@@ -17,8 +17,27 @@ class UserRepository:
         data = await self.mysql.execute_and_fetchall(query, query_args)
         if len(data) == 0:
             raise UserNotFoundError(user_id)
-        (user_id, yuanshen_game_uid, genshin_game_uid, default_service) = data
-        return User(user_id, yuanshen_game_uid, genshin_game_uid, ServiceEnum(default_service))
+        (user_id, yuanshen_game_uid, genshin_game_uid, default_service) = data[0]
+        return User(user_id, yuanshen_game_uid, genshin_game_uid, RegionEnum(default_service))
+
+    async def add_user(self, user: User):
+        query = """
+        INSERT INTO `user`
+        (user_id,mihoyo_game_uid,hoyoverse_game_uid,service)
+        VALUES
+        (%s,%s,%s,%s);
+        """
+        query_args = (user.user_id, user.yuanshen_game_uid, user.genshin_game_uid, user.region.value)
+        await self.mysql.execute_and_fetchall(query, query_args)
+
+    async def update_user(self, user: User):
+        query = """
+        UPDATE `user`
+        SET mihoyo_game_uid=%s,hoyoverse_game_uid=%s,service=%s
+        WHERE user_id=%s;
+        """
+        query_args = (user.yuanshen_game_uid, user.genshin_game_uid, user.region.value, user.user_id)
+        await self.mysql.execute_and_fetchall(query, query_args)
 
 
 class UserNotFoundError(NotFoundError):
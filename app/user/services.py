@@ -1,15 +1,51 @@
+from app.user.cache import UserCache
 from app.user.models import User
-from app.user.repositories import UserRepository
+from app.user.repositories import UserRepository, UserNotFoundError
+from utils.lru import LRUCache
+
+_MISSING = object()
 
 
 class UserService:
 
-    def __init__(self, user_repository: UserRepository) -> None:
+    def __init__(self, user_repository: UserRepository, cache: UserCache) -> None:
         self._repository: UserRepository = user_repository
+        self._cache = cache
+        # 进程内缓存时间较短 其他进程修改后最多在这段时间内读到旧数据
+        self._local: LRUCache[User] = LRUCache(maxsize=4096, ttl=30)
+        # 其他进程添加用户时无法删除这里的缓存 用户不存在的结果只缓存很短的时间
+        self.local_negative_ttl = 5
 
     async def get_user_by_id(self, user_id: int) -> User:
-        """从数据库获取用户信息
+        """获取用户信息 依次从进程内缓存 Redis 数据库读取
         :param user_id:用户ID
         :return:
         """
-        return await self._repository.get_by_user_id(user_id)
\ No newline at end of file
+        # 只读取一次 避免判断存在后过期
+        user = self._local.get(user_id, _MISSING)
+        if user is _MISSING:
+            hit, user = await self._cache.get_user(user_id)
+            if not hit:
+                try:
+                    user = await self._repository.get_by_user_id(user_id)
+                except UserNotFoundError:
+                    user = None
+                await self._cache.set_user(user_id, user)
+            self._local.set(user_id, user, ttl=None if user is not None else self.local_negative_ttl)
+        if user is None:
+            raise UserNotFoundError(user_id)
+        return user
+
+    async def add_user(self, user: User):
+        """绑定账号时添加用户 同时删除不存在的缓存"""
+        await self._repository.add_user(user)
+        await self.del_cache(user.user_id)
+
+    async def update_user(self, user: User):
+        await self._repository.update_user(user)
+        await self.del_cache(user.user_id)
+
+    async def del_cache(self, user_id: int):
+        """用户信息变化后删除缓存"""
+        self._local.delete(user_id)
+        await self._cache.del_user(user_id)
@@ -1,11 +1,12 @@
 from app.wiki.cache import WikiCache
 from app.wiki.service import WikiService
+from utils.aioexecutor import AioExecutor
 from utils.app.manager import listener_service
 from utils.redisdb import RedisDB
 
 
 @listener_service()
-def create_wiki_service(redis: RedisDB):
+def create_wiki_service(redis: RedisDB, executor: AioExecutor):
     _cache = WikiCache(redis)
-    _service = WikiService(_cache)
+    _service = WikiService(_cache, executor)
     return _service
@@ -1,21 +1,152 @@
+from typing import List, Dict, Optional
+
 import ujson
+from redis.asyncio.client import PubSub
 
 from utils.redisdb import RedisDB
 
 
 class WikiCache:
+    """每次刷新写入一个新的快照 写完后再切换指针 读取时不会看到写了一半的数据
+
+    wiki:{key_name}:current            当前快照的版本号
+    wiki:{key_name}:version            每次创建快照时自增 用于分配版本号
+    wiki:{key_name}:{version}:data     Hash 名称 -> 实体JSON
+    wiki:{key_name}:{version}:index    Hash 名称 -> 实体ID
+    wiki:{key_name}:{version}:fingerprint  Hash 页面URL -> 页面指纹JSON 用于增量刷新
+    wiki:update                        切换快照后发布 {key_name}:{version}
+
+    旧版本把所有实体保存在 wiki:{key_name} 一个JSON列表中 第一次启动时由 migrate_legacy 转换为快照
+    """
+
+    SNAPSHOT_SUFFIX = ("data", "index", "fingerprint")
+    # 旧快照保留一段时间 让正在读取旧快照的进程有时间切换
+    OLD_SNAPSHOT_EXPIRE = 600
+
     def __init__(self, redis: RedisDB):
         self.client = redis.client
         self.qname = "wiki"
+        self.channel = f"{self.qname}:update"
+
+    def _get_qname(self, key_name: str, suffix: str) -> str:
+        return f"{self.qname}:{key_name}:{suffix}"
+
+    def _get_snapshot_qname(self, key_name: str, version: int, suffix: str) -> str:
+        return f"{self.qname}:{key_name}:{version}:{suffix}"
+
+    async def get_current(self, key_name: str) -> int:
+        """当前快照的版本号 还没有快照时为0"""
+        version = await self.client.get(self._get_qname(key_name, "current"))
+        return 0 if version is None else int(version)
+
+    async def new_snapshot(self, key_name: str) -> int:
+        """复制当前快照作为新快照 之后的修改只写入新快照
+
+        在 publish_snapshot 之前对读取方都不可见
+        """
+        current = await self.get_current(key_name)
+        version = await self.client.incr(self._get_qname(key_name, "version"))
+        async with self.client.pipeline(transaction=False) as pipe:
+            for suffix in self.SNAPSHOT_SUFFIX:
+                pipe.hgetall(self._get_snapshot_qname(key_name, current, suffix))
+            data_list = await pipe.execute()
+        async with self.client.pipeline(transaction=True) as pipe:
+            for suffix, data in zip(self.SNAPSHOT_SUFFIX, data_list):
+                qname = self._get_snapshot_qname(key_name, version, suffix)
+                pipe.delete(qname)
+                if data:
+                    pipe.hset(qname, mapping=data)
+            await pipe.execute()
+        return version
+
+    async def publish_snapshot(self, key_name: str, version: int):
+        """原子地切换到新快照 并通知所有进程重新加载"""
+        current = await self.get_current(key_name)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(self._get_qname(key_name, "current"), version)
+            if current and current != version:
+                for suffix in self.SNAPSHOT_SUFFIX:
+                    pipe.expire(self._get_snapshot_qname(key_name, current, suffix), self.OLD_SNAPSHOT_EXPIRE)
+            pipe.publish(self.channel, f"{key_name}:{version}")
+            await pipe.execute()
+
+    async def discard_snapshot(self, key_name: str, version: int):
+        """放弃没有发布的快照"""
+        await self.client.delete(*(self._get_snapshot_qname(key_name, version, suffix)
+                                   for suffix in self.SNAPSHOT_SUFFIX))
+
+    async def migrate_legacy(self, key_name: str) -> int:
+        """还没有快照时把旧版本的JSON列表写入一个新快照 之后删除旧的键
+
+        :return: 新快照的版本号 不需要转换时为0
+        """
+        legacy_qname = f"{self.qname}:{key_name}"
+        if await self.get_current(key_name):
+            await self.client.delete(legacy_qname)
+            return 0
+        data = await self.client.get(legacy_qname)
+        if data is None:
+            return 0
+        info_list = ujson.loads(data)
+        version = await self.client.incr(self._get_qname(key_name, "version"))
+        async with self.client.pipeline(transaction=True) as pipe:
+            for info in info_list:
+                pipe.hset(self._get_snapshot_qname(key_name, version, "data"), info["name"], ujson.dumps(info))
+                pipe.hset(self._get_snapshot_qname(key_name, version, "index"), info["name"], info.get("id", 0))
+            await pipe.execute()
+        # 多个进程同时启动时只有一个进程的快照会生效
+        if not await self.client.set(self._get_qname(key_name, "current"), version, nx=True):
+            await self.discard_snapshot(key_name, version)
+            version = 0
+        await self.client.delete(legacy_qname)
+        return version
+
+    async def subscribe(self) -> PubSub:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        return pubsub
+
+    async def set_one(self, key_name: str, version: int, info: dict):
+        """写入或更新单个实体"""
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._get_snapshot_qname(key_name, version, "data"), info["name"], ujson.dumps(info))
+            pipe.hset(self._get_snapshot_qname(key_name, version, "index"), info["name"], info.get("id", 0))
+            await pipe.execute()
+
+    async def del_one(self, key_name: str, version: int, name: str):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hdel(self._get_snapshot_qname(key_name, version, "data"), name)
+            pipe.hdel(self._get_snapshot_qname(key_name, version, "index"), name)
+            await pipe.execute()
+
+    async def get_one(self, key_name: str, version: int, name: str) -> Optional[dict]:
+        data = await self.client.hget(self._get_snapshot_qname(key_name, version, "data"), name)
+        if data is None:
+            return None
+        return ujson.loads(data)
+
+    async def get_many(self, key_name: str, version: int, names: List[str]) -> List[dict]:
+        if not names:
+            return []
+        data_list = await self.client.hmget(self._get_snapshot_qname(key_name, version, "data"), names)
+        return [ujson.loads(data) for data in data_list if data is not None]
+
+    async def get_all(self, key_name: str, version: int) -> List[dict]:
+        return [ujson.loads(data) for data in
+                await self.client.hvals(self._get_snapshot_qname(key_name, version, "data"))]
+
+    async def get_name_index(self, key_name: str, version: int) -> Dict[str, int]:
+        data = await self.client.hgetall(self._get_snapshot_qname(key_name, version, "index"))
+        return {str(name, encoding="utf-8"): int(entity_id) for name, entity_id in data.items()}
 
-    async def refresh_info_cache(self, key_name: str, info):
-        qname = f"{self.qname}:{key_name}"
-        await self.client.set(qname, ujson.dumps(info))
+    async def get_fingerprints(self, key_name: str, version: int) -> Dict[str, dict]:
+        data = await self.client.hgetall(self._get_snapshot_qname(key_name, version, "fingerprint"))
+        return {str(url, encoding="utf-8"): ujson.loads(fingerprint) for url, fingerprint in data.items()}
 
-    async def del_one(self, key_name: str):
-        qname = f"{self.qname}:{key_name}"
-        await self.client.delete(qname)
+    async def set_fingerprint(self, key_name: str, version: int, url: str, fingerprint: dict):
+        await self.client.hset(self._get_snapshot_qname(key_name, version, "fingerprint"), url,
+                               ujson.dumps(fingerprint))
 
-    async def get_one(self, key_name: str) -> str:
-        qname = f"{self.qname}:{key_name}"
-        return await self.client.get(qname)
+    async def del_fingerprints(self, key_name: str, version: int, urls: List[str]):
+        if urls:
+            await self.client.hdel(self._get_snapshot_qname(key_name, version, "fingerprint"), *urls)
@@ -1,104 +1,286 @@
 import asyncio
+import hashlib
+from typing import Dict, List, Union, Callable, Awaitable, Optional, Tuple
 
-import ujson
+import httpx
 
 from app.wiki.cache import WikiCache
 from logger import Log
-from model.wiki.characters import Characters
-from model.wiki.weapons import Weapons
+from metadata.shortname import roles, weapons
+from model.wiki.characters import Characters, parse_characters
+from model.wiki.crawler import WikiCrawler, CrawlerResult
+from model.wiki.helpers import get_page
+from model.wiki.weapons import Weapons, parse_weapon_info
+from utils.aioexecutor import AioExecutor
+from utils.fuzzy import NameResolver
+
+RefreshProgress = Callable[[str, CrawlerResult], Awaitable[None]]
+
+
+class RefreshReport:
+    """一次刷新中哪些实体发生了变化"""
+
+    def __init__(self):
+        self.crawler: CrawlerResult = CrawlerResult()
+        self.added: List[str] = []
+        self.updated: List[str] = []
+        self.removed: List[str] = []
+        self.unchanged: int = 0
 
 
 class WikiService:
 
-    def __init__(self, cache: WikiCache):
+    def __init__(self, cache: WikiCache, executor: AioExecutor, concurrency: int = 8):
         self._cache = cache
         """
         Redis 在这里的作用是作为持久化
         """
+        self._executor = executor
         self.weapons = Weapons()
         self.characters = Characters()
-        self._characters_list = []
+        self._crawler = WikiCrawler(concurrency)
+        # 名称索引在 init 时加载 实体按需从 Redis 读取后保存在这里
+        self._characters: Dict[str, dict] = {}
         self._characters_name_list = []
+        self._characters_index: Dict[Union[str, int], str] = {}
+        self._weapons: Dict[str, dict] = {}
         self._weapons_name_list = []
-        self._weapons_list = []
-        self.first_run = True
+        self._weapons_index: Dict[Union[str, int], str] = {}
+        # 模糊搜索的索引 名称索引变化后在第一次搜索时重新建立
+        self._weapons_resolver: Optional[NameResolver] = None
+        self._characters_resolver: Optional[NameResolver] = None
+        # 当前加载的快照版本 其他进程刷新后通过订阅切换
+        self._versions: Dict[str, int] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+
+    @staticmethod
+    def _build_index(name_index: Dict[str, int], aliases: Dict[str, List[str]]) -> Dict[Union[str, int], str]:
+        """建立 名称、ID、别名 -> 名称 的索引
+        :param name_index: 名称 -> ID
+        :param aliases: 名称 -> 别名列表
+        :return:
+        """
+        index: Dict[Union[str, int], str] = {}
+        for name, entity_id in name_index.items():
+            for alias in aliases.get(name, []):
+                index.setdefault(alias, name)
+            if entity_id:
+                index[entity_id] = name
+        # 正式名称优先于其他实体的别名
+        for name in name_index:
+            index[name] = name
+        return index
+
+    def _build_weapons_index(self, name_index: Dict[str, int]):
+        self._weapons_name_list = list(name_index.keys())
+        self._weapons_index = self._build_index(name_index, weapons)
+        self._weapons_resolver = None
+
+    def _build_characters_index(self, name_index: Dict[str, int]):
+        # 角色ID以 shortname 中的ID为准
+        name_index = {name: 0 for name in name_index}
+        for role_id, role_names in roles.items():
+            if role_names[0] in name_index:
+                name_index[role_names[0]] = role_id
+        self._characters_name_list = list(name_index.keys())
+        self._characters_index = self._build_index(name_index, {value[0]: value for value in roles.values()})
+        self._characters_resolver = None
+
+    async def _reload(self, key_name: str):
+        """当前快照变化时重新加载名称索引 并清空已经读取的实体"""
+        version = await self._cache.get_current(key_name)
+        if self._versions.get(key_name) == version:
+            return
+        name_index = await self._cache.get_name_index(key_name, version)
+        self._versions[key_name] = version
+        if key_name == "weapon":
+            self._weapons = {}
+            self._build_weapons_index(name_index)
+        else:
+            self._characters = {}
+            self._build_characters_index(name_index)
+        Log.info(f"已加载 {key_name} 快照 版本 {version}")
+
+    async def _listen(self):
+        """订阅快照切换的通知 连接断开后重新订阅"""
+        while True:
+            try:
+                pubsub = await self._cache.subscribe()
+                try:
+                    # 订阅之前可能已经错过了通知
+                    for key_name in ("weapon", "characters"):
+                        await self._reload(key_name)
+                    async for message in pubsub.listen():
+                        key_name, _ = str(message["data"], encoding="utf-8").rsplit(":", 1)
+                        await self._reload(key_name)
+                finally:
+                    await pubsub.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                Log.warning("订阅Wiki更新失败 5秒后重试", exc)
+                await asyncio.sleep(5)
+
+    async def _refresh(self, key_name: str, type_name: str, url_list: List[str], client: httpx.AsyncClient,
+                       parse: Callable[[str, str], Awaitable[dict]],
+                       progress: Optional[RefreshProgress] = None, force: bool = False) -> RefreshReport:
+        """在新快照中获取所有页面 跳过指纹没有变化的页面 完成后原子地切换到新快照
+        :param force: 忽略页面指纹 重新解析全部页面
+        """
+        async with self._refresh_lock:
+            version = await self._cache.new_snapshot(key_name)
+            try:
+                report = await self._refresh_snapshot(key_name, version, type_name, url_list, client, parse,
+                                                      progress, force)
+            except BaseException:
+                await self._cache.discard_snapshot(key_name, version)
+                raise
+            await self._cache.publish_snapshot(key_name, version)
+            await self._reload(key_name)
+            return report
+
+    async def _refresh_snapshot(self, key_name: str, version: int, type_name: str, url_list: List[str],
+                                client: httpx.AsyncClient, parse: Callable[[str, str], Awaitable[dict]],
+                                progress: Optional[RefreshProgress] = None, force: bool = False) -> RefreshReport:
+        report = RefreshReport()
+        name_index = await self._cache.get_name_index(key_name, version)
+        fingerprints = {} if force else await self._cache.get_fingerprints(key_name, version)
+        names = set()
+
+        async def fetch(url: str) -> Optional[Tuple[dict, dict]]:
+            fingerprint = fingerprints.get(url)
+            # 实体已经不在缓存里时需要重新解析
+            if fingerprint is not None and fingerprint.get("name") not in name_index:
+                fingerprint = None
+            response = await get_page(client, url, fingerprint.get("etag") if fingerprint else None)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            sha1 = hashlib.sha1(response.content).hexdigest()
+            if fingerprint is not None and fingerprint.get("sha1") == sha1:
+                return None
+            info = await parse(response.text, url)
+            return info, {"name": info["name"], "sha1": sha1, "etag": response.headers.get("ETag")}
+
+        async def on_result(url: str, data: Optional[Tuple[dict, dict]]):
+            if data is None:
+                names.add(fingerprints[url]["name"])
+                report.unchanged += 1
+                return
+            info, fingerprint = data
+            await self._cache.set_one(key_name, version, info)
+            await self._cache.set_fingerprint(key_name, version, url, fingerprint)
+            names.add(info["name"])
+            if info["name"] in name_index:
+                report.updated.append(info["name"])
+            else:
+                report.added.append(info["name"])
+
+        async def on_progress(result: CrawlerResult):
+            if result.done % 10 == 0:
+                Log.info(f"现在已经获取到 {result.done}/{result.total} 个{type_name}信息")
+            if progress is not None:
+                await progress(type_name, result)
+
+        report.crawler = await self._crawler.crawl(url_list, fetch, on_result, on_progress)
+        for url, exc in report.crawler.failed:
+            Log.warning(f"获取{type_name}信息失败 url[{url}]", exc)
+        # 已经不在列表中的页面
+        url_set = set(url_list)
+        await self._cache.del_fingerprints(key_name, version, [url for url in fingerprints if url not in url_set])
+        if not report.crawler.failed:
+            # 只有全部页面都获取成功时才能确定哪些实体已经不存在
+            for name in set(name_index) - names:
+                await self._cache.del_one(key_name, version, name)
+                report.removed.append(name)
+        Log.info(f"{type_name}信息刷新完成 新增 {len(report.added)} 更新 {len(report.updated)} "
+                 f"未变化 {report.unchanged} 删除 {len(report.removed)} 失败 {len(report.crawler.failed)}")
+        return report
 
-    async def refresh_weapon(self):
+    async def _parse_weapon_info(self, html: str, url: str) -> dict:
+        # 解析页面是CPU密集任务 放到进程池中执行 避免阻塞事件循环
+        return await self._executor.run(parse_weapon_info, html, url)
+
+    async def _parse_characters(self, html: str, _: str) -> dict:
+        return await self._executor.run(parse_characters, html)
+
+    async def refresh_weapon(self, progress: Optional[RefreshProgress] = None, force: bool = False) -> RefreshReport:
         weapon_url_list = await self.weapons.get_all_weapon_url()
         Log.info(f"一共找到 {len(weapon_url_list)} 把武器信息")
-        weapons_list = []
-        task_list = []
-        for index, weapon_url in enumerate(weapon_url_list):
-            task_list.append(self.weapons.get_weapon_info(weapon_url))
-            # weapon_info = await self.weapons.get_weapon_info(weapon_url)
-            if index % 5 == 0:
-                result_list = await asyncio.gather(*task_list)
-                weapons_list.extend(result for result in result_list if isinstance(result, dict))
-                task_list.clear()
-            if index % 10 == 0 and index != 0:
-                Log.info(f"现在已经获取到 {index} 把武器信息")
-        result_list = await asyncio.gather(*task_list)
-        weapons_list.extend(result for result in result_list if isinstance(result, dict))
-
-        Log.info("写入武器信息到Redis")
-        self._weapons_list = weapons_list
-        await self._cache.del_one("weapon")
-        await self._cache.refresh_info_cache("weapon", weapons_list)
-
-    async def refresh_characters(self):
+        report = await self._refresh("weapon", "武器", weapon_url_list, self.weapons.client,
+                                     self._parse_weapon_info, progress, force)
+        return report
+
+    async def refresh_characters(self, progress: Optional[RefreshProgress] = None,
+                                 force: bool = False) -> RefreshReport:
         characters_url_list = await self.characters.get_all_characters_url()
         Log.info(f"一共找到 {len(characters_url_list)} 个角色信息")
-        characters_list = []
-        task_list = []
-        for index, characters_url in enumerate(characters_url_list):
-            task_list.append(self.characters.get_characters(characters_url))
-            if index % 5 == 0:
-                result_list = await asyncio.gather(*task_list)
-                characters_list.extend(result for result in result_list if isinstance(result, dict))
-                task_list.clear()
-            if index % 10 == 0 and index != 0:
-                Log.info(f"现在已经获取到 {index} 个角色信息")
-        result_list = await asyncio.gather(*task_list)
-        characters_list.extend(result for result in result_list if isinstance(result, dict))
-
-        Log.info("写入角色信息到Redis")
-        self._characters_list = characters_list
-        await self._cache.del_one("characters")
-        await self._cache.refresh_info_cache("characters", characters_list)
-
-    async def refresh_wiki(self):
+        report = await self._refresh("characters", "角色", characters_url_list, self.characters.client,
+                                     self._parse_characters, progress, force)
+        return report
+
+    async def refresh_wiki(self, progress: Optional[RefreshProgress] = None,
+                           force: bool = False) -> Dict[str, RefreshReport]:
         """
-        用于把Redis的缓存全部加载进Python
-        :return:
+        重新获取Wiki并写入Redis 默认只重新解析内容有变化的页面
+        :param progress: 每完成一个页面后调用 参数为类型名称和当前统计
+        :param force: 忽略页面指纹 重新解析全部页面
+        :return: 类型名称 -> 刷新结果
         """
         Log.info("正在重新获取Wiki")
         Log.info("正在重新获取武器信息")
-        await self.refresh_weapon()
+        weapon_report = await self.refresh_weapon(progress, force)
         Log.info("正在重新获取角色信息")
-        await self.refresh_characters()
+        characters_report = await self.refresh_characters(progress, force)
         Log.info("刷新成功")
+        return {"武器": weapon_report, "角色": characters_report}
 
     async def init(self):
         """
-        用于把Redis的缓存全部加载进Python
+        用于把Redis的名称索引加载进Python 具体实体在使用时再读取
+        之后通过订阅在其他进程刷新时重新加载
+        还没有快照时先转换旧版本的缓存 不需要等待管理员刷新
         :return:
         """
-        if self.first_run:
-            weapon_dict = await self._cache.get_one("weapon")
-            self._weapons_list = ujson.loads(weapon_dict)
-            for weapon in self._weapons_list:
-                self._weapons_name_list.append(weapon["name"])
-            characters_dict = await self._cache.get_one("characters")
-            self._characters_list = ujson.loads(characters_dict)
-            for characters in self._characters_list:
-                self._characters_name_list.append(characters["name"])
-            self.first_run = False
-
-    async def get_weapons(self, name: str):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            for key_name in ("weapon", "characters"):
+                version = await self._cache.migrate_legacy(key_name)
+                if version:
+                    Log.info(f"已把旧版本的 {key_name} 缓存转换为快照 版本 {version}")
+                await self._reload(key_name)
+
+    async def get_weapons(self, name: Union[str, int]) -> dict:
+        """通过名称、ID或别名获取武器
+        :param name: 名称、ID或 shortname 中的别名
+        :return: 找不到时返回空字典
+        """
         await self.init()
-        if len(self._weapons_list) == 0:
+        name = self._weapons_index.get(name)
+        if name is None:
             return {}
-        return next((weapon for weapon in self._weapons_list if weapon["name"] == name), {})
+        weapon = self._weapons.get(name)
+        if weapon is None:
+            weapon = await self._cache.get_one("weapon", self._versions["weapon"], name)
+            if weapon is None:
+                return {}
+            self._weapons[name] = weapon
+        return weapon
+
+    async def _build_resolver(self, index: Dict[Union[str, int], str]) -> NameResolver:
+        names = {key: name for key, name in index.items() if isinstance(key, str)}
+        # 建立拼音索引需要一些时间 不阻塞事件循环
+        return await self._executor.run_in_thread(NameResolver, names)
+
+    async def search_weapons(self, name: str, limit: int = 5) -> List[str]:
+        """模糊搜索武器 支持前缀、拼音、首字母和错别字
+        :return: 按可信程度排序的武器名称
+        """
+        await self.init()
+        if self._weapons_resolver is None:
+            self._weapons_resolver = await self._build_resolver(self._weapons_index)
+        return self._weapons_resolver.search(name, limit)
 
     async def get_weapons_name_list(self) -> list:
         await self.init()
@@ -106,11 +288,43 @@ class WikiService:
 
     async def get_weapons_list(self) -> list:
         await self.init()
-        return self._weapons_list
+        if len(self._weapons) != len(self._weapons_name_list):
+            weapons_list = await self._cache.get_all("weapon", self._versions["weapon"])
+            self._weapons = {weapon["name"]: weapon for weapon in weapons_list}
+        return list(self._weapons.values())
+
+    async def get_characters(self, name: Union[str, int]) -> dict:
+        """通过名称、角色ID或别名获取角色
+        :param name: 名称、角色ID或 shortname 中的别名
+        :return: 找不到时返回空字典
+        """
+        await self.init()
+        name = self._characters_index.get(name)
+        if name is None:
+            return {}
+        characters = self._characters.get(name)
+        if characters is None:
+            characters = await self._cache.get_one("characters", self._versions["characters"], name)
+            if characters is None:
+                return {}
+            self._characters[name] = characters
+        return characters
+
+    async def search_characters(self, name: str, limit: int = 5) -> List[str]:
+        """模糊搜索角色 支持前缀、拼音、首字母和错别字
+        :return: 按可信程度排序的角色名称
+        """
+        await self.init()
+        if self._characters_resolver is None:
+            self._characters_resolver = await self._build_resolver(self._characters_index)
+        return self._characters_resolver.search(name, limit)
 
     async def get_characters_list(self) -> list:
         await self.init()
-        return self._characters_list
+        if len(self._characters) != len(self._characters_name_list):
+            characters_list = await self._cache.get_all("characters", self._versions["characters"])
+            self._characters = {characters["name"]: characters for characters in characters_list}
+        return list(self._characters.values())
 
     async def get_characters_name_list(self) -> list:
         await self.init()
@@ -79,7 +79,7 @@ class RunDailyHandler:
             "data": self.data,
             "name": self.name,
             "chat_id": self.chat_id,
-            "user_id": self.callback,
+            "user_id": self.user_id,
             "job_kwargs": self.job_kwargs,
         }
         return kwargs
@@ -90,7 +90,7 @@ class RunRepeatingHandler:
     def __init__(self, callback: Func, interval: Union[float, datetime.timedelta],
                  first: Union[float, datetime.timedelta, datetime.datetime, datetime.time] = None,
                  last: Union[float, datetime.timedelta, datetime.datetime, datetime.time] = None,
-                 context: object = None, name: str = None, chat_id: int = None, user_id: int = None,
+                 data: object = None, name: str = None, chat_id: int = None, user_id: int = None,
                  job_kwargs: JSONDict = None):
         """Creates a new :class:`Job` instance that runs at specified intervals and adds it to the
         queue.
@@ -167,7 +167,7 @@ class RunRepeatingHandler:
         self.interval = interval
         self.first = first
         self.last = last
-        self.context = context
+        self.data = data
         self.name = name
         self.chat_id = chat_id
         self.user_id = user_id
@@ -180,10 +180,10 @@ class RunRepeatingHandler:
             "interval": self.interval,
             "first": self.first,
             "last": self.last,
-            "context": self.context,
+            "data": self.data,
             "name": self.name,
             "chat_id": self.chat_id,
-            "user_id": self.callback,
+            "user_id": self.user_id,
             "job_kwargs": self.job_kwargs,
         }
         return kwargs
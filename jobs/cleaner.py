@@ -0,0 +1,34 @@
+from telegram.ext import CallbackContext
+
+from app.cleaner import CleanerService
+from jobs.base import RunRepeatingHandler
+from logger import Log
+from utils.app.inject import inject
+from utils.job.manager import listener_jobs_class
+
+
+@listener_jobs_class()
+class CleanerJob:
+
+    @inject
+    def __init__(self, cleaner_service: CleanerService = None):
+        self.cleaner_service = cleaner_service
+
+    @classmethod
+    def build_jobs(cls) -> list:
+        cleaner = cls()
+        if cleaner.cleaner_service is None:
+            return []
+        # 所有定时删除的消息共用这一个任务
+        return [
+            RunRepeatingHandler(cleaner.sweep, 5, first=5, name="定时删除消息")
+        ]
+
+    async def sweep(self, context: CallbackContext):
+        try:
+            count = await self.cleaner_service.sweep(context.bot)
+        except Exception as exc:
+            Log.error("定时删除消息失败", exc)
+        else:
+            if count:
+                Log.debug(f"删除了 {count} 条到期的消息")
@@ -0,0 +1,33 @@
+import datetime
+
+from telegram.ext import CallbackContext
+
+from app.gacha import GachaService
+from jobs.base import RunRepeatingHandler
+from logger import Log
+from utils.app.inject import inject
+from utils.job.manager import listener_jobs_class
+
+
+@listener_jobs_class()
+class GachaJob:
+
+    @inject
+    def __init__(self, gacha_service: GachaService = None):
+        self.gacha_service = gacha_service
+
+    @classmethod
+    def build_jobs(cls) -> list:
+        gacha = cls()
+        # 启动后预先加载卡池 之后定时刷新 抽卡时不需要等待网络请求
+        return [
+            RunRepeatingHandler(gacha.refresh, datetime.timedelta(minutes=30), first=10, name="刷新卡池数据")
+        ]
+
+    async def refresh(self, _: CallbackContext):
+        try:
+            await self.gacha_service.refresh()
+        except Exception as exc:
+            Log.warning("刷新卡池数据失败", exc)
+        else:
+            Log.debug("刷新卡池数据成功")
@@ -0,0 +1,45 @@
+from genshin.models import Notes
+from telegram.ext import CallbackContext
+
+from app.cookies.service import CookiesService
+from app.record import RecordService
+from app.reminder import ReminderService
+from app.user import UserService
+from jobs.base import RunRepeatingHandler
+from logger import Log
+from utils.app.inject import inject
+from utils.helpers import get_genshin_client
+from utils.job.manager import listener_jobs_class
+
+
+@listener_jobs_class()
+class ReminderJob:
+
+    @inject
+    def __init__(self, reminder_service: ReminderService = None, record_service: RecordService = None,
+                 user_service: UserService = None, cookies_service: CookiesService = None):
+        self.reminder_service = reminder_service
+        self.record_service = record_service
+        self.user_service = user_service
+        self.cookies_service = cookies_service
+
+    @classmethod
+    def build_jobs(cls) -> list:
+        reminder = cls()
+        # 每次只从有序集合中取出已经到期的订阅 没有到期的订阅时不会请求API
+        return [
+            RunRepeatingHandler(reminder.run_due, 60, first=30, name="树脂和探索派遣提醒")
+        ]
+
+    async def _get_notes(self, user_id: int) -> Notes:
+        client = await get_genshin_client(user_id, self.user_service, self.cookies_service)
+        return await self.record_service.get_genshin_notes(client)
+
+    async def run_due(self, context: CallbackContext):
+        try:
+            count = await self.reminder_service.run_due(context.bot, self._get_notes)
+        except Exception as exc:
+            Log.error("检查树脂提醒失败", exc)
+        else:
+            if count:
+                Log.debug(f"检查了 {count} 个树脂提醒")
@@ -0,0 +1,31 @@
+import datetime
+
+from telegram.ext import CallbackContext
+
+from app.sign import SignService
+from jobs.base import RunDailyHandler
+from logger import Log
+from utils.app.inject import inject
+from utils.job.manager import listener_jobs_class
+
+
+@listener_jobs_class()
+class SignJob:
+
+    @inject
+    def __init__(self, sign_service: SignService = None):
+        self.sign_service = sign_service
+
+    @classmethod
+    def build_jobs(cls) -> list:
+        sign = cls()
+        # BOT 的默认时区为 UTC+8 与签到的刷新时间一致
+        return [
+            RunDailyHandler(sign.sign_all, datetime.time(0, 10, 00), name="每日自动签到")
+        ]
+
+    async def sign_all(self, context: CallbackContext):
+        try:
+            await self.sign_service.sign_all(context.bot)
+        except Exception as exc:
+            Log.error("每日自动签到失败", exc)
@@ -8,6 +8,7 @@ from telegram.warnings import PTBUserWarning
 from config import config
 from logger import Log
 from utils.aiobrowser import AioBrowser
+from utils.aioexecutor import AioExecutor
 from utils.app.manager import AppsManager
 from utils.job.register import register_job
 from utils.mysql import MySQL
@@ -35,9 +36,13 @@ def main() -> None:
     Log.info("初始化Playwright")
     browser = AioBrowser()
 
+    # 初始化进程池
+    Log.info("初始化进程池")
+    executor = AioExecutor()
+
     # 传入服务并启动
     Log.info("正在启动服务")
-    apps = AppsManager(mysql, redis, browser)
+    apps = AppsManager(mysql, redis, browser, executor)
     apps.refresh_list("./app/*")
     apps.import_module()
     apps.add_service()
@@ -80,6 +85,9 @@ def main() -> None:
             # 关闭playwright
             Log.info("正在关闭Playwright")
             loop.run_until_complete(browser.close())
+            # 关闭进程池
+            Log.info("正在关闭进程池")
+            loop.run_until_complete(executor.close())
         except (KeyboardInterrupt, SystemExit):
             pass
         except Exception as exc:
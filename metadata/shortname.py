@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 roles = {
     10000003: ["琴", "Jean", "jean", "团长", "代理团长", "琴团长", "蒲公英骑士"],
     10000006: ["丽莎", "Lisa", "lisa", "图书管理员", "图书馆管理员", "蔷薇魔女"],
@@ -144,15 +146,26 @@ weapons = {
 }
 
 
+def _build_alias_index(aliases: Dict[str, List[str]]) -> Dict[str, str]:
+    """别名 -> 正式名称 多个实体使用同一个别名时以先出现的为准"""
+    index: Dict[str, str] = {}
+    for name, value in aliases.items():
+        index.setdefault(name, name)
+        for alias in value:
+            index.setdefault(alias, name)
+    return index
+
+
+# 在导入时建立 查询时不需要再遍历所有别名
+roles_alias = _build_alias_index({value[0]: value for value in roles.values()})
+weapons_alias = _build_alias_index(weapons)
+
+
 def roleToName(shortname: str) -> str:
     if not shortname:
         return shortname
-    for value in roles.values():
-        for i in value:
-            if i == shortname:
-                return value[0]
-    return shortname
+    return roles_alias.get(shortname, shortname)
 
 
 def weaponToName(shortname: str) -> str:
-    return next((key for key, value in weapons.items() if shortname == key or shortname in value), shortname)
+    return weapons_alias.get(shortname, shortname)
@@ -0,0 +1,83 @@
+import hashlib
+import math
+import os
+from typing import Dict, Optional
+
+import ujson
+from PIL import Image
+
+# 物品类型 -> 图片所在目录
+ITEM_DIRS = {"角色": "character", "武器": "weapon"}
+
+
+def _atlas_key(resources_dir: str, item_types: Dict[str, str]) -> str:
+    """物品和图片的修改时间都没有变化时 使用之前生成的图集"""
+    sha1 = hashlib.sha1()
+    for name in sorted(item_types):
+        path = os.path.join(resources_dir, ITEM_DIRS.get(item_types[name], ""), f"{name}.png")
+        mtime = os.path.getmtime(path) if os.path.exists(path) else 0
+        sha1.update(f"{name}:{item_types[name]}:{mtime}\n".encode("utf-8"))
+    return sha1.hexdigest()[:16]
+
+
+def build_atlas(resources_dir: str, item_types: Dict[str, str], output_dir: str) -> dict:
+    """把卡池中所有物品的图片按类型各拼成一张图集 渲染时只需要加载图集
+
+    :param resources_dir: resources/genshin/gacha 目录
+    :param item_types: 物品名称 -> 物品类型 (角色 或 武器)
+    :param output_dir: 图集和清单保存的目录
+    :return: 清单 sheets 为 类型 -> 图集路径和大小 items 为 名称 -> 所在图集和坐标 没有图片的物品不会出现在清单中
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    key = _atlas_key(resources_dir, item_types)
+    manifest_path = os.path.join(output_dir, f"{key}.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return ujson.load(f)
+    manifest = {"sheets": {}, "items": {}}
+    for item_type, dir_name in ITEM_DIRS.items():
+        images = {}
+        for name in sorted(name for name, value in item_types.items() if value == item_type):
+            path = os.path.join(resources_dir, dir_name, f"{name}.png")
+            if os.path.exists(path):
+                images[name] = Image.open(path).convert("RGBA")
+        if not images:
+            continue
+        cell_width = max(image.width for image in images.values())
+        cell_height = max(image.height for image in images.values())
+        # 尽量接近正方形 避免单边过长
+        columns = max(1, round(math.sqrt(len(images) * cell_height / cell_width)))
+        rows = math.ceil(len(images) / columns)
+        sheet = Image.new("RGBA", (columns * cell_width, rows * cell_height), (0, 0, 0, 0))
+        for index, (name, image) in enumerate(images.items()):
+            x, y = index % columns * cell_width, index // columns * cell_height
+            sheet.paste(image, (x, y))
+            manifest["items"][name] = {"sheet": dir_name, "x": x, "y": y,
+                                       "width": image.width, "height": image.height}
+        sheet_path = os.path.join(output_dir, f"{key}-{dir_name}.png")
+        sheet.save(sheet_path, compress_level=1)
+        manifest["sheets"][dir_name] = {"path": sheet_path, "width": sheet.width, "height": sheet.height}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        ujson.dump(manifest, f, ensure_ascii=False)
+    return manifest
+
+
+def sprite_style(manifest: dict, name: str, width: Optional[float] = None, height: Optional[float] = None) -> str:
+    """生成显示图集中某个物品的 CSS 按 width 或 height 等比缩放
+
+    :return: 物品不在图集中时返回空字符串
+    """
+    item = manifest.get("items", {}).get(name)
+    if item is None:
+        return ""
+    sheet = manifest["sheets"][item["sheet"]]
+    if width is not None:
+        scale = width / item["width"]
+    elif height is not None:
+        scale = height / item["height"]
+    else:
+        scale = 1
+    return f"background-image: url('file://{sheet['path']}'); " \
+           f"background-size: {sheet['width'] * scale:.2f}px {sheet['height'] * scale:.2f}px; " \
+           f"background-position: {-item['x'] * scale:.2f}px {-item['y'] * scale:.2f}px; " \
+           f"width: {item['width'] * scale:.2f}px; height: {item['height'] * scale:.2f}px;"
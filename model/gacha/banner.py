@@ -1,6 +1,7 @@
 from enum import Enum
+from typing import Dict, Hashable, List, Tuple
 
-from model.gacha.common import ItemParamData
+from model.gacha.common import ItemParamData, Weights, lerp_table
 
 
 class BannerType(Enum):
@@ -9,6 +10,15 @@ class BannerType(Enum):
     WEAPON = 3
 
 
+# 官方卡池的 gacha_type
+GACHA_TYPE_BANNER = {
+    200: BannerType.STANDARD,
+    301: BannerType.EVENT,
+    400: BannerType.EVENT,
+    302: BannerType.WEAPON,
+}
+
+
 class GachaBanner:
     def __init__(self):
         self.gachaType: int = 0
@@ -23,33 +33,69 @@ class GachaBanner:
         self.beginTime: int = 0
         self.endTime: int = 0
         self.sortId: int = 0
-        self.rateUpItems4 = {}
-        self.rateUpItems5 = {}
-        self.fallbackItems3 = {11301, 11302, 11306, 12301, 12302, 12305, 13303, 14301, 14302, 14304, 15301, 15302,
-                               15304}
-        self.fallbackItems4Pool1 = {1014, 1020, 1023, 1024, 1025, 1027, 1031, 1032, 1034, 1036, 1039, 1043, 1044, 1045,
-                                    1048, 1053, 1055, 1056, 1064}
-        self.fallbackItems4Pool2 = {11401, 11402, 11403, 11405, 12401, 12402, 12403, 12405, 13401, 13407, 14401, 14402,
-                                    14403, 14409, 15401, 15402, 15403, 15405}
-        self.fallbackItems5Pool1 = {1003, 1016, 1042, 1035, 1041}
-        self.fallbackItems5Pool2 = {11501, 11502, 12501, 12502, 13502, 13505, 14501, 14502, 15501, 15502}
+        self.rateUpItems4: Tuple[Hashable, ...] = ()
+        self.rateUpItems5: Tuple[Hashable, ...] = ()
+        self.fallbackItems3: Tuple[Hashable, ...] = (11301, 11302, 11306, 12301, 12302, 12305, 13303, 14301, 14302,
+                                                     14304, 15301, 15302, 15304)
+        self.fallbackItems4Pool1: Tuple[Hashable, ...] = (1014, 1020, 1023, 1024, 1025, 1027, 1031, 1032, 1034, 1036,
+                                                          1039, 1043, 1044, 1045, 1048, 1053, 1055, 1056, 1064)
+        self.fallbackItems4Pool2: Tuple[Hashable, ...] = (11401, 11402, 11403, 11405, 12401, 12402, 12403, 12405,
+                                                          13401, 13407, 14401, 14402, 14403, 14409, 15401, 15402,
+                                                          15403, 15405)
+        self.fallbackItems5Pool1: Tuple[Hashable, ...] = (1003, 1016, 1042, 1035, 1041)
+        self.fallbackItems5Pool2: Tuple[Hashable, ...] = (11501, 11502, 12501, 12502, 13502, 13505, 14501, 14502,
+                                                          15501, 15502)
         self.removeC6FromPool = False
         self.autoStripRateUpFromFallback = True
-        self.weights4 = {{1, 510}, {8, 510}, {10, 10000}}
-        self.weights5 = {{1, 75}, {73, 150}, {90, 10000}}
-        self.poolBalanceWeights4 = {{1, 255}, {17, 255}, {21, 10455}}
-        self.poolBalanceWeights5 = {{1, 30}, {147, 150}, {181, 10230}}
+        # (抽数, 权重) 的断点 中间的抽数按线性插值 权重 10000 为必定出现
+        self.weights4: Weights = ((1, 510), (8, 510), (10, 10000))
+        self.weights5: Weights = ((1, 75), (73, 150), (90, 10000))
+        # 非UP时在角色池(Pool1)和武器池(Pool2)之间平衡 某个池太久没出现时权重增加
+        self.poolBalanceWeights4: Weights = ((1, 255), (17, 255), (21, 10455))
+        self.poolBalanceWeights5: Weights = ((1, 30), (147, 150), (181, 10230))
         self.eventChance4 = 50
         self.eventChance5 = 50
         self.bannerType = BannerType.STANDARD
+        # 命定值达到该值后下一个五星必定为定轨的物品 只有武器卡池有定轨
+        self.wishMaxProgress = 2
         self.rateUpItems1 = {}
         self.rateUpItems2 = {}
         self.eventChance = -1
         self.costItem = 0
 
+    def onLoad(self):
+        """卡池配置完成后调用 从常驻池中移除UP物品"""
+        if self.autoStripRateUpFromFallback:
+            rate_up = set(self.rateUpItems4) | set(self.rateUpItems5)
+            self.fallbackItems4Pool1 = tuple(item for item in self.fallbackItems4Pool1 if item not in rate_up)
+            self.fallbackItems4Pool2 = tuple(item for item in self.fallbackItems4Pool2 if item not in rate_up)
+            self.fallbackItems5Pool1 = tuple(item for item in self.fallbackItems5Pool1 if item not in rate_up)
+            self.fallbackItems5Pool2 = tuple(item for item in self.fallbackItems5Pool2 if item not in rate_up)
+
     def getGachaType(self):
         return self.gachaType
 
+    def hasEpitomized(self) -> bool:
+        return self.bannerType == BannerType.WEAPON
+
+    def getEventChance(self, rarity: int) -> int:
+        return self.eventChance5 if rarity == 5 else self.eventChance4
+
+    def getWeightTable(self, rarity: int) -> Tuple[int, ...]:
+        """下标为距离上次出现该星级的抽数 同样的断点只计算一次"""
+        return lerp_table(self.weights5 if rarity == 5 else self.weights4)
+
+    def getPoolBalanceWeightTable(self, rarity: int) -> Tuple[int, ...]:
+        return lerp_table(self.poolBalanceWeights5 if rarity == 5 else self.poolBalanceWeights4)
+
+    def getWeight(self, rarity: int, pity: int) -> int:
+        table = self.getWeightTable(rarity)
+        return table[min(pity, len(table) - 1)]
+
+    def getPoolBalanceWeight(self, rarity: int, pity: int) -> int:
+        table = self.getPoolBalanceWeightTable(rarity)
+        return table[min(pity, len(table) - 1)]
+
     def getCost(self, numRolls: int):
         """
         获取消耗的Item
@@ -65,3 +111,48 @@ class GachaBanner:
 
     def getCostItem(self):
         return self.costItem if self.costItem > 0 else self.costItemId
+
+
+def create_banner(banner_type: BannerType) -> GachaBanner:
+    """按卡池类型设置概率 武器卡池的概率与角色卡池不同"""
+    banner = GachaBanner()
+    banner.bannerType = banner_type
+    if banner_type == BannerType.WEAPON:
+        banner.weights4 = ((1, 600), (7, 600), (8, 6600), (10, 12600))
+        banner.weights5 = ((1, 100), (62, 100), (73, 7800), (80, 10000))
+        banner.eventChance4 = 75
+        banner.eventChance5 = 75
+    return banner
+
+
+def create_banner_from_gacha_info(gacha_info: dict) -> GachaBanner:
+    """使用官方卡池详情创建卡池 物品为物品名称 角色为 Pool1 武器为 Pool2
+
+    :param gacha_info: GachaInfo.get_gacha_info 返回的数据
+    """
+    banner = create_banner(GACHA_TYPE_BANNER[gacha_info["gacha_type"]])
+    banner.gachaType = gacha_info["gacha_type"]
+
+    def names(key: str, item_type: str = "") -> Tuple[str, ...]:
+        return tuple(item["item_name"] for item in gacha_info.get(key, [])
+                     if not item_type or item["item_type"] == item_type)
+
+    banner.rateUpItems4 = names("r4_up_items")
+    banner.rateUpItems5 = names("r5_up_items")
+    banner.fallbackItems3 = names("r3_prob_list")
+    banner.fallbackItems4Pool1 = names("r4_prob_list", "角色")
+    banner.fallbackItems4Pool2 = names("r4_prob_list", "武器")
+    banner.fallbackItems5Pool1 = names("r5_prob_list", "角色")
+    banner.fallbackItems5Pool2 = names("r5_prob_list", "武器")
+    banner.onLoad()
+    return banner
+
+
+def get_item_types(gacha_info: dict) -> Dict[str, str]:
+    """:return: 物品名称 -> 物品类型 (角色 或 武器)"""
+    result: Dict[str, str] = {}
+    keys: List[str] = ["r3_prob_list", "r4_prob_list", "r4_up_items", "r5_prob_list", "r5_up_items"]
+    for key in keys:
+        for item in gacha_info.get(key, []):
+            result[item["item_name"]] = item["item_type"]
+    return result
@@ -1,4 +1,78 @@
+from functools import lru_cache
+from typing import Tuple
+
+# (抽数, 权重) 的断点
+Weights = Tuple[Tuple[int, int], ...]
+
+
 class ItemParamData:
     def __init__(self, item_id: int = 0, count: int = 0):
         self.id: int = item_id
         self.count: int = count
+
+
+def lerp(x: int, points: Weights) -> int:
+    """按断点线性插值 与服务端一样使用整数除法 结果向零取整"""
+    if x <= points[0][0]:
+        return points[0][1]
+    if x >= points[-1][0]:
+        return points[-1][1]
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        if x == x1:
+            return y1
+        if x < x1:
+            delta = (x - x0) * (y1 - y0)
+            distance = x1 - x0
+            return y0 + (abs(delta) // distance if delta >= 0 else -(abs(delta) // distance))
+    return points[-1][1]
+
+
+@lru_cache(maxsize=64)
+def lerp_table(points: Weights) -> Tuple[int, ...]:
+    """预先计算每一抽的权重 下标为抽数 超过最后一个断点后权重不变"""
+    return tuple(lerp(x, points) for x in range(points[-1][0] + 1))
+
+
+class PlayerGachaBannerInfo:
+    """玩家在一类卡池中的保底计数 同一类卡池之间共享"""
+
+    def __init__(self):
+        self.pity5 = 0
+        self.pity4 = 0
+        self.failedFeaturedItemPulls4 = 0
+        self.failedFeaturedItemPulls5 = 0
+        self.pityPool4 = [0, 0]
+        self.pityPool5 = [0, 0]
+        # 定轨
+        self.wishItemId = None
+        self.failedChosenItemPulls = 0
+
+    def incPityAll(self):
+        self.pity4 += 1
+        self.pity5 += 1
+        self.pityPool4[0] += 1
+        self.pityPool4[1] += 1
+        self.pityPool5[0] += 1
+        self.pityPool5[1] += 1
+
+    def getFailedFeaturedItemPulls(self, rarity: int) -> int:
+        return self.failedFeaturedItemPulls5 if rarity == 5 else self.failedFeaturedItemPulls4
+
+    def setFailedFeaturedItemPulls(self, rarity: int, amount: int):
+        if rarity == 5:
+            self.failedFeaturedItemPulls5 = amount
+        else:
+            self.failedFeaturedItemPulls4 = amount
+
+    def getPityPool(self, rarity: int, pool: int) -> int:
+        return (self.pityPool5 if rarity == 5 else self.pityPool4)[pool - 1]
+
+    def setPityPool(self, rarity: int, pool: int, amount: int):
+        (self.pityPool5 if rarity == 5 else self.pityPool4)[pool - 1] = amount
+
+
+class PlayerGachaInfo:
+    def __init__(self):
+        self.standardBanner = PlayerGachaBannerInfo()
+        self.eventCharacterBanner = PlayerGachaBannerInfo()
+        self.eventWeaponBanner = PlayerGachaBannerInfo()
@@ -1,7 +1,118 @@
+import random
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from model.gacha.banner import BannerType, GachaBanner
+from model.gacha.common import PlayerGachaBannerInfo, PlayerGachaInfo
+
+
 class GachaManager:
+    """抽卡逻辑 每抽只查预先计算好的权重表 不需要重新计算概率"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.banners: Dict[int, GachaBanner] = {}
+        self.players: Dict[int, PlayerGachaInfo] = {}
+        self._random = random.Random(seed)
+
+    def addBanner(self, banner: GachaBanner):
+        self.banners[banner.gachaType] = banner
+
+    def getPlayerGachaInfo(self, player_id: int) -> PlayerGachaInfo:
+        gacha_info = self.players.get(player_id)
+        if gacha_info is None:
+            gacha_info = self.players[player_id] = PlayerGachaInfo()
+        return gacha_info
+
+    @staticmethod
+    def getBannerInfo(gacha_info: PlayerGachaInfo, banner: GachaBanner) -> PlayerGachaBannerInfo:
+        if banner.bannerType == BannerType.EVENT:
+            return gacha_info.eventCharacterBanner
+        if banner.bannerType == BannerType.WEAPON:
+            return gacha_info.eventWeaponBanner
+        return gacha_info.standardBanner
+
+    def drawRoulette(self, weights: Sequence[int], cutoff: int) -> int:
+        """轮盘抽取 权重之和超过 cutoff 时 只有前面的权重有效"""
+        total = sum(weights)
+        roll = self._random.randrange(min(total, cutoff))
+        sub_total = 0
+        for index, weight in enumerate(weights):
+            sub_total += weight
+            if roll < sub_total:
+                return index
+        return 0
+
+    def doFallbackRarePull(self, fallback1: Tuple[Hashable, ...], fallback2: Tuple[Hashable, ...], rarity: int,
+                           banner: GachaBanner, banner_info: PlayerGachaBannerInfo) -> Hashable:
+        if not fallback1:
+            return self._random.choice(fallback2)
+        if not fallback2:
+            return self._random.choice(fallback1)
+        pity_pool1 = banner.getPoolBalanceWeight(rarity, banner_info.getPityPool(rarity, 1))
+        pity_pool2 = banner.getPoolBalanceWeight(rarity, banner_info.getPityPool(rarity, 2))
+        # 权重大的要放在前面 超过 cutoff 时才能保证必定出现
+        if pity_pool1 >= pity_pool2:
+            chosen_pool = 1 + self.drawRoulette((pity_pool1, pity_pool2), 10000)
+        else:
+            chosen_pool = 2 - self.drawRoulette((pity_pool2, pity_pool1), 10000)
+        banner_info.setPityPool(rarity, chosen_pool, 0)
+        return self._random.choice(fallback1 if chosen_pool == 1 else fallback2)
+
+    def doRarePull(self, featured: Tuple[Hashable, ...], fallback1: Tuple[Hashable, ...],
+                   fallback2: Tuple[Hashable, ...], rarity: int, banner: GachaBanner,
+                   banner_info: PlayerGachaBannerInfo) -> Hashable:
+        epitomized = rarity == 5 and banner.hasEpitomized() and banner_info.wishItemId in featured
+        pull_featured = banner_info.getFailedFeaturedItemPulls(rarity) >= 1 or \
+            self._random.randint(1, 100) <= banner.getEventChance(rarity)
+        if epitomized and banner_info.failedChosenItemPulls >= banner.wishMaxProgress:
+            item = banner_info.wishItemId
+            banner_info.setFailedFeaturedItemPulls(rarity, 0)
+        elif pull_featured and featured:
+            item = self._random.choice(featured)
+            banner_info.setFailedFeaturedItemPulls(rarity, 0)
+        else:
+            item = self.doFallbackRarePull(fallback1, fallback2, rarity, banner, banner_info)
+            if featured:
+                banner_info.setFailedFeaturedItemPulls(rarity, banner_info.getFailedFeaturedItemPulls(rarity) + 1)
+        if epitomized:
+            if item == banner_info.wishItemId:
+                banner_info.failedChosenItemPulls = 0
+            else:
+                banner_info.failedChosenItemPulls += 1
+        return item
 
-    def __init__(self):
-        pass
+    def doPulls(self, banner: GachaBanner, banner_info: PlayerGachaBannerInfo,
+                times: int) -> List[Tuple[Hashable, int]]:
+        """
+        :param banner: 卡池
+        :param banner_info: 玩家在该类卡池中的保底计数 会被修改
+        :param times: 抽数
+        :return: (物品, 星级)
+        """
+        # 权重表只取一次 之后每抽都只是下标访问
+        weights5 = banner.getWeightTable(5)
+        weights4 = banner.getWeightTable(4)
+        last5, last4 = len(weights5) - 1, len(weights4) - 1
+        result = []
+        for _ in range(times):
+            banner_info.incPityAll()
+            weights = (weights5[min(banner_info.pity5, last5)], weights4[min(banner_info.pity4, last4)], 10000)
+            rarity = 5 - self.drawRoulette(weights, 10000)
+            if rarity == 5:
+                banner_info.pity5 = 0
+                item = self.doRarePull(banner.rateUpItems5, banner.fallbackItems5Pool1, banner.fallbackItems5Pool2,
+                                       5, banner, banner_info)
+            elif rarity == 4:
+                banner_info.pity4 = 0
+                item = self.doRarePull(banner.rateUpItems4, banner.fallbackItems4Pool1, banner.fallbackItems4Pool2,
+                                       4, banner, banner_info)
+            else:
+                item = self._random.choice(banner.fallbackItems3)
+            result.append((item, rarity))
+        return result
 
-    def DoPulls(self, player_id: int, gacha_type: int, times: int):
-        pass
+    def DoPulls(self, player_id: int, gacha_type: int, times: int) -> List[Tuple[Hashable, int]]:
+        banner = self.banners.get(gacha_type)
+        if banner is None:
+            raise ValueError(f"banner {gacha_type} not found")
+        banner_info = self.getBannerInfo(self.getPlayerGachaInfo(player_id), banner)
+        return self.doPulls(banner, banner_info, times)
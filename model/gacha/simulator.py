@@ -0,0 +1,168 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from model.gacha.common import Weights, lerp_table
+
+
+def pity_table(weights: Weights) -> np.ndarray:
+    """把卡池的五星权重断点转换为概率数组
+
+    与 GachaManager.drawRoulette 一致 五星排在最前面 概率为 权重 / 10000
+    :return: 下标为距离上次出现该星级的抽数 (从1开始) 值为本抽出现该星级的概率 最后一项为1
+    """
+    table = np.minimum(np.array(lerp_table(weights), dtype=float) / 10000, 1.0)
+    table[0] = 0.0
+    if table[-1] < 1:
+        raise ValueError("the last weight must be at least 10000")
+    return table[:int(np.argmax(table >= 1)) + 1]
+
+
+def gap_distribution(table: np.ndarray) -> np.ndarray:
+    """两次出现该星级之间抽数的分布 下标为抽数"""
+    survival = np.concatenate(([1.0], np.cumprod(1 - table[1:])))
+    return table * np.concatenate(([0.0], survival[:-1]))
+
+
+class SimulationResult:
+    def __init__(self, pulls: np.ndarray, five_stars: int, won: int, lost: int, guaranteed: int, fate: int):
+        """
+        :param pulls: 每次模拟达成目标使用的抽数
+        :param five_stars: 出现的五星总数
+        :param won: 赢下的小保底
+        :param lost: 歪掉的小保底
+        :param guaranteed: 大保底必定出现UP的次数
+        :param fate: 命定值满后必定出现定轨武器的次数
+        """
+        self.pulls = pulls
+        self.five_stars = five_stars
+        self.won = won
+        self.lost = lost
+        self.guaranteed = guaranteed
+        self.fate = fate
+
+    @property
+    def trials(self) -> int:
+        return len(self.pulls)
+
+    @property
+    def mean(self) -> float:
+        return float(self.pulls.mean())
+
+    @property
+    def win_rate(self) -> float:
+        """不在大保底时出现UP的比例"""
+        total = self.won + self.lost
+        return self.won / total if total else 0.0
+
+    def percentiles(self, q: Iterable[int] = (10, 25, 50, 75, 90, 99)) -> Dict[int, int]:
+        """:return: 百分比 -> 该比例的模拟在多少抽内达成目标"""
+        q = list(q)
+        return dict(zip(q, (int(value) for value in np.percentile(self.pulls, q, method="higher"))))
+
+    def probability_within(self, pulls: int) -> float:
+        """在 pulls 抽内达成目标的概率"""
+        return float(np.count_nonzero(self.pulls <= pulls) / self.trials)
+
+    def histogram(self, bucket: int = 10) -> List[Tuple[int, float]]:
+        """:return: (区间开始的抽数, 在该区间内达成目标的概率)"""
+        counts = np.bincount(self.pulls // bucket)
+        return [(index * bucket + 1, float(count / self.trials)) for index, count in enumerate(counts) if index]
+
+
+class GachaSimulator:
+    """使用 NumPy 批量模拟 每个五星之间的抽数直接按分布采样 不需要逐抽模拟
+
+    五星的出现只与距离上次五星的抽数有关 所以每个五星之间的抽数相互独立
+    """
+
+    def __init__(self, weights: Weights, up_probability: float, target_probability: float = 1.0,
+                 has_guarantee: bool = True, max_fate_points: int = 0, seed: Optional[int] = None):
+        """
+        :param weights: 卡池的五星权重断点 GachaBanner.weights5
+        :param up_probability: 五星为UP的概率
+        :param target_probability: UP中为想要的那一个的概率
+        :param has_guarantee: 歪了之后下一个五星是否必定为UP
+        :param max_fate_points: 命定值达到该值后下一个五星必定为定轨武器 0为没有定轨
+        :param seed: 随机数种子
+        """
+        self.up_probability = up_probability
+        self.target_probability = target_probability
+        self.has_guarantee = has_guarantee
+        self.max_fate_points = max_fate_points
+        self._distribution = gap_distribution(pity_table(weights))
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def max_pity(self) -> int:
+        return len(self._distribution) - 1
+
+    def _sample_gaps(self, size: int, pity: int = 0) -> np.ndarray:
+        """按分布采样距离下一个五星的抽数
+        :param pity: 已经垫了的抽数
+        """
+        distribution = self._distribution[pity + 1:]
+        cdf = np.cumsum(distribution)
+        index = np.searchsorted(cdf, self._rng.random(size) * cdf[-1], side="right")
+        return np.minimum(index, len(cdf) - 1) + 1
+
+    def _simulate_batch(self, size: int, copies: int, pity: int, guarantee: bool,
+                        fate_points: int) -> SimulationResult:
+        pulls = np.zeros(size, dtype=np.int32)
+        got = np.zeros(size, dtype=np.int32)
+        guaranteed = np.full(size, guarantee)
+        fate = np.full(size, fate_points, dtype=np.int32)
+        active = np.arange(size)
+        five_stars = won = lost = guaranteed_count = fate_count = 0
+        first = True
+        while len(active):
+            size = len(active)
+            pulls[active] += self._sample_gaps(size, pity if first else 0)
+            first = False
+            five_stars += size
+            is_up = self._rng.random(size) < self.up_probability
+            if self.has_guarantee:
+                current_guaranteed = guaranteed[active]
+                won += int(np.count_nonzero(is_up & ~current_guaranteed))
+                lost += int(np.count_nonzero(~is_up & ~current_guaranteed))
+                guaranteed_count += int(np.count_nonzero(current_guaranteed))
+                is_up |= current_guaranteed
+                guaranteed[active] = ~is_up
+            else:
+                won += int(np.count_nonzero(is_up))
+                lost += int(np.count_nonzero(~is_up))
+            target = is_up
+            if self.target_probability < 1:
+                target = is_up & (self._rng.random(size) < self.target_probability)
+            if self.max_fate_points:
+                forced = ~target & (fate[active] >= self.max_fate_points)
+                fate_count += int(np.count_nonzero(forced))
+                target = target | forced
+                fate[active] = np.where(target, 0, fate[active] + 1)
+            got[active] += target
+            active = active[got[active] < copies]
+        return SimulationResult(pulls, five_stars, won, lost, guaranteed_count, fate_count)
+
+    def simulate(self, copies: int = 1, pity: int = 0, guarantee: bool = False, fate_points: int = 0,
+                 trials: int = 1000000, batch_size: int = 250000) -> SimulationResult:
+        """
+        :param copies: 需要获得的数量
+        :param pity: 已经垫了的抽数
+        :param guarantee: 是否处于大保底
+        :param fate_points: 当前命定值
+        :param trials: 模拟次数
+        :param batch_size: 每批模拟的次数 用于限制内存占用
+        :return: 模拟结果
+        """
+        if copies < 1:
+            raise ValueError("copies must be greater than 0")
+        if not 0 <= pity < self.max_pity:
+            raise ValueError(f"pity must be between 0 and {self.max_pity - 1}")
+        results = [self._simulate_batch(min(batch_size, trials - start), copies, pity, guarantee, fate_points)
+                   for start in range(0, trials, batch_size)]
+        return SimulationResult(np.concatenate([result.pulls for result in results]),
+                                sum(result.five_stars for result in results),
+                                sum(result.won for result in results),
+                                sum(result.lost for result in results),
+                                sum(result.guaranteed for result in results),
+                                sum(result.fate for result in results))
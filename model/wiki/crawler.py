@@ -0,0 +1,92 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class CrawlerResult:
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.succeed: int = 0
+        self.failed: List[Tuple[str, BaseException]] = []
+
+    @property
+    def done(self) -> int:
+        return self.succeed + len(self.failed)
+
+
+class WikiCrawler:
+    """固定数量的 worker 从队列里取URL 保证同时一直有 concurrency 个请求在进行
+
+    每个页面解析完成后立即交给 on_result 处理 不需要等待整批完成
+    """
+
+    def __init__(self, concurrency: int = 8, retries: int = 3, backoff: float = 1.0):
+        """
+        :param concurrency: 同时进行的请求数
+        :param retries: 单个页面失败后的重试次数
+        :param backoff: 第一次重试前等待的秒数 之后每次翻倍
+        """
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+
+    async def _fetch_with_retry(self, url: str, fetch: Callable[[str], Awaitable[T]]) -> T:
+        for attempt in range(self.retries + 1):
+            try:
+                return await fetch(url)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt >= self.retries:
+                    raise
+                # 指数退避并加上随机抖动 避免所有 worker 同时重试
+                await asyncio.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    async def crawl(self, url_list: List[str], fetch: Callable[[str], Awaitable[T]],
+                    on_result: Callable[[str, T], Awaitable[None]],
+                    on_progress: Optional[Callable[[CrawlerResult], Awaitable[None]]] = None) -> CrawlerResult:
+        """
+        :param url_list: 需要获取的URL
+        :param fetch: 获取并解析单个页面
+        :param on_result: 每个页面解析成功后调用 用于把结果写入缓存
+        :param on_progress: 每完成一个页面后调用 用于报告进度 抛出的异常会被忽略
+        :return: 成功和失败的统计
+        """
+        result = CrawlerResult(len(url_list))
+        queue: asyncio.Queue = asyncio.Queue()
+        for url in url_list:
+            queue.put_nowait(url)
+
+        async def worker():
+            while True:
+                try:
+                    url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    data = await self._fetch_with_retry(url, fetch)
+                    await on_result(url, data)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    result.failed.append((url, exc))
+                else:
+                    result.succeed += 1
+                if on_progress is not None:
+                    try:
+                        await on_progress(result)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        # 报告进度失败不能中断抓取
+                        pass
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(url_list)))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        return result
@@ -1,4 +1,9 @@
 import re
+from typing import Optional
+
+import httpx
+from lxml import html as lxml_html
+from lxml.html import HtmlElement
 
 ID_RGX = re.compile(r"/db/[^.]+_(?P<id>\d+)")
 
@@ -25,3 +30,26 @@ def get_id_form_url(url: str):
         return int(entries.get('id'))
     except (IndexError, ValueError, TypeError):
         return -1
+
+
+async def get_page(client: httpx.AsyncClient, url: str, etag: Optional[str] = None) -> httpx.Response:
+    """获取页面 带上 ETag 时服务器可以返回 304 表示页面没有变化"""
+    headers = {"If-None-Match": etag} if etag else None
+    return await client.get(url, headers=headers)
+
+
+def has_class(class_name: str) -> str:
+    """生成与 BeautifulSoup 的 {"class": class_name} 等价的 XPath 条件"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def parse_html(text: str) -> HtmlElement:
+    return lxml_html.fromstring(text)
+
+
+def xpath_first(element: HtmlElement, path: str) -> HtmlElement:
+    """返回第一个匹配的元素 找不到时抛出 ValueError 而不是返回 None"""
+    result = element.xpath(path)
+    if not result:
+        raise ValueError(f"找不到元素 {path}")
+    return result[0]
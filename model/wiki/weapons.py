@@ -1,12 +1,21 @@
 import os
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
 import httpx
 import ujson
 from bs4 import BeautifulSoup
 
-from .helpers import get_headers, get_id_form_url
+from .helpers import get_headers, get_id_form_url, has_class, parse_html, xpath_first
+
+
+@lru_cache()
+def load_metadata(name: str) -> dict:
+    """读取升级材料数据 每个进程只读取一次"""
+    path = os.path.join(os.path.dirname(__file__), "metadata", f"{name}.json")
+    with open(path, "r", encoding="utf-8") as f:
+        return ujson.load(f)
 
 
 class WeaponType(Enum):
@@ -45,16 +54,9 @@ class Weapons:
 
     def __init__(self):
         self.client = httpx.AsyncClient(headers=get_headers())
-        project_path = os.path.dirname(__file__)
-        characters_file = os.path.join(project_path, "metadata", "ascension.json")
-        monster_file = os.path.join(project_path, "metadata", "monster.json")
-        elite_file = os.path.join(project_path, "metadata", "elite.json")
-        with open(characters_file, "r", encoding="utf-8") as f:
-            self._ascension_json: dict = ujson.load(f)
-        with open(monster_file, "r", encoding="utf-8") as f:
-            self._monster_json: dict = ujson.load(f)
-        with open(elite_file, "r", encoding="utf-8") as f:
-            self._elite_json: dict = ujson.load(f)
+        self._ascension_json: dict = load_metadata("ascension")
+        self._monster_json: dict = load_metadata("monster")
+        self._elite_json: dict = load_metadata("elite")
 
     async def _get_soup(self, url: str) -> Optional[BeautifulSoup]:
         request = await self.client.get(url)
@@ -93,6 +95,7 @@ class Weapons:
     @staticmethod
     def get_weapon_info_template():
         weapon_info_dict = {
+            "id": 0,
             "name": "",
             "description": "",
             "source_img": "",
@@ -140,62 +143,13 @@ class Weapons:
         }
         return weapon_info_dict
 
-    async def get_weapon_info(self, url: str):
-        weapon_info_dict = self.get_weapon_info_template()
-        soup = await self._get_soup(url)
-        weapon_content = soup.find("div", {"class": "wrappercont"})
-        data = weapon_content.find("div", {"class": "data_cont_wrapper", "style": "display: block"})
-        weapon_info = data.find("table", {"class": "item_main_table"})
-        weapon_name = weapon_content.find("div", {"class": "custom_title"}).text.replace("-", "").replace(" ", "")
-        weapon_info_dict["name"] = weapon_name
-        weapon_info_row = weapon_info.find_all("tr")
-        for weapon_info_ in weapon_info_row:
-            content = weapon_info_.find_all("td")
-            if len(content) == 3:  # 第一行会有三个td，其中一个td是武器图片
-                weapon_info_dict["source_img"] = self.ROOT_URL + content[0].find("img",
-                                                                                 {"class": "itempic lazy"})["data-src"]
-                weapon_info_dict["type"]["name"] = content[2].text
-                weapon_info_dict["type"]["icon"] = self.get_weapon_type(content[2].text)
-            elif len(content) == 2:
-                if content[0].text == "Rarity":
-                    weapon_info_dict["star"]["value"] = len(
-                        content[1].find_all("div", {"class": "sea_char_stars_wrap"}))
-                elif content[0].text == "Special (passive) Ability":
-                    weapon_info_dict["passive_ability"]["name"] = content[1].text
-                elif content[0].text == "Special (passive) Ability Description":
-                    weapon_info_dict["passive_ability"]["description"] = content[1].text
-                elif content[0].text == "In-game Description":
-                    weapon_info_dict["description"] = content[1].text
-                elif content[0].text == "Secondary Stat":
-                    weapon_info_dict["secondary"]["name"] = content[1].text
-
-        stat_table = data.find("span", {"class": "item_secondary_title"},
-                               string=" Stat Progression ").find_next_sibling()
-        stat_table_row = stat_table.find_all("tr")
-        for stat_table_ in stat_table_row:
-            content = stat_table_.find_all("td")
-            # 通过等级判断
-            if content[0].text == "1":
-                weapon_info_dict["atk"]["min"] = int(content[1].text)
-                weapon_info_dict["secondary"]["min"] = float(content[2].text)
-            elif content[0].text == "80+":
-                item_hrefs = content[3].find_all("a")
-                for item_href in item_hrefs:
-                    item_id = get_id_form_url(item_href["href"])
-                    ascension = self.get_ascension(str(item_id))
-                    if ascension.get("name") is not None:
-                        weapon_info_dict["materials"]["ascension"] = ascension
-                    monster = self.get_monster(str(item_id))
-                    if monster.get("name") is not None:
-                        weapon_info_dict["materials"]["monster"] = monster
-                    elite = self.get_elite(str(item_id))
-                    if elite.get("name") is not None:
-                        weapon_info_dict["materials"]["elite"] = elite
-            elif content[0].text == "90":
-                weapon_info_dict["atk"]["max"] = int(content[1].text)
-                weapon_info_dict["secondary"]["max"] = float(content[2].text)
+    async def get_weapon_html(self, url: str) -> str:
+        request = await self.client.get(url)
+        return request.text
 
-        return weapon_info_dict
+    async def get_weapon_info(self, url: str):
+        html = await self.get_weapon_html(url)
+        return parse_weapon_info(html, url)
 
     def get_ascension(self, item_id: str):
         return self._ascension_json.get(item_id, {})
@@ -208,3 +162,68 @@ class Weapons:
 
     def get_weapon_type(self, weapon_type: str):
         return self.WEAPON_TYPE_MAPPING.get(weapon_type, "")
+
+
+def _set_materials(weapon_info_dict: dict, item_id: str):
+    ascension = load_metadata("ascension").get(item_id, {})
+    if ascension.get("name") is not None:
+        weapon_info_dict["materials"]["ascension"] = ascension
+    monster = load_metadata("monster").get(item_id, {})
+    if monster.get("name") is not None:
+        weapon_info_dict["materials"]["monster"] = monster
+    elite = load_metadata("elite").get(item_id, {})
+    if elite.get("name") is not None:
+        weapon_info_dict["materials"]["elite"] = elite
+
+
+def parse_weapon_info(html: str, url: str) -> dict:
+    """使用 lxml XPath 解析武器页面 不经过 BeautifulSoup 建树
+
+    这是一个纯函数 可以放到进程池中执行
+    """
+    weapon_info_dict = Weapons.get_weapon_info_template()
+    root = parse_html(html)
+    weapon_content = xpath_first(root, f"//div[{has_class('wrappercont')}]")
+    data = xpath_first(weapon_content, f".//div[{has_class('data_cont_wrapper')} and @style='display: block']")
+    weapon_info = xpath_first(data, f".//table[{has_class('item_main_table')}]")
+    weapon_name = xpath_first(weapon_content, f".//div[{has_class('custom_title')}]").text_content()
+    weapon_info_dict["name"] = weapon_name.replace("-", "").replace(" ", "")
+    weapon_info_dict["id"] = get_id_form_url(url)
+    for weapon_info_row in weapon_info.iterdescendants("tr"):
+        content = weapon_info_row.xpath(".//td")
+        if len(content) == 3:  # 第一行会有三个td，其中一个td是武器图片
+            img = xpath_first(content[0], ".//img[@class='itempic lazy']")
+            weapon_info_dict["source_img"] = Weapons.ROOT_URL + img.get("data-src")
+            type_name = content[2].text_content()
+            weapon_info_dict["type"]["name"] = type_name
+            weapon_info_dict["type"]["icon"] = Weapons.WEAPON_TYPE_MAPPING.get(type_name, "")
+        elif len(content) == 2:
+            title = content[0].text_content()
+            if title == "Rarity":
+                weapon_info_dict["star"]["value"] = len(content[1].xpath(f".//div[{has_class('sea_char_stars_wrap')}]"))
+            elif title == "Special (passive) Ability":
+                weapon_info_dict["passive_ability"]["name"] = content[1].text_content()
+            elif title == "Special (passive) Ability Description":
+                weapon_info_dict["passive_ability"]["description"] = content[1].text_content()
+            elif title == "In-game Description":
+                weapon_info_dict["description"] = content[1].text_content()
+            elif title == "Secondary Stat":
+                weapon_info_dict["secondary"]["name"] = content[1].text_content()
+
+    stat_table = xpath_first(data, f".//span[{has_class('item_secondary_title')}][.=' Stat Progression ']"
+                                   f"/following-sibling::*[1]")
+    for stat_table_row in stat_table.iterdescendants("tr"):
+        content = stat_table_row.xpath(".//td")
+        # 通过等级判断
+        level = content[0].text_content()
+        if level == "1":
+            weapon_info_dict["atk"]["min"] = int(content[1].text_content())
+            weapon_info_dict["secondary"]["min"] = float(content[2].text_content())
+        elif level == "80+":
+            for href in content[3].xpath(".//a/@href"):
+                _set_materials(weapon_info_dict, str(get_id_form_url(href)))
+        elif level == "90":
+            weapon_info_dict["atk"]["max"] = int(content[1].text_content())
+            weapon_info_dict["secondary"]["max"] = float(content[2].text_content())
+
+    return weapon_info_dict
@@ -4,6 +4,7 @@ from telegram.constants import ChatAction
 from telegram.ext import CommandHandler, MessageHandler, filters, CallbackContext
 
 from app.cookies.service import CookiesService
+from app.record import RecordService
 from app.template.service import TemplateService
 from app.user import UserService
 from app.user.repositories import UserNotFoundError
@@ -22,8 +23,9 @@ class Abyss(BasePlugins):
 
     @inject
     def __init__(self, user_service: UserService = None, cookies_service: CookiesService = None,
-                 template_service: TemplateService = None):
+                 template_service: TemplateService = None, record_service: RecordService = None):
         self.template_service = template_service
+        self.record_service = record_service
         self.cookies_service = cookies_service
         self.user_service = user_service
 
@@ -46,7 +48,7 @@ class Abyss(BasePlugins):
 
     async def _get_abyss_data(self, client: Client) -> dict:
         uid = client.uid
-        spiral_abyss_info = await client.get_spiral_abyss(uid)
+        spiral_abyss_info = await self.record_service.get_spiral_abyss(client, uid)
         if not spiral_abyss_info.unlocked:
             raise ValueError("unlocked is false")
         ranks = spiral_abyss_info.ranks
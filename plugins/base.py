@@ -2,30 +2,26 @@ import datetime
 from typing import Callable
 
 from telegram import Update, ReplyKeyboardRemove
-from telegram.error import BadRequest
 from telegram.ext import CallbackContext, ConversationHandler, filters
 
 from app.admin import BotAdminService
+from app.cleaner import CleanerService
+from app.cleaner.service import delete_message
 from logger import Log
 from utils.app.inject import inject
 
 
 async def clean_message(context: CallbackContext, chat_id: int, message_id: int) -> bool:
-    try:
-        await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
-        return True
-    except BadRequest as error:
-        if "not found" in str(error):
-            Log.warning(f"定时删除消息 chat_id[{chat_id}] message_id[{message_id}]失败 消息不存在")
-        elif "Message can't be deleted" in str(error):
-            Log.warning(f"定时删除消息 chat_id[{chat_id}] message_id[{message_id}]失败 消息无法删除 可能是没有授权")
-        else:
-            Log.warning(f"定时删除消息 chat_id[{chat_id}] message_id[{message_id}]失败 \n", error)
-    return False
+    return await delete_message(context.bot, chat_id, message_id)
 
 
+@inject
 def add_delete_message_job(context: CallbackContext, chat_id: int, message_id: int,
-                           delete_seconds: int = 60):
+                           delete_seconds: int = 60, cleaner_service: CleanerService = None):
+    if cleaner_service is not None:
+        cleaner_service.add(chat_id, message_id, delete_seconds)
+        return
+    # CleanerService 没有注册时 每条消息使用一个 APScheduler 任务
     context.job_queue.scheduler.add_job(clean_message, "date",
                                         id=f"{chat_id}|{message_id}|auto_clean_message",
                                         name=f"{chat_id}|{message_id}|auto_clean_message",
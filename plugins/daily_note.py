@@ -8,6 +8,7 @@ from telegram.ext import CommandHandler, MessageHandler, ConversationHandler, fi
     CallbackContext
 
 from app.cookies.service import CookiesService
+from app.record import RecordService
 from app.template import TemplateService
 from app.user import UserService
 from app.user.repositories import UserNotFoundError
@@ -28,8 +29,9 @@ class DailyNote(BasePlugins):
 
     @inject
     def __init__(self, user_service: UserService = None, cookies_service: CookiesService = None,
-                 template_service: TemplateService = None):
+                 template_service: TemplateService = None, record_service: RecordService = None):
         self.template_service = template_service
+        self.record_service = record_service
         self.cookies_service = cookies_service
         self.user_service = user_service
         self.current_dir = os.getcwd()
@@ -41,7 +43,7 @@ class DailyNote(BasePlugins):
                 MessageHandler(filters.Regex(r"^当前状态(.*)"), daily_note.command_start, block=True)]
 
     async def _get_daily_note(self, client) -> bytes:
-        daily_info = await client.get_genshin_notes(client.uid)
+        daily_info = await self.record_service.get_genshin_notes(client)
         day = datetime.datetime.now().strftime("%m-%d %H:%M") + " 星期" + "一二三四五六日"[datetime.datetime.now().weekday()]
         resin_recovery_time = daily_info.resin_recovery_time.strftime("%m-%d %H:%M") if \
             daily_info.max_resin - daily_info.current_resin else None
@@ -1,5 +1,6 @@
 from utils.plugins.manager import listener_plugins_class
 from .gacha import Gacha
+from .simulate import GachaSimulate
 
 
 @listener_plugins_class()
@@ -5,11 +5,12 @@ from telegram import Update
 from telegram.constants import ChatAction
 from telegram.ext import filters, CommandHandler, MessageHandler, CallbackContext
 
+from app.gacha import GachaService
 from app.template import TemplateService
 from logger import Log
-from model.apihelper.gacha import GachaInfo
+from model.gacha.atlas import sprite_style
+from model.gacha.manager import GachaManager
 from plugins.base import BasePlugins
-from plugins.gacha.wish import WishCountInfo, get_one
 from utils.app.inject import inject
 from utils.bot import get_all_args
 from utils.decorators.error import error_callable
@@ -33,32 +34,17 @@ class Gacha(BasePlugins):
         ]
 
     @inject
-    def __init__(self, template_service: TemplateService = None):
-        self.gacha = GachaInfo()
+    def __init__(self, template_service: TemplateService = None, gacha_service: GachaService = None):
+        self.gacha_service = gacha_service
         self.template_service = template_service
         self.browser: launch = None
         self.current_dir = os.getcwd()
         self.resources_dir = os.path.join(self.current_dir, "resources")
         self.character_gacha_card = {}
         self.user_time = {}
+        self.gacha_manager = GachaManager()
 
-    async def gacha_info(self, gacha_name: str = "角色活动", default: bool = False):
-        gacha_list_info = await self.gacha.get_gacha_list_info()
-        gacha_id = ""
-        for gacha in gacha_list_info.data["list"]:
-            if gacha["gacha_name"] == gacha_name:
-                gacha_id = gacha["gacha_id"]
-        if gacha_id == "":
-            if default and len(gacha_list_info.data["list"]) > 0:
-                gacha_id = gacha_list_info.data["list"][0]["gacha_id"]
-            else:
-                return {}
-        gacha_info = await self.gacha.get_gacha_info(gacha_id)
-        gacha_info["gacha_id"] = gacha_id
-        return gacha_info
-
-    @restricts(filters.ChatType.GROUPS, restricts_time=20, try_delete_message=True)
-    @restricts(filters.ChatType.PRIVATE)
+    @restricts(restricts_time=20, private_restricts_time=5, try_delete_message=True)
     @error_callable
     async def command_start(self, update: Update, context: CallbackContext) -> None:
         message = update.message
@@ -72,32 +58,31 @@ class Gacha(BasePlugins):
                     if key == gacha_name:
                         gacha_name = value
                         break
-            gacha_info = await self.gacha_info(gacha_name)
-            if gacha_info.get("gacha_id") is None:
-                await message.reply_text(f"没有找到名为 {gacha_name} 的卡池")
-                return
-        else:
-            gacha_info = await self.gacha_info(default=True)
+        banner_data = await self.gacha_service.get_banner(gacha_name)
+        if banner_data is None:
+            await message.reply_text(f"没有找到名为 {gacha_name} 的卡池")
+            return
         Log.info(f"用户 {user.full_name}[{user.id}] 抽卡模拟器命令请求 || 参数 {gacha_name}")
-        # 用户数据储存和处理
-        gacha_id: str = gacha_info["gacha_id"]
-        user_gacha: dict[str, WishCountInfo] = context.user_data.get("gacha")
-        if user_gacha is None:
-            user_gacha = context.user_data["gacha"] = {}
-        user_gacha_count: WishCountInfo = user_gacha.get(gacha_id)
-        if user_gacha_count is None:
-            user_gacha_count = user_gacha[gacha_id] = WishCountInfo(user_id=user.id)
-        # 用户数据储存和处理
+        banner, item_types = banner_data.banner, banner_data.item_types
+        banner_info = await self.gacha_service.get_pity(user.id, banner)
+        pulls = self.gacha_manager.doPulls(banner, banner_info, 10)
+        await self.gacha_service.set_pity(user.id, banner, banner_info)
         await message.reply_chat_action(ChatAction.TYPING)
         data = {
             "_res_path": f"file://{self.resources_dir}",
             "name": f"{user.full_name}",
             "info": gacha_name,
-            "poolName": gacha_info["title"],
+            "poolName": banner_data.title,
             "items": [],
         }
-        for _ in range(10):
-            item = get_one(user_gacha_count, gacha_info)
+        for item_name, rank in pulls:
+            item = {"item_type": item_types.get(item_name, ""), "item_name": item_name, "rank": rank, "style": ""}
+            if banner_data.atlas is not None:
+                # 与 gacha.css 中图片的大小一致 角色按高度缩放 武器按宽度缩放
+                if item["item_type"] == "武器":
+                    item["style"] = sprite_style(banner_data.atlas, item_name, width=110)
+                else:
+                    item["style"] = sprite_style(banner_data.atlas, item_name, height=448)
             # 下面为忽略的代码，因为metadata未完善，具体武器和角色类型无法显示
             # item_name = item["item_name"]
             # item_type = item["item_type"]
@@ -114,7 +99,7 @@ class Gacha(BasePlugins):
 
         data["items"].sort(key=take_rang, reverse=True)
         await message.reply_chat_action(ChatAction.UPLOAD_PHOTO)
-        # 因为 gacha_info["title"] 返回的是 HTML 标签 尝试关闭自动转义
+        # 因为卡池的 title 返回的是 HTML 标签 尝试关闭自动转义
         png_data = await self.template_service.render('genshin/gacha', "gacha.html", data,
                                                       {"width": 1157, "height": 603}, False, False)
 
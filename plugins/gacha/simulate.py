@@ -0,0 +1,124 @@
+import json
+
+from telegram import Update
+from telegram.constants import ChatAction
+from telegram.ext import filters, CommandHandler, MessageHandler, CallbackContext
+
+from app.executor import ExecutorService
+from app.template import TemplateService
+from logger import Log
+from model.gacha.banner import BannerType, create_banner
+from model.gacha.simulator import GachaSimulator, SimulationResult
+from plugins.base import BasePlugins
+from utils.app.inject import inject
+from utils.bot import get_all_args
+from utils.decorators.error import error_callable
+from utils.decorators.restricts import restricts
+from utils.plugins.manager import listener_plugins_class
+
+
+@listener_plugins_class()
+class GachaSimulate(BasePlugins):
+    """抽卡期望计算 模拟一百万次 统计需要多少抽才能获得想要的五星"""
+
+    TRIALS = 1000000
+    HELP_TEXT = "用法：/pulls [角色|武器] [数量] [已垫抽数] [大保底|命定值]\n" \
+                "例如 /pulls 角色 7 20 大保底 计算已垫20抽并且处于大保底时抽到满命需要多少抽"
+
+    @inject
+    def __init__(self, template_service: TemplateService = None, executor_service: ExecutorService = None):
+        self.template_service = template_service
+        self.executor_service = executor_service
+
+    @classmethod
+    def create_handlers(cls) -> list:
+        gacha_simulate = cls()
+        return [
+            CommandHandler("pulls", gacha_simulate.command_start, block=False),
+            MessageHandler(filters.Regex("^抽卡期望(.*)"), gacha_simulate.command_start, block=False),
+        ]
+
+    @staticmethod
+    def _create_simulator(is_weapon: bool) -> GachaSimulator:
+        # 与 GachaManager 使用相同的卡池概率 武器卡池有两把UP武器
+        if is_weapon:
+            banner = create_banner(BannerType.WEAPON)
+            return GachaSimulator(banner.weights5, banner.eventChance5 / 100, target_probability=0.5,
+                                  max_fate_points=banner.wishMaxProgress)
+        banner = create_banner(BannerType.EVENT)
+        return GachaSimulator(banner.weights5, banner.eventChance5 / 100)
+
+    @error_callable
+    @restricts(restricts_time=20, private_restricts_time=5, try_delete_message=True)
+    async def command_start(self, update: Update, context: CallbackContext) -> None:
+        message = update.message
+        user = update.effective_user
+        args = get_all_args(context)
+        is_weapon = False
+        guarantee = False
+        numbers = []
+        for arg in args:
+            if arg in ("武器", "weapon"):
+                is_weapon = True
+            elif arg in ("大保底", "保底"):
+                guarantee = True
+            elif arg.isdigit():
+                numbers.append(int(arg))
+        copies = numbers[0] if len(numbers) >= 1 else 1
+        pity = numbers[1] if len(numbers) >= 2 else 0
+        fate_points = numbers[2] if len(numbers) >= 3 else 0
+        simulator = self._create_simulator(is_weapon)
+        if not 1 <= copies <= (5 if is_weapon else 7) or not 0 <= pity < simulator.max_pity or \
+                not 0 <= fate_points <= simulator.max_fate_points:
+            await message.reply_text(self.HELP_TEXT)
+            return
+        Log.info(f"用户 {user.full_name}[{user.id}] 抽卡期望命令请求 || 参数 {args}")
+        await message.reply_chat_action(ChatAction.TYPING)
+        # NumPy 在计算时会释放 GIL 在线程中执行即可 每次请求使用独立的随机数生成器
+        result: SimulationResult = await self.executor_service.run_in_thread(
+            simulator.simulate, copies, pity, guarantee, fate_points, self.TRIALS)
+        target = f"{copies}把UP武器" if is_weapon else f"{copies}个UP角色"
+        condition = f"已垫{pity}抽"
+        if guarantee:
+            condition += " 大保底"
+        if is_weapon:
+            condition += f" 命定值{fate_points}"
+        histogram = [{"pulls": start, "probability": round(probability * 100, 3)}
+                     for start, probability in result.histogram(10)]
+        evaluate = """const { Column } = G2Plot;
+    const data = JSON.parse(`""" + json.dumps(histogram) + """`);
+    const columnPlot = new Column("chartContainer", {
+      renderer: "svg",
+      animation: false,
+      data: data,
+      xField: "pulls",
+      yField: "probability",
+      color: "#d3bc8e",
+      meta: {
+        pulls: { alias: "抽数" },
+        probability: { alias: "概率(%)" },
+      },
+      xAxis: { label: { style: { fontFamily: "tttgbnumber" } } },
+      yAxis: { label: { style: { fontFamily: "tttgbnumber" } } },
+    });
+    columnPlot.render();"""
+        data = {
+            "name": user.full_name,
+            "target": target,
+            "condition": condition,
+            "trials": self.TRIALS,
+            "mean": round(result.mean, 1),
+            "percentiles": result.percentiles(),
+            "win_rate": round(result.win_rate * 100, 2),
+            "five_stars": round(result.five_stars / result.trials, 2),
+            "guaranteed": round(result.guaranteed / result.trials, 2),
+            "fate": round(result.fate / result.trials, 2),
+            "is_weapon": is_weapon,
+        }
+        await message.reply_chat_action(ChatAction.UPLOAD_PHOTO)
+        png_data = await self.template_service.render('genshin/gacha', "simulate.html", data,
+                                                      {"width": 700, "height": 600}, evaluate=evaluate)
+        reply_message = await message.reply_photo(png_data)
+        if filters.ChatType.GROUPS.filter(message):
+            self._add_delete_message_job(context, reply_message.chat_id, reply_message.message_id, 300)
+            self._add_delete_message_job(context, message.chat_id, message.message_id, 300)
@@ -9,6 +9,7 @@ from telegram.constants import ChatAction
 from telegram.ext import CallbackContext, CommandHandler, MessageHandler, ConversationHandler, filters
 
 from app.cookies import CookiesService
+from app.record import RecordService
 from app.template import TemplateService
 from app.user import UserService
 from app.user.repositories import UserNotFoundError
@@ -57,8 +58,9 @@ class Ledger(BasePlugins):
 
     @inject
     def __init__(self, user_service: UserService = None, cookies_service: CookiesService = None,
-                 template_service: TemplateService = None):
+                 template_service: TemplateService = None, record_service: RecordService = None):
         self.template_service = template_service
+        self.record_service = record_service
         self.cookies_service = cookies_service
         self.user_service = user_service
         self.current_dir = os.getcwd()
@@ -71,7 +73,7 @@ class Ledger(BasePlugins):
 
     async def _start_get_ledger(self, client, month=None) -> bytes:
         try:
-            diary_info = await client.get_diary(client.uid, month=month)
+            diary_info = await self.record_service.get_diary(client, month=month)
         except GenshinException as error:
             raise error
         color = ["#73a9c6", "#d56565", "#70b2b4", "#bd9a5a", "#739970", "#7a6da7", "#597ea0"]
@@ -5,8 +5,10 @@ from telegram import Update
 from telegram.constants import ChatAction
 from telegram.ext import CommandHandler, MessageHandler, filters, CallbackContext
 
+from app.executor import ExecutorService
 from logger import Log
 from plugins.base import BasePlugins
+from utils.app.inject import inject
 from utils.decorators.error import error_callable
 from utils.decorators.restricts import restricts
 from .model import MapHelper
@@ -15,9 +17,10 @@ from .model import MapHelper
 class Map(BasePlugins):
     """支持资源点查询"""
 
-    def __init__(self):
+    @inject
+    def __init__(self, executor_service: ExecutorService = None):
         self.init_resource_map = False
-        self.map_helper = MapHelper()
+        self.map_helper = MapHelper(executor_service)
 
     @classmethod
     def create_handlers(cls) -> list:
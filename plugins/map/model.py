@@ -1,26 +1,68 @@
 import os
 import time
 from io import BytesIO
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 
 import httpx
 import ujson
 from PIL import Image, ImageMath
 
+from app.executor import ExecutorService
 from utils.helpers import REQUEST_HEADERS
 
 Image.MAX_IMAGE_PIXELS = None
 
 ZOOM = 0.5
+RESOURCE_ICON_SIZE = (int(150 * ZOOM), int(150 * ZOOM))
 RESOURCE_ICON_OFFSET = (-int(150 * 0.5 * ZOOM), -int(150 * ZOOM))
 
 
+def compose_icon(icon: Image, box: Image, box_alpha: Image) -> Image:
+    """给资源图标加上边框 在进程池中执行
+    :param icon: 米游社原始图标
+    :param box: 边框
+    :param box_alpha: 边框遮罩
+    :return: 合成好边框的RGBA图标
+    """
+    icon = icon.resize((150, 150))
+
+    try:
+        icon_alpha = icon.getchannel("A")
+        icon_alpha = ImageMath.eval("convert(a*b/256, 'L')", a=icon_alpha, b=box_alpha)
+    except ValueError:
+        # 米游社的图有时候会没有alpha导致报错，这时候直接使用box_alpha当做alpha就行
+        icon_alpha = box_alpha
+
+    icon2 = Image.new("RGBA", (150, 150), "#00000000")
+    icon2.paste(icon, (0, -10))
+
+    bg = Image.new("RGBA", (150, 150), "#00000000")
+    bg.paste(icon2, mask=icon_alpha)
+    bg.paste(box, mask=box)
+    return bg
+
+
+def paste_and_encode(map_image: Image, resource_icon: Image, xy_list: List[Tuple[int, int]]) -> bytes:
+    """把资源图标贴到已经裁切好的地图上并编码为JPEG 在进程池中执行
+    :param map_image: 裁切后的地图
+    :param resource_icon: 缩放好的资源图标
+    :param xy_list: 以裁切后地图左上角为原点的资源点坐标
+    :return: JPEG 数据
+    """
+    for x, y in xy_list:
+        map_image.paste(resource_icon, (x + RESOURCE_ICON_OFFSET[0], y + RESOURCE_ICON_OFFSET[1]), resource_icon)
+    output = BytesIO()
+    map_image.save(output, format="JPEG")
+    return output.getvalue()
+
+
 class MapHelper:
     LABEL_URL = 'https://api-static.mihoyo.com/common/blackboard/ys_obc/v1/map/label/tree?app_sn=ys_obc'
     POINT_LIST_URL = 'https://api-static.mihoyo.com/common/blackboard/ys_obc/v1/map/point/list?map_id=2&app_sn=ys_obc'
     MAP_URL = 'https://api-static.mihoyo.com/common/map_user/ys_obc/v1/map/info?map_id=2&app_sn=ys_obc&lang=zh-cn'
 
-    def __init__(self, cache_dir_name: str = "cache"):
+    def __init__(self, executor_service: ExecutorService, cache_dir_name: str = "cache"):
+        self._executor_service = executor_service
         self._current_dir = os.getcwd()
         self._output_dir = os.path.join(self._current_dir, cache_dir_name)
         self._resources_icon_dir = os.path.join(self._current_dir, "resources", "icon")
@@ -74,6 +116,18 @@ class MapHelper:
         """map_icon
         """
 
+        self.resource_icons: Dict[str, Image] = {}
+        """这个字典保存所有资源类型已经缩放好的RGBA图标 在每次刷新资源列表时重建
+
+        "2": <PIL.Image.Image image mode=RGBA size=75x75>
+        """
+
+        # 图标边框和遮罩只需要解码一次
+        self._box = Image.open(os.path.join(self._resources_icon_dir, "box.png")).convert("RGBA")
+        self._box_alpha = Image.open(os.path.join(self._resources_icon_dir, "box_alpha.png")).getchannel("A")
+        self._default_icon = Image.open(os.path.join(self._resources_icon_dir, "0.png")) \
+            .convert("RGBA").resize(RESOURCE_ICON_SIZE)
+
     async def download_icon(self, url):
         """下载图片 返回Image对象
         :param url:
@@ -145,51 +199,38 @@ class MapHelper:
         :return:
         """
         label_data = await self.download_json(self.LABEL_URL)
+        resource_icons = {}
         for label in label_data["data"]["tree"]:
             self.all_resource_type[str(label["id"])] = label
             for sublist in label["children"]:
                 self.all_resource_type[str(sublist["id"])] = sublist
                 self.can_query_type_list[sublist["name"]] = str(sublist["id"])
-                await self.up_icon_image(sublist)
+                icon = await self.up_icon_image(sublist)
+                resource_icons[str(sublist["id"])] = icon.resize(RESOURCE_ICON_SIZE)
             label["children"] = []
+        self.resource_icons = resource_icons
         test = await self.download_json(self.POINT_LIST_URL)
         self.all_resource_point_list = test["data"]["point_list"]
         self.date = time.strftime("%d")
 
-    async def up_icon_image(self, sublist: dict):
+    async def up_icon_image(self, sublist: dict) -> Image:
         """检查是否有图标，没有图标下载保存到本地
         :param sublist:
-        :return:
+        :return: 合成好边框的RGBA图标
         """
         icon_id = sublist["id"]
         icon_path = os.path.join(self._cache_dir, f"{icon_id}.png")
 
-        if not os.path.exists(icon_path):
-            icon_url = sublist["icon"]
-            icon = await self.download_icon(icon_url)
-            icon = icon.resize((150, 150))
-
-            box_alpha = Image.open(
-                os.path.join(os.path.dirname(__file__), os.path.pardir,
-                             "resources", "icon", "box_alpha.png")).getchannel("A")
-            box = Image.open(os.path.join(os.path.dirname(__file__), os.path.pardir, "resources", "icon", "box.png"))
-
-            try:
-                icon_alpha = icon.getchannel("A")
-                icon_alpha = ImageMath.eval("convert(a*b/256, 'L')", a=icon_alpha, b=box_alpha)
-            except ValueError:
-                # 米游社的图有时候会没有alpha导致报错，这时候直接使用box_alpha当做alpha就行
-                icon_alpha = box_alpha
-
-            icon2 = Image.new("RGBA", (150, 150), "#00000000")
-            icon2.paste(icon, (0, -10))
+        if os.path.exists(icon_path):
+            return Image.open(icon_path).convert("RGBA")
 
-            bg = Image.new("RGBA", (150, 150), "#00000000")
-            bg.paste(icon2, mask=icon_alpha)
-            bg.paste(box, mask=box)
+        icon_url = sublist["icon"]
+        icon = await self.download_icon(icon_url)
+        bg = await self._executor_service.run(compose_icon, icon, self._box, self._box_alpha)
 
-            with open(icon_path, "wb") as icon_file:
-                bg.save(icon_file)
+        with open(icon_path, "wb") as icon_file:
+            bg.save(icon_file)
+        return bg
 
     async def get_resource_map_mes(self, name):
         if self.date != time.strftime("%d"):
@@ -197,11 +238,12 @@ class MapHelper:
         if name not in self.can_query_type_list:
             return f"派蒙还不知道 {name} 在哪里呢，可以发送 `/map list` 查看资源列表"
         resource_id = self.can_query_type_list[name]
-        map_res = ResourceMap(self.all_resource_point_list, self.map_icon, self.center, resource_id)
+        resource_icon = self.resource_icons.get(resource_id, self._default_icon)
+        map_res = ResourceMap(self.all_resource_point_list, self.map_icon, self.center, resource_id, resource_icon)
         count = map_res.get_resource_count()
         if not count:
             return f"派蒙没有找到 {name} 的位置，可能米游社wiki还没更新"
-        map_res.gen_jpg()
+        await map_res.gen_jpg(self._executor_service)
         return f"派蒙一共找到 {name} 的 {count} 个位置点\n* 数据来源于米游社wiki"
 
     def get_resource_list_mes(self):
@@ -226,11 +268,13 @@ class MapHelper:
 
 class ResourceMap:
 
-    def __init__(self, all_resource_point_list: List[dict], map_icon: Image, center: List[float], resource_id: int):
+    def __init__(self, all_resource_point_list: List[dict], map_icon: Image, center: List[float], resource_id: str,
+                 resource_icon: Image):
         self.all_resource_point_list = all_resource_point_list
         self.resource_id = resource_id
         self.center = center
-        self.map_image = map_icon.copy()
+        # crop 会返回新的图片 不需要复制整张大地图
+        self.map_image = map_icon
         self.map_size = self.map_image.size
         # 地图要要裁切的左上角和右下角坐标
         # 这里初始化为地图的大小
@@ -238,18 +282,10 @@ class ResourceMap:
         self.y_start = self.map_size[1]
         self.x_end = 0
         self.y_end = 0
-        resource_icon = Image.open(self.get_icon_path())
-        self.resource_icon = resource_icon.resize((int(150 * ZOOM), int(150 * ZOOM)))
+        # 图标由 MapHelper 预先解码并缩放好 这里直接使用
+        self.resource_icon = resource_icon
         self.resource_xy_list = self.get_resource_point_list()
 
-    def get_icon_path(self):
-        # 检查有没有图标，有返回正确图标，没有返回默认图标
-        icon_path = os.path.join(os.path.dirname(__file__), os.path.pardir,
-                                 "resources", "icon", f"{self.resource_id}.png")
-        if os.path.exists(icon_path):
-            return icon_path
-        return os.path.join(os.path.dirname(__file__), os.path.pardir, "resources", "icon", "0.png")
-
     def get_resource_point_list(self):
         temp_list = []
         for resource_point in self.all_resource_point_list:
@@ -260,14 +296,9 @@ class ResourceMap:
                 temp_list.append((int(x), int(y)))
         return temp_list
 
-    def paste(self):
-        for x, y in self.resource_xy_list:
-            # 把资源图片贴到地图上
-            # 这时地图已经裁切过了，要以裁切后的地图左上角为中心再转换一次坐标
-            x -= self.x_start
-            y -= self.y_start
-            self.map_image.paste(self.resource_icon, (x + RESOURCE_ICON_OFFSET[0], y + RESOURCE_ICON_OFFSET[1]),
-                                 self.resource_icon)
+    def get_paste_xy_list(self) -> List[Tuple[int, int]]:
+        # 这时地图已经裁切过了，要以裁切后的地图左上角为中心再转换一次坐标
+        return [(x - self.x_start, y - self.y_start) for x, y in self.resource_xy_list]
 
     def crop(self):
         # 把大地图裁切到只保留资源图标位置
@@ -297,14 +328,17 @@ class ResourceMap:
         self.map_image = self.map_image.crop((self.x_start, self.y_start,
                                               self.x_end, self.y_end))
 
-    def gen_jpg(self):
+    async def gen_jpg(self, executor_service: ExecutorService):
         if not self.resource_xy_list:
             return "没有这个资源的信息"
         if not os.path.exists("cache"):
             os.mkdir("cache")  # 查找 cache 目录 (缓存目录) 是否存在，如果不存在则创建
         self.crop()
-        self.paste()
-        self.map_image.save(f'cache{os.sep}map.jpg', format='JPEG')
+        # 贴图和JPEG编码比较耗时 放到进程池中执行
+        jpg_data = await executor_service.run(paste_and_encode, self.map_image, self.resource_icon,
+                                              self.get_paste_xy_list())
+        with open(f'cache{os.sep}map.jpg', "wb") as map_file:
+            map_file.write(jpg_data)
 
     def get_resource_count(self):
         return len(self.resource_xy_list)
\ No newline at end of file
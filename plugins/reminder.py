@@ -0,0 +1,70 @@
+from telegram import Update
+from telegram.ext import CommandHandler, CallbackContext, filters
+
+from app.cookies.service import CookiesService
+from app.reminder import ReminderService
+from app.user import UserService
+from app.user.repositories import UserNotFoundError
+from logger import Log
+from plugins.base import BasePlugins
+from utils.app.inject import inject
+from utils.decorators.error import error_callable
+from utils.decorators.restricts import restricts
+from utils.helpers import get_genshin_client
+from utils.plugins.manager import listener_plugins_class
+
+
+@listener_plugins_class()
+class Reminder(BasePlugins):
+    """树脂和探索派遣提醒"""
+
+    MAX_RESIN = 160
+
+    @inject
+    def __init__(self, user_service: UserService = None, cookies_service: CookiesService = None,
+                 reminder_service: ReminderService = None):
+        self.reminder_service = reminder_service
+        self.cookies_service = cookies_service
+        self.user_service = user_service
+
+    @classmethod
+    def create_handlers(cls) -> list:
+        reminder = cls()
+        return [CommandHandler('remind', reminder.command_start, filters=filters.ChatType.PRIVATE, block=True)]
+
+    @error_callable
+    @restricts()
+    async def command_start(self, update: Update, context: CallbackContext) -> None:
+        user = update.effective_user
+        message = update.message
+        args = context.args
+        Log.info(f"用户 {user.full_name}[{user.id}] 树脂提醒命令请求")
+        if len(args) >= 1 and args[0] in ("off", "关闭"):
+            await self.reminder_service.unsubscribe(user.id)
+            await message.reply_text("已经关闭树脂和探索派遣提醒")
+            return
+        if len(args) == 0:
+            reminder = await self.reminder_service.get_reminder(user.id)
+            if reminder is None:
+                await message.reply_text("还没有开启提醒\n"
+                                         f"发送 `/remind 数量` 在树脂达到该数量或探索派遣全部完成时提醒 数量最大为 {self.MAX_RESIN}\n"
+                                         "发送 `/remind off` 关闭提醒", parse_mode="Markdown")
+            else:
+                await message.reply_text(f"当前会在树脂达到 {reminder.resin_threshold} 或探索派遣全部完成时提醒\n"
+                                         "发送 `/remind off` 关闭提醒", parse_mode="Markdown")
+            return
+        try:
+            resin_threshold = int(args[0])
+        except ValueError:
+            resin_threshold = 0
+        if not 0 < resin_threshold <= self.MAX_RESIN:
+            await message.reply_text(f"树脂数量需要在 1 到 {self.MAX_RESIN} 之间")
+            return
+        try:
+            # 只检查账号是否绑定 实时便笺在提醒任务中获取
+            await get_genshin_client(user.id, self.user_service, self.cookies_service)
+        except UserNotFoundError:
+            await message.reply_text("未查询到账号信息，请先私聊派蒙绑定账号")
+            return
+        await self.reminder_service.subscribe(user.id, resin_threshold)
+        await message.reply_text(f"已经开启提醒 树脂达到 {resin_threshold} 或探索派遣全部完成时派蒙会私聊通知你哦~")
@@ -4,11 +4,13 @@ from telegram.ext import filters, ConversationHandler, CommandHandler, MessageHa
 
 from app.game import GameStrategyService
 from logger import Log
+from metadata.shortname import roles_alias
 from plugins.base import BasePlugins
 from utils.app.inject import inject
 from utils.bot import get_all_args
 from utils.decorators.error import error_callable
 from utils.decorators.restricts import restricts
+from utils.fuzzy import NameResolver
 from utils.helpers import url_to_file
 from utils.plugins.manager import listener_plugins_class
 
@@ -22,6 +24,7 @@ class Strategy(BasePlugins):
     @inject
     def __init__(self, game_strategy_service: GameStrategyService = None):
         self.game_strategy_service = game_strategy_service
+        self.roles_resolver = NameResolver(roles_alias)
 
     @classmethod
     def create_handlers(cls) -> list:
@@ -46,10 +49,16 @@ class Strategy(BasePlugins):
                 self._add_delete_message_job(context, message.chat_id, message.message_id)
                 self._add_delete_message_job(context, reply_message.chat_id, reply_message.message_id)
             return
+        candidates = self.roles_resolver.search(character_name)
+        # 只有一个候选时直接使用 否则让用户选择
+        if len(candidates) == 1:
+            character_name = candidates[0]
         url = await self.game_strategy_service.get_strategy(character_name)
         if url == "":
-            reply_message = await message.reply_text(f"没有找到 {character_name} 的攻略",
-                                                     reply_markup=InlineKeyboardMarkup(self.KEYBOARD))
+            text = f"没有找到 {character_name} 的攻略"
+            if len(candidates) > 1:
+                text += f"\n你是不是要找：{'、'.join(candidates)}"
+            reply_message = await message.reply_text(text, reply_markup=InlineKeyboardMarkup(self.KEYBOARD))
             if filters.ChatType.GROUPS.filter(reply_message):
                 self._add_delete_message_job(context, message.chat_id, message.message_id)
                 self._add_delete_message_job(context, reply_message.chat_id, reply_message.message_id)
@@ -7,6 +7,7 @@ from telegram.constants import ChatAction
 from telegram.ext import CallbackContext, CommandHandler, MessageHandler, ConversationHandler, filters
 
 from app.cookies.service import CookiesService
+from app.record import RecordService
 from app.template import TemplateService
 from app.user import UserService
 from app.user.repositories import UserNotFoundError
@@ -26,8 +27,10 @@ class Uid(BasePlugins):
     COMMAND_RESULT, = range(10200, 10201)
 
     @inject
-    def __init__(self, user_service: UserService, cookies_service: CookiesService, template_service: TemplateService):
+    def __init__(self, user_service: UserService, cookies_service: CookiesService, template_service: TemplateService,
+                 record_service: RecordService):
         self.template_service = template_service
+        self.record_service = record_service
         self.cookies_service = cookies_service
         self.user_service = user_service
         self.current_dir = os.getcwd()
@@ -42,7 +45,7 @@ class Uid(BasePlugins):
         if uid == -1:
             uid = client.uid
         try:
-            user_info = await client.get_genshin_user(uid)
+            user_info = await self.record_service.get_genshin_user(client, uid)
         except GenshinException as error:
             Log.warning("get_record_card请求失败 \n", error)
             raise error
@@ -51,9 +54,9 @@ class Uid(BasePlugins):
         try:
             # 查询的UID如果是自己的，会返回DataNotPublic，自己查不了自己可还行......
             if uid > 0:
-                record_card_info = await client.get_record_card(uid)
+                record_card_info = await self.record_service.get_record_card(client, uid)
             else:
-                record_card_info = await client.get_record_card()
+                record_card_info = await self.record_service.get_record_card(client)
         except DataNotPublic as error:
             Log.warning("get_record_card请求失败 查询的用户数据未公开 \n", error)
             nickname = uid
@@ -5,7 +5,6 @@ from telegram.ext import filters, CommandHandler, MessageHandler, CallbackContex
 from app.template import TemplateService
 from app.wiki.service import WikiService
 from logger import Log
-from metadata.shortname import weaponToName
 from plugins.base import BasePlugins
 from utils.app.inject import inject
 from utils.bot import get_all_args
@@ -49,15 +48,18 @@ class Weapon(BasePlugins):
                 self._add_delete_message_job(context, message.chat_id, message.message_id)
                 self._add_delete_message_job(context, reply_message.chat_id, reply_message.message_id)
             return
-        weapon_name = weaponToName(weapon_name)
-        weapons_list = await self.wiki_service.get_weapons_list()
-        for weapon in weapons_list:
-            if weapon["name"] == weapon_name:
-                weapon_data = weapon
-                break
-        else:
-            reply_message = await message.reply_text(f"没有找到 {weapon_name}",
-                                                     reply_markup=InlineKeyboardMarkup(self.KEYBOARD))
+        candidates = []
+        weapon_data = await self.wiki_service.get_weapons(weapon_name)
+        if not weapon_data:
+            candidates = await self.wiki_service.search_weapons(weapon_name)
+            # 只有一个候选时直接使用 否则让用户选择
+            if len(candidates) == 1:
+                weapon_data = await self.wiki_service.get_weapons(candidates[0])
+        if not weapon_data:
+            text = f"没有找到 {weapon_name}"
+            if candidates:
+                text += f"\n你是不是要找：{'、'.join(candidates)}"
+            reply_message = await message.reply_text(text, reply_markup=InlineKeyboardMarkup(self.KEYBOARD))
             if filters.ChatType.GROUPS.filter(reply_message):
                 self._add_delete_message_job(context, message.chat_id, message.message_id)
                 self._add_delete_message_job(context, reply_message.chat_id, reply_message.message_id)
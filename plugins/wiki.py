@@ -1,7 +1,12 @@
+import time
+
 from telegram import Update
+from telegram.error import TelegramError
 from telegram.ext import CommandHandler, CallbackContext
 
 from app.wiki.service import WikiService
+from logger import Log
+from model.wiki.crawler import CrawlerResult
 from plugins.base import BasePlugins
 from utils.app.inject import inject
 from utils.decorators.admins import bot_admins_rights_check
@@ -26,8 +31,31 @@ class Wiki(BasePlugins):
 
     @bot_admins_rights_check
     @error_callable
-    async def refresh_wiki(self, update: Update, _: CallbackContext):
+    async def refresh_wiki(self, update: Update, context: CallbackContext):
         message = update.message
-        await message.reply_text("正在刷新Wiki缓存，请稍等")
-        await self.wiki_service.refresh_wiki()
-        await message.reply_text("刷新Wiki缓存成功")
+        # /refresh_wiki full 忽略页面指纹 重新解析全部页面
+        force = len(context.args) >= 1 and context.args[0] == "full"
+        reply_message = await message.reply_text("正在刷新Wiki缓存，请稍等")
+        last_edit_time = time.time()
+
+        async def progress(type_name: str, result: CrawlerResult):
+            nonlocal last_edit_time
+            # 编辑消息有频率限制 每5秒最多更新一次
+            if time.time() - last_edit_time < 5 and result.done != result.total:
+                return
+            last_edit_time = time.time()
+            try:
+                await reply_message.edit_text(f"正在刷新Wiki缓存，请稍等\n"
+                                              f"正在获取{type_name}信息 {result.done}/{result.total}")
+            except TelegramError as exc:
+                Log.warning("更新Wiki刷新进度失败", exc)
+
+        report_dict = await self.wiki_service.refresh_wiki(progress, force)
+        text = "刷新Wiki缓存成功"
+        for type_name, report in report_dict.items():
+            text += f"\n{type_name}：新增 {len(report.added)} 个 更新 {len(report.updated)} 个 " \
+                    f"未变化 {report.unchanged} 个 删除 {len(report.removed)} 个 失败 {len(report.crawler.failed)} 个"
+            for title, names in (("新增", report.added), ("更新", report.updated), ("删除", report.removed)):
+                if 0 < len(names) <= 10:
+                    text += f"\n  {title}：{'、'.join(names)}"
+        await message.reply_text(text)
@@ -0,0 +1,18 @@
+import unittest
+from unittest import TestCase
+
+from metadata.shortname import roleToName, weaponToName
+
+
+class TestShortname(TestCase):
+
+    def test_to_name(self):
+        self.assertEqual(roleToName("胡堂主"), "胡桃")
+        self.assertEqual(roleToName("胡桃"), "胡桃")
+        self.assertEqual(roleToName("不存在的角色"), "不存在的角色")
+        self.assertEqual(weaponToName("护摩"), "护摩之杖")
+        self.assertEqual(weaponToName("尘世之锁"), "尘世之锁")
+
+
+if __name__ == "__main__":
+    unittest.main()
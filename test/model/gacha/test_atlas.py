@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+from PIL import Image, ImageChops
+
+from model.gacha.atlas import build_atlas, sprite_style
+
+
+class TestAtlas(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.resources_dir = os.path.join(self.temp_dir.name, "resources")
+        self.output_dir = os.path.join(self.temp_dir.name, "atlas")
+        self.images = {}
+        for dir_name, name, color, size in (("character", "甲", (255, 0, 0, 255), (15, 48)),
+                                            ("character", "乙", (0, 255, 0, 128), (15, 48)),
+                                            ("weapon", "丙", (0, 0, 255, 255), (12, 38))):
+            os.makedirs(os.path.join(self.resources_dir, dir_name), exist_ok=True)
+            image = Image.new("RGBA", size, color)
+            image.save(os.path.join(self.resources_dir, dir_name, f"{name}.png"))
+            self.images[name] = image
+        self.item_types = {"甲": "角色", "乙": "角色", "丙": "武器", "丁": "武器"}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build_atlas(self):
+        manifest = build_atlas(self.resources_dir, self.item_types, self.output_dir)
+        # 没有图片的物品不在图集中
+        self.assertEqual(set(manifest["items"]), {"甲", "乙", "丙"})
+        for name, image in self.images.items():
+            item = manifest["items"][name]
+            sheet = Image.open(manifest["sheets"][item["sheet"]]["path"])
+            crop = sheet.crop((item["x"], item["y"], item["x"] + item["width"], item["y"] + item["height"]))
+            self.assertIsNone(ImageChops.difference(crop, image).getbbox())
+        # 物品不变时直接使用之前的清单
+        self.assertEqual(build_atlas(self.resources_dir, self.item_types, self.output_dir), manifest)
+
+    def test_sprite_style(self):
+        manifest = build_atlas(self.resources_dir, self.item_types, self.output_dir)
+        style = sprite_style(manifest, "丙", width=24)
+        self.assertIn("width: 24.00px; height: 76.00px;", style)
+        self.assertEqual(sprite_style(manifest, "丁", width=24), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
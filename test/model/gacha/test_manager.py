@@ -0,0 +1,86 @@
+import unittest
+from collections import Counter
+from unittest import TestCase
+
+from model.gacha.banner import BannerType, create_banner
+from model.gacha.common import PlayerGachaBannerInfo, lerp, lerp_table
+from model.gacha.manager import GachaManager
+
+
+class TestGachaManager(TestCase):
+
+    def test_lerp(self):
+        points = ((1, 75), (73, 150), (90, 10000))
+        self.assertEqual(lerp(0, points), 75)
+        self.assertEqual(lerp(73, points), 150)
+        # 150 + 9850 * 10 / 17 向零取整
+        self.assertEqual(lerp(83, points), 5944)
+        self.assertEqual(lerp(100, points), 10000)
+        table = lerp_table(points)
+        self.assertEqual(len(table), 91)
+        self.assertEqual([table[x] for x in range(91)], [lerp(x, points) for x in range(91)])
+        self.assertIs(lerp_table(points), table)
+
+    def test_hard_pity(self):
+        banner = create_banner(BannerType.EVENT)
+        banner.rateUpItems5 = ("up",)
+        banner.onLoad()
+        manager = GachaManager(seed=0)
+        banner_info = PlayerGachaBannerInfo()
+        banner_info.pity5 = 89
+        banner_info.pity4 = 9
+        (item, rarity), = manager.doPulls(banner, banner_info, 1)
+        self.assertEqual(rarity, 5)
+        self.assertEqual(banner_info.pity5, 0)
+        # 五星占用了这一抽 四星的保底继续累计
+        self.assertEqual(banner_info.pity4, 10)
+        (_, rarity), = manager.doPulls(banner, banner_info, 1)
+        self.assertEqual(rarity, 4)
+
+    def test_guarantee(self):
+        banner = create_banner(BannerType.EVENT)
+        banner.rateUpItems5 = ("up",)
+        banner.eventChance5 = 0
+        banner.onLoad()
+        manager = GachaManager(seed=0)
+        banner_info = PlayerGachaBannerInfo()
+        items = []
+        for _ in range(4):
+            banner_info.pity5 = 89
+            items.append(manager.doPulls(banner, banner_info, 1)[0][0])
+        self.assertNotEqual(items[0], "up")
+        self.assertEqual(items[1], "up")
+        self.assertNotEqual(items[2], "up")
+        self.assertEqual(items[3], "up")
+
+    def test_epitomized(self):
+        banner = create_banner(BannerType.WEAPON)
+        banner.rateUpItems5 = ("a", "b")
+        banner.eventChance5 = 0
+        banner.onLoad()
+        manager = GachaManager(seed=0)
+        banner_info = PlayerGachaBannerInfo()
+        banner_info.wishItemId = "a"
+        items = []
+        for _ in range(3):
+            banner_info.pity5 = 79
+            items.append(manager.doPulls(banner, banner_info, 1)[0][0])
+        self.assertEqual(items[2], "a")
+        self.assertEqual(banner_info.failedChosenItemPulls, 0)
+
+    def test_distribution(self):
+        banner = create_banner(BannerType.STANDARD)
+        manager = GachaManager(seed=0)
+        manager.addBanner(banner)
+        result = manager.DoPulls(1, banner.gachaType, 100000)
+        rarity = Counter(rarity for _, rarity in result)
+        # 综合概率 五星约 1.6% 四星约 13%
+        self.assertAlmostEqual(rarity[5] / len(result), 0.016, delta=0.003)
+        self.assertAlmostEqual(rarity[4] / len(result), 0.13, delta=0.01)
+        pools = Counter(item in banner.fallbackItems5Pool1 for item, rarity in result if rarity == 5)
+        # 角色池和武器池的数量接近
+        self.assertLess(abs(pools[True] - pools[False]) / sum(pools.values()), 0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
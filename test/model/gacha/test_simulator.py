@@ -0,0 +1,56 @@
+import unittest
+from unittest import TestCase
+
+import numpy as np
+
+from model.gacha.simulator import GachaSimulator, gap_distribution, pity_table
+
+
+# 第10抽必定出现 之前不可能出现
+HARD_PITY_WEIGHTS = ((1, 0), (9, 0), (10, 10000))
+# 与 GachaBanner 默认的 weights5 相同
+SOFT_PITY_WEIGHTS = ((1, 75), (73, 150), (90, 10000))
+
+
+class TestSimulator(TestCase):
+
+    def test_pity_table(self):
+        table = pity_table(SOFT_PITY_WEIGHTS)
+        self.assertEqual(len(table) - 1, 90)
+        self.assertEqual(table[-1], 1)
+        self.assertAlmostEqual(gap_distribution(table).sum(), 1)
+
+    def test_hard_pity(self):
+        simulator = GachaSimulator(HARD_PITY_WEIGHTS, 1, seed=0)
+        result = simulator.simulate(copies=3, trials=1000)
+        self.assertTrue(np.all(result.pulls == 30))
+        result = simulator.simulate(copies=1, pity=4, trials=1000)
+        self.assertTrue(np.all(result.pulls == 6))
+
+    def test_guarantee(self):
+        simulator = GachaSimulator(HARD_PITY_WEIGHTS, 0, seed=0)
+        # 每次都歪 所以每两个五星中有一个是大保底
+        result = simulator.simulate(copies=2, trials=1000)
+        self.assertTrue(np.all(result.pulls == 40))
+        self.assertEqual(result.guaranteed, 2000)
+        result = simulator.simulate(copies=1, guarantee=True, trials=1000)
+        self.assertTrue(np.all(result.pulls == 10))
+
+    def test_fate_points(self):
+        simulator = GachaSimulator(HARD_PITY_WEIGHTS, 0, has_guarantee=False, max_fate_points=2, seed=0)
+        result = simulator.simulate(copies=1, trials=1000)
+        self.assertTrue(np.all(result.pulls == 30))
+        self.assertEqual(result.fate, 1000)
+
+    def test_soft_pity_mean(self):
+        table = pity_table(SOFT_PITY_WEIGHTS)
+        distribution = gap_distribution(table)
+        expected = float((np.arange(len(distribution)) * distribution).sum())
+        simulator = GachaSimulator(SOFT_PITY_WEIGHTS, 1, seed=0)
+        result = simulator.simulate(copies=1, trials=200000)
+        self.assertAlmostEqual(result.mean, expected, delta=0.5)
+        self.assertLessEqual(result.percentiles([100])[100], 90)
+
+
+if __name__ == "__main__":
+    unittest.main()
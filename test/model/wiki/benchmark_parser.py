@@ -0,0 +1,34 @@
+"""测量解析 Wiki 页面的速度
+
+在项目根目录执行 PYTHONPATH=. python test/model/wiki/benchmark_parser.py [次数]
+"""
+import os
+import sys
+import timeit
+
+from model.wiki.characters import parse_characters
+from model.wiki.weapons import parse_weapon_info
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures")
+TEST_WEAPONS_URL = "https://genshin.honeyhunterworld.com/db/weapon/w_3405/?lang=CHS"
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_PATH, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def main(number: int = 200):
+    weapon_html = read_fixture("weapon.html")
+    characters_html = read_fixture("character.html")
+    cases = [
+        ("weapon", lambda: parse_weapon_info(weapon_html, TEST_WEAPONS_URL)),
+        ("characters", lambda: parse_characters(characters_html)),
+    ]
+    for name, func in cases:
+        seconds = timeit.timeit(func, number=number)
+        print(f"{name:<16} {seconds / number * 1000:.3f} ms/page")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,45 @@
+import os
+import unittest
+from unittest import TestCase
+
+from model.wiki.characters import parse_characters
+from model.wiki.weapons import parse_weapon_info
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_PATH, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class TestParser(TestCase):
+    TEST_WEAPONS_URL = "https://genshin.honeyhunterworld.com/db/weapon/w_3405/?lang=CHS"
+
+    def setUp(self):
+        self.weapon_html = read_fixture("weapon.html")
+        self.characters_html = read_fixture("character.html")
+
+    def test_parse_weapon(self):
+        weapon_info = parse_weapon_info(self.weapon_html, self.TEST_WEAPONS_URL)
+        self.assertEqual(weapon_info["id"], 3405)
+        self.assertEqual(weapon_info["name"], "护摩之杖")
+        self.assertEqual(weapon_info["atk"]["min"], 46)
+        self.assertEqual(weapon_info["atk"]["max"], 608)
+        self.assertEqual(weapon_info["secondary"]["name"], "暴击伤害")
+        self.assertEqual(weapon_info["star"]["value"], 5)
+        self.assertEqual(weapon_info["type"]["name"], "Polearm")
+        self.assertEqual(weapon_info["materials"]["ascension"]["name"], "高塔孤王")
+
+    def test_parse_characters(self):
+        characters_info = parse_characters(self.characters_html)
+        self.assertEqual(characters_info["name"], "胡桃")
+        self.assertEqual(characters_info["title"], "雪霁梅香")
+        self.assertEqual(characters_info["rarity"], 5)
+        self.assertEqual(characters_info["allegiance"], "往生堂")
+        self.assertEqual(len(characters_info["constellations"]), 2)
+        self.assertEqual(characters_info["skills"]["skill_q"]["name"], "安神秘法")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from app.cleaner.service import CleanerService
+
+
+class SlowCleanerCache:
+    def __init__(self):
+        self.messages = []
+
+    async def add_many(self, messages):
+        await asyncio.sleep(0.05)
+        self.messages.extend(messages)
+
+
+class TestCleanerService(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = SlowCleanerCache()
+        self.cleaner = CleanerService(self.cache)
+
+    async def test_add_during_flush(self):
+        self.cleaner.add(1, 1)
+        await asyncio.sleep(0.01)
+        # 第一次写入还没有完成时添加的消息
+        self.cleaner.add(1, 2)
+        await asyncio.sleep(0.2)
+        self.assertEqual([message_id for _, message_id, _ in self.cache.messages], [1, 2])
+        self.assertEqual(self.cleaner._pending, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
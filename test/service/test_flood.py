@@ -0,0 +1,42 @@
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from app.flood import FloodCache, FloodService, FloodStatus
+
+
+class TestFloodService(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.flood = FloodService(FloodCache(), max_strikes=3, ban_seconds=60)
+
+    async def test_interval(self):
+        self.assertEqual(await self.flood.check(1, "a", 10), FloodStatus.ALLOWED)
+        self.assertEqual(await self.flood.check(1, "a", 10), FloodStatus.REJECTED)
+        # 不同用户之间互不影响
+        self.assertEqual(await self.flood.check(2, "a", 10), FloodStatus.ALLOWED)
+
+    async def test_command(self):
+        self.assertEqual(await self.flood.check(1, "a", 10), FloodStatus.ALLOWED)
+        # 不同命令分别计算间隔
+        self.assertEqual(await self.flood.check(1, "b", 10), FloodStatus.ALLOWED)
+        self.assertEqual(await self.flood.check(1, "b", 10), FloodStatus.REJECTED)
+        # 被拒绝的次数按用户计算
+        self.assertEqual(await self.flood.check(1, "a", 10), FloodStatus.REJECTED)
+        self.assertEqual(await self.flood.check(1, "b", 10), FloodStatus.JUST_BANNED)
+        self.assertEqual(await self.flood.check(1, "c", 10), FloodStatus.BANNED)
+
+    async def test_burst(self):
+        for _ in range(3):
+            self.assertEqual(await self.flood.check(1, "a", 10, burst=3), FloodStatus.ALLOWED)
+        self.assertEqual(await self.flood.check(1, "a", 10, burst=3), FloodStatus.REJECTED)
+
+    async def test_ban(self):
+        self.assertEqual(await self.flood.check(1, "a", 10), FloodStatus.ALLOWED)
+        self.assertEqual(await self.flood.check(1, "a", 10), FloodStatus.REJECTED)
+        self.assertEqual(await self.flood.check(1, "a", 10), FloodStatus.REJECTED)
+        self.assertEqual(await self.flood.check(1, "a", 10), FloodStatus.JUST_BANNED)
+        self.assertEqual(await self.flood.check(1, "a", 0.001), FloodStatus.BANNED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+from unittest import TestCase
+
+from app.reminder.models import MAX_INTERVAL_SECONDS, RECHECK_SECONDS, RESIN_RECOVERY_SECONDS, Reminder, check_notes
+
+
+def make_notes(current_resin: int, expeditions=()):
+    return SimpleNamespace(
+        current_resin=current_resin, max_resin=160,
+        remaining_resin_recovery_time=datetime.timedelta(seconds=(160 - current_resin) * RESIN_RECOVERY_SECONDS),
+        expeditions=[SimpleNamespace(remaining_time=datetime.timedelta(seconds=seconds)) for seconds in expeditions])
+
+
+class TestCheckNotes(TestCase):
+
+    def test_resin_wakeup(self):
+        reminder = Reminder(1, resin_threshold=150, expedition=False)
+        messages, next_time = check_notes(reminder, make_notes(140), 0)
+        self.assertEqual(messages, [])
+        self.assertEqual(next_time, 10 * RESIN_RECOVERY_SECONDS)
+
+    def test_resin_notify_once(self):
+        reminder = Reminder(1, resin_threshold=150, expedition=False)
+        messages, next_time = check_notes(reminder, make_notes(155), 0)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(next_time, RECHECK_SECONDS)
+        messages, _ = check_notes(reminder, make_notes(156), 0)
+        self.assertEqual(messages, [])
+        # 消耗树脂后重新提醒
+        check_notes(reminder, make_notes(20), 0)
+        messages, _ = check_notes(reminder, make_notes(150), 0)
+        self.assertEqual(len(messages), 1)
+
+    def test_expedition(self):
+        reminder = Reminder(1, resin_threshold=0, expedition=True)
+        messages, next_time = check_notes(reminder, make_notes(0, (0, 3600, 7200)), 0)
+        self.assertEqual(messages, [])
+        self.assertEqual(next_time, 7200)
+        messages, _ = check_notes(reminder, make_notes(0, (0, 0, 0)), 0)
+        self.assertEqual(len(messages), 1)
+
+    def test_max_interval(self):
+        reminder = Reminder(1, resin_threshold=160, expedition=False)
+        _, next_time = check_notes(reminder, make_notes(0), 0)
+        self.assertEqual(next_time, MAX_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest import TestCase
+
+from utils.fuzzy import FuzzyIndex, NameResolver, edit_distance
+
+
+class TestFuzzy(TestCase):
+
+    def setUp(self):
+        self.resolver = NameResolver({"胡桃": "胡桃", "胡堂主": "胡桃", "钟离": "钟离", "护摩之杖": "护摩之杖",
+                                      "天空之刃": "天空之刃", "天空之翼": "天空之翼"})
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("hutao", "hutoa"), 1)
+        self.assertEqual(edit_distance("", "ab"), 2)
+
+    def test_fuzzy_index(self):
+        index = FuzzyIndex(["hutao", "zhongli", "keqing"], 2)
+        self.assertEqual(index.search("hutoa", 1), [(1, "hutao")])
+        self.assertEqual(index.search("zhongl", 1), [(1, "zhongli")])
+        self.assertEqual(index.search("abc", 2), [])
+
+    def test_search(self):
+        self.assertEqual(self.resolver.search("胡堂主"), ["胡桃"])
+        self.assertEqual(self.resolver.search("天空"), ["天空之刃", "天空之翼"])
+        self.assertEqual(self.resolver.search("hutao"), ["胡桃"])
+        self.assertEqual(self.resolver.search("hmzz"), ["护摩之杖"])
+        self.assertEqual(self.resolver.search("护魔之杖"), ["护摩之杖"])
+        self.assertEqual(self.resolver.search("zhongil"), ["钟离"])
+        self.assertEqual(self.resolver.search("不存在"), [])
+        self.assertIsNone(self.resolver.resolve("不存在"))
+
+    def test_exact_alias(self):
+        # "莹" 同时是 "荧" 的同音字 "影" 是 "雷电将军" 的别名
+        resolver = NameResolver({"荧": "荧", "莹": "荧", "雷电将军": "雷电将军", "影": "雷电将军",
+                                 "莹莹": "雷电将军"})
+        self.assertEqual(resolver.search("莹"), ["荧"])
+        self.assertEqual(resolver.search("影"), ["雷电将军"])
+
+
+if __name__ == "__main__":
+    unittest.main()
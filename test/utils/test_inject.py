@@ -0,0 +1,33 @@
+import unittest
+from unittest import TestCase
+
+from utils.app.inject import inject, invalidate_injections
+from utils.app.manager import ServiceDict
+
+
+class InjectTestService:
+    pass
+
+
+class TestInject(TestCase):
+
+    def tearDown(self):
+        ServiceDict.pop(InjectTestService.__name__, None)
+        invalidate_injections()
+
+    def test_invalidate(self):
+        @inject
+        def func(service: InjectTestService = None):
+            return service
+
+        self.assertIsNone(func())
+        service = InjectTestService()
+        ServiceDict[InjectTestService.__name__] = service
+        # 注册服务后需要使之前解析的注入失效
+        self.assertIsNone(func())
+        invalidate_injections()
+        self.assertIs(func(), service)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import time
+import unittest
+from unittest import TestCase
+
+from utils.lru import LRUCache
+
+
+class TestLRUCache(TestCase):
+
+    def test_evict(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        # b 最久没有使用
+        cache.set("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=0.05)
+        cache.set("a", None)
+        # 值为 None 也是命中
+        self.assertIn("a", cache)
+        cache.set("b", 2, ttl=10)
+        time.sleep(0.06)
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.get("a", -1), -1)
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_delete(self):
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.delete("a")
+        cache.delete("b")
+        self.assertNotIn("a", cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from utils.singleflight import SingleFlight
+
+
+class TestSingleFlight(IsolatedAsyncioTestCase):
+
+    async def test_share_result(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        result = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(5)))
+        self.assertEqual(result, [1] * 5)
+        self.assertEqual(len(single_flight), 0)
+        # 结束后再次调用会重新执行
+        self.assertEqual(await single_flight.do("key", fetch), 2)
+
+    async def test_share_exception(self):
+        single_flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("error")
+
+        result = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(3)), return_exceptions=True)
+        self.assertTrue(all(isinstance(item, ValueError) for item in result))
+
+    async def test_cancel(self):
+        single_flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(single_flight.do("key", fetch))
+        second = asyncio.create_task(single_flight.do("key", fetch))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        self.assertEqual(await second, "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
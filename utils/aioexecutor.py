@@ -0,0 +1,55 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Optional
+
+from logger import Log
+from model.types import Func
+
+
+class AioExecutor:
+    def __init__(self, max_workers: Optional[int] = None):
+        self._thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PaimonExecutor")
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        try:
+            Log.info("正在尝试创建进程池")
+            # 使用 spawn 避免 fork 时复制事件循环和其他线程持有的锁
+            self._process_pool = ProcessPoolExecutor(max_workers=max_workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            Log.info("创建进程池成功")
+        except (NotImplementedError, ImportError, OSError) as exc:
+            Log.warning("创建进程池失败 CPU密集任务将退回线程池执行", exc)
+
+    @property
+    def executor(self) -> Executor:
+        """用于传给 run_in_executor 的执行器 进程池不可用时为线程池"""
+        if self._process_pool is not None:
+            return self._process_pool
+        return self._thread_pool
+
+    async def run(self, func: Func, *args, **kwargs):
+        """在进程池中执行CPU密集任务 进程池不可用时退回线程池
+
+        func 和参数都必须可以被 pickle 所以 func 需要是模块级别的函数
+        """
+        if self._process_pool is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._process_pool, partial(func, *args, **kwargs))
+            except BrokenProcessPool as exc:
+                Log.warning("进程池已损坏 CPU密集任务将退回线程池执行", exc)
+                self._process_pool.shutdown(wait=False)
+                self._process_pool = None
+        return await self.run_in_thread(func, *args, **kwargs)
+
+    async def run_in_thread(self, func: Func, *args, **kwargs):
+        """在线程池中执行会阻塞的任务"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._thread_pool, partial(func, *args, **kwargs))
+
+    async def close(self):
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
@@ -1,13 +1,24 @@
 import inspect
 from functools import wraps
+from typing import Dict, List, Tuple
 
 from logger import Log
 from model.types import Func
 from utils.app.manager import ServiceDict
 
+# ServiceDict 变化时加一 被修饰的函数据此判断之前解析的注入是否失效
+_injections_version = 0
 
-def get_injections(func: Func):
-    injections = {}
+
+def invalidate_injections():
+    """服务注册或重新加载后调用 被修饰的函数下一次调用时重新解析注入"""
+    global _injections_version
+    _injections_version += 1
+
+
+def get_parameters(func: Func) -> List[Tuple[str, str]]:
+    """:return: (参数名称, 注解的类名) 没有注解或注解不是类的参数不会出现"""
+    parameters = []
     try:
         signature = inspect.signature(func)
     except ValueError as exception:
@@ -19,27 +30,44 @@ def get_injections(func: Func):
             raise exception
     else:
         for parameter_name, parameter in signature.parameters.items():
-            annotation = parameter.annotation
-            class_name = annotation.__name__
-            param = ServiceDict.get(class_name)
-            if param is not None:
-                injections.setdefault(parameter_name, param)
+            class_name = getattr(parameter.annotation, "__name__", None)
+            if class_name is not None:
+                parameters.append((parameter_name, class_name))
+    return parameters
+
+
+def _resolve(parameters: List[Tuple[str, str]]) -> Dict[str, object]:
+    injections = {}
+    for parameter_name, class_name in parameters:
+        param = ServiceDict.get(class_name)
+        if param is not None:
+            injections.setdefault(parameter_name, param)
     return injections
 
 
+def get_injections(func: Func):
+    return _resolve(get_parameters(func))
+
+
 def inject(func: Func) -> Func:
-    """依赖注入"""
+    """依赖注入 函数签名只在修饰时解析一次 注入的服务在服务变化前只查找一次"""
+    parameters = get_parameters(func)
+    resolved = {"version": -1, "injections": {}}
+
+    def get_resolved() -> Dict[str, object]:
+        if resolved["version"] != _injections_version:
+            resolved["injections"] = _resolve(parameters)
+            resolved["version"] = _injections_version
+        return resolved["injections"]
 
     @wraps(func)
     async def async_decorator(*args, **kwargs):
-        injections = get_injections(func)
-        kwargs.update(injections)
+        kwargs.update(get_resolved())
         return await func(*args, **kwargs)
 
     @wraps(func)
     def sync_decorator(*args, **kwargs):
-        injections = get_injections(func)
-        kwargs.update(injections)
+        kwargs.update(get_resolved())
         return func(*args, **kwargs)
 
     if inspect.iscoroutinefunction(func):
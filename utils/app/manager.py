@@ -7,6 +7,7 @@ from typing import List, Union, Dict
 from logger import Log
 from model.types import Func
 from utils.aiobrowser import AioBrowser
+from utils.aioexecutor import AioExecutor
 from utils.mysql import MySQL
 from utils.redisdb import RedisDB
 
@@ -27,7 +28,8 @@ def listener_service():
 
 
 class AppsManager:
-    def __init__(self, mysql: MySQL, redis: RedisDB, browser: AioBrowser):
+    def __init__(self, mysql: MySQL, redis: RedisDB, browser: AioBrowser, executor: AioExecutor):
+        self.executor = executor
         self.browser = browser
         self.redis = redis
         self.mysql = mysql
@@ -88,6 +90,8 @@ class AppsManager:
                             kwargs[parameter_name] = self.redis
                         if issubclass(annotation, AioBrowser):
                             kwargs[parameter_name] = self.browser
+                        if issubclass(annotation, AioExecutor):
+                            kwargs[parameter_name] = self.executor
                 try:
                     handlers_list = func(**kwargs)
                     class_name = handlers_list.__class__.__name__
@@ -96,3 +100,6 @@ class AppsManager:
                     Log.error("初始化Service失败", exc)
                 finally:
                     pass
+        # inject 依赖 ServiceDict 在这里导入避免循环导入
+        from utils.app.inject import invalidate_injections
+        invalidate_injections()
@@ -0,0 +1,52 @@
+import hashlib
+from typing import Callable, Hashable, Tuple
+
+import genshin
+import ujson
+from genshin import Client
+
+from utils.lru import LRUCache
+
+ClientKey = Tuple[int, Hashable, str]
+
+
+def cookies_hash(cookies: dict) -> str:
+    """Cookie 变化后使用新的客户端"""
+    return hashlib.sha1(ujson.dumps(cookies, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class GenshinClientPool:
+    """按 (用户ID, 服务器, Cookie哈希) 复用 genshin.Client
+
+    同一个用户的多次命令使用同一个客户端 可以共享客户端内部的缓存
+    超过 idle_timeout 秒没有使用的客户端会被丢弃 最多保存 maxsize 个客户端
+    """
+
+    def __init__(self, maxsize: int = 512, idle_timeout: float = 1800, cache_ttl: int = 300,
+                 cache_maxsize: int = 64):
+        """
+        :param cache_ttl: 客户端内部响应缓存的时间 需要比较短 避免查询到过期的实时数据
+        :param cache_maxsize: 每个客户端内部最多缓存的响应数量
+        """
+        self._clients: LRUCache[Client] = LRUCache(maxsize=maxsize, ttl=idle_timeout)
+        self.cache_ttl = cache_ttl
+        self.cache_maxsize = cache_maxsize
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def get(self, user_id: int, region: Hashable, cookies: dict, factory: Callable[[], Client]) -> Client:
+        """
+        :param user_id: 用户ID
+        :param region: 服务器
+        :param cookies: 用户的 Cookie
+        :param factory: 没有可以复用的客户端时用于创建客户端
+        """
+        key: ClientKey = (user_id, region, cookies_hash(cookies))
+        client = self._clients.get(key)
+        if client is None:
+            client = factory()
+            client.set_cache(self.cache_maxsize, ttl=self.cache_ttl, static_ttl=genshin.client.cache.DAY)
+        # 每次使用后重新计算空闲时间
+        self._clients.set(key, client)
+        return client
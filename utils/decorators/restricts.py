@@ -1,16 +1,35 @@
-import time
 from functools import wraps
-from typing import Callable
+from typing import Callable, Optional, Tuple
 
 from telegram import Update
 from telegram.error import TelegramError
 from telegram.ext import filters, CallbackContext
 
+from app.flood import FloodCache, FloodService, FloodStatus
 from logger import Log
+from utils.app.inject import inject
+
+# 没有 Redis 时只在当前进程内限制
+_local_flood_service = FloodService(FloodCache())
+
+
+@inject
+async def _check_flood(user_id: int, command: str, interval: float,
+                       flood_service: FloodService = None) -> Tuple[FloodStatus, int]:
+    """:return: (状态, 封禁的秒数)"""
+    if flood_service is None:
+        flood_service = _local_flood_service
+    return await flood_service.check(user_id, command, interval), flood_service.ban_seconds
+
+
+def _format_seconds(seconds: int) -> str:
+    if seconds % 60 == 0:
+        return f"{seconds // 60}分钟"
+    return f"{seconds}秒"
 
 
 def restricts(filters_chat: filters = filters.ALL, return_data=None, try_delete_message: bool = False,
-              restricts_time: int = 5):
+              restricts_time: int = 5, private_restricts_time: Optional[int] = None):
     """用于装饰在指定函数预防洪水攻击的装饰器
 
     被修饰的函数生声明必须为
@@ -31,7 +50,8 @@ def restricts(filters_chat: filters = filters.ALL, return_data=None, try_delete_
     :param filters_chat: 要限制的群
     :param return_data:
     :param try_delete_message:
-    :param restricts_time:
+    :param restricts_time: 两次使用之间的秒数
+    :param private_restricts_time: 私聊中两次使用之间的秒数 为空时与 restricts_time 相同
     :return: return_data
     """
 
@@ -49,38 +69,27 @@ def restricts(filters_chat: filters = filters.ALL, return_data=None, try_delete_
             message = update.message
             user = update.effective_user
             if filters_chat.filter(message):
-                command_time = context.user_data.get("command_time", 0)
-                count = context.user_data.get("usage_count", 0)
-                restrict_since = context.user_data.get("restrict_since", 0)
-                # 洪水防御
-                if restrict_since:
-                    if (time.time() - restrict_since) >= 60 * 5:
-                        del context.user_data["restrict_since"]
-                        del context.user_data["usage_count"]
-                    else:
-                        return return_data
+                if filters.ChatType.PRIVATE.filter(message) and private_restricts_time is not None:
+                    interval = private_restricts_time
                 else:
-                    if count == 5:
-                        context.user_data["restrict_since"] = time.time()
-                        await update.effective_message.reply_text("你已经触发洪水防御，请等待5分钟")
-                        Log.warning(f"用户 {user.full_name}[{user.id}] 触发洪水限制 已被限制5分钟")
-                        return return_data
-                # 单次使用限制
-                if command_time:
-                    if (time.time() - command_time) <= restricts_time:
-                        context.user_data["usage_count"] = count + 1
-                        if filters.ChatType.GROUPS.filter(message):
-                            if try_delete_message:
-                                try:
-                                    await message.delete()
-                                except TelegramError as error:
-                                    Log.warning("删除消息失败", error)
-                            return return_data
-                    else:
-                        if count >= 1:
-                            context.user_data["usage_count"] = count - 1
-
-                context.user_data["command_time"] = time.time()
+                    interval = restricts_time
+                status, ban_seconds = await _check_flood(user.id, func.__qualname__, interval)
+                # 洪水防御
+                if status == FloodStatus.BANNED:
+                    return return_data
+                if status == FloodStatus.JUST_BANNED:
+                    ban_time = _format_seconds(ban_seconds)
+                    await update.effective_message.reply_text(f"你已经触发洪水防御，请等待{ban_time}")
+                    Log.warning(f"用户 {user.full_name}[{user.id}] 触发洪水限制 已被限制{ban_time}")
+                    return return_data
+                # 单次使用限制 私聊中只记录次数
+                if status == FloodStatus.REJECTED and filters.ChatType.GROUPS.filter(message):
+                    if try_delete_message:
+                        try:
+                            await message.delete()
+                        except TelegramError as error:
+                            Log.warning("删除消息失败", error)
+                    return return_data
 
             return await func(*args, **kwargs)
 
@@ -0,0 +1,162 @@
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pypinyin import Style, lazy_pinyin
+
+
+def edit_distance(a: str, b: str) -> int:
+    """编辑距离 相邻两个字符交换也算一次编辑 输入时很常见"""
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current.append(value)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """删除最多 max_distance 个字符后能得到的所有字符串 包括原字符串"""
+    result = {word}
+    current = {word}
+    for _ in range(max_distance):
+        current = {item[:i] + item[i + 1:] for item in current for i in range(len(item))}
+        result |= current
+    return result
+
+
+class FuzzyIndex:
+    """对称删除索引 预先保存每个单词删除字符后的结果
+
+    编辑距离不超过 d 的两个单词 各自删除最多 d 个字符后一定有相同的结果
+    查询时只需要对少量候选计算编辑距离
+    """
+
+    def __init__(self, words: Iterable[str], max_distance: int = 2):
+        self.max_distance = max_distance
+        self._deletes: Dict[str, Set[str]] = {}
+        for word in words:
+            for item in _deletes(word, max_distance):
+                self._deletes.setdefault(item, set()).add(word)
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """返回编辑距离不超过 max_distance 的单词 按距离排序"""
+        max_distance = min(max_distance, self.max_distance)
+        candidates: Set[str] = set()
+        for item in _deletes(word, max_distance):
+            candidates |= self._deletes.get(item, set())
+        result = []
+        for candidate in candidates:
+            distance = edit_distance(word, candidate)
+            if distance <= max_distance:
+                result.append((distance, candidate))
+        result.sort()
+        return result
+
+
+@lru_cache(maxsize=1024)
+def to_pinyin(text: str) -> Tuple[str, str]:
+    """返回 (全拼, 首字母) 非汉字原样保留"""
+    full = lazy_pinyin(text)
+    initials = lazy_pinyin(text, style=Style.FIRST_LETTER)
+    return "".join(full).lower(), "".join(initials).lower()
+
+
+class NameResolver:
+    """名称解析 依次尝试 精确匹配 前缀 拼音和首字母 编辑距离
+
+    所有索引在创建时建立 查询时不需要遍历全部名称
+    """
+
+    def __init__(self, names: Dict[str, str]):
+        """
+        :param names: 名称或别名 -> 正式名称
+        """
+        self._names = {self._normalize(key): value for key, value in names.items()}
+        self._sorted_keys = sorted(self._names)
+        self._pinyin: Dict[str, Set[str]] = {}
+        for key, value in self._names.items():
+            for pinyin in to_pinyin(key):
+                self._pinyin.setdefault(pinyin, set()).add(value)
+        self._sorted_pinyin = sorted(self._pinyin)
+        self._index = FuzzyIndex(self._names, 2)
+        # 拼音比较长 只允许一个字母的错误 避免索引太大
+        self._pinyin_index = FuzzyIndex(self._pinyin, 1)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return text.strip().lower().replace(" ", "")
+
+    @staticmethod
+    def _prefix(sorted_keys: List[str], prefix: str) -> Iterable[str]:
+        index = bisect_left(sorted_keys, prefix)
+        while index < len(sorted_keys) and sorted_keys[index].startswith(prefix):
+            yield sorted_keys[index]
+            index += 1
+
+    @staticmethod
+    def _max_distance(text: str) -> int:
+        # 名称大多很短 距离太大时几乎所有名称都会匹配 汉字的信息量比拼音字母大
+        if text.isascii():
+            return 0 if len(text) < 4 else 1
+        return 0 if len(text) <= 2 else 1 if len(text) <= 5 else 2
+
+    def get(self, name: str) -> Optional[str]:
+        """精确匹配名称或别名"""
+        return self._names.get(self._normalize(name))
+
+    def search(self, name: str, limit: int = 5) -> List[str]:
+        """
+        :param name: 用户输入的名称
+        :param limit: 最多返回的候选数量
+        :return: 按可信程度排序的正式名称 精确匹配名称或别名时只返回该名称
+        """
+        query = self._normalize(name)
+        if not query:
+            return []
+        result: List[str] = []
+
+        def extend(values: Iterable[str]) -> bool:
+            for value in values:
+                if value not in result:
+                    result.append(value)
+                    if len(result) >= limit:
+                        return True
+            return False
+
+        # 精确匹配别名时不再查找其他候选 否则 "莹" 这类同时是其他名称前缀或同音字的别名会有多个候选
+        if query in self._names:
+            return [self._names[query]]
+        if extend(self._names[key] for key in self._prefix(self._sorted_keys, query)):
+            return result
+        full, initials = to_pinyin(query)
+        # 同音字和拼音输入
+        if extend(sorted(self._pinyin.get(full, ()))):
+            return result
+        if full.isascii() and len(full) >= 2:
+            for key in self._prefix(self._sorted_pinyin, full):
+                if extend(sorted(self._pinyin[key])):
+                    return result
+        if result:
+            return result
+        # 前面都没有结果时才按编辑距离查找 避免给出不相关的候选
+        max_distance = self._max_distance(query)
+        if max_distance and extend(self._names[key] for _, key in self._index.search(query, max_distance)):
+            return result
+        max_distance = self._max_distance(full)
+        if not result and max_distance:
+            for _, key in self._pinyin_index.search(full, max_distance):
+                if extend(sorted(self._pinyin[key])):
+                    return result
+        return result
+
+    def resolve(self, name: str) -> Optional[str]:
+        """返回最可能的正式名称 找不到时返回 None"""
+        result = self.search(name, 1)
+        return result[0] if result else None
@@ -12,6 +12,7 @@ from app.cookies.service import CookiesService
 from app.user import UserService
 from logger import Log
 from model.base import RegionEnum
+from utils.clientpool import GenshinClientPool
 
 USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) " \
                   "Chrome/90.0.4430.72 Safari/537.36"
@@ -31,6 +32,8 @@ REGION_MAP = {
     "9": RegionEnum.HOYOLAB,
 }
 
+client_pool = GenshinClientPool()
+
 
 def sha1(text: str) -> str:
     _sha1 = hashlib.sha1()
@@ -60,21 +63,30 @@ async def url_to_file(url: str, prefix: str = "file://") -> str:
     return prefix + file_dir
 
 
+def create_genshin_client(region: RegionEnum, cookies: dict, uid: int) -> Client:
+    if region == RegionEnum.HYPERION:
+        return genshin.Client(cookies=cookies, game=types.Game.GENSHIN, region=types.Region.CHINESE, uid=uid)
+    if region == RegionEnum.HOYOLAB:
+        return genshin.Client(cookies=cookies, game=types.Game.GENSHIN, region=types.Region.OVERSEAS, lang="zh-cn",
+                              uid=uid)
+    raise TypeError(f"region is not RegionEnum.NULL")
+
+
 async def get_genshin_client(user_id: int, user_service: UserService, cookies_service: CookiesService,
                              region: RegionEnum = RegionEnum.NULL) -> Client:
     user = await user_service.get_user_by_id(user_id)
-    cookies = await cookies_service.get_cookies(user_id, region)
-    if region is None:
+    if region == RegionEnum.NULL:
         region = user.region
+    cookies = await cookies_service.read_cookies(user_id, region)
     if region == RegionEnum.HYPERION:
         uid = user.yuanshen_game_uid
-        client = genshin.Client(cookies=cookies, game=types.Game.GENSHIN, region=types.Region.CHINESE, uid=uid)
     elif region == RegionEnum.HOYOLAB:
         uid = user.genshin_game_uid
-        client = genshin.Client(cookies=cookies,
-                                game=types.Game.GENSHIN, region=types.Region.OVERSEAS, lang="zh-cn", uid=uid)
     else:
         raise TypeError(f"region is not RegionEnum.NULL")
+    client = client_pool.get(user_id, region, cookies, lambda: create_genshin_client(region, cookies, uid))
+    # 复用的客户端可能是绑定其他UID时创建的
+    client.uid = uid
     return client
 
 
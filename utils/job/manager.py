@@ -6,7 +6,7 @@ from typing import List, Union
 
 from telegram.ext import Application
 
-from jobs.base import RunDailyHandler
+from jobs.base import RunDailyHandler, RunRepeatingHandler
 from logger import Log
 
 JobsClass: List[object] = []
@@ -72,6 +72,9 @@ class JobsManager:
                         if isinstance(handler, RunDailyHandler):
                             application.job_queue.run_daily(**handler.get_kwargs)
                             Log.info(f"添加每日Job成功 Job名称[{handler.name}] Job每日执行时间[{handler.time.isoformat()}]")
+                        elif isinstance(handler, RunRepeatingHandler):
+                            application.job_queue.run_repeating(**handler.get_kwargs)
+                            Log.info(f"添加重复Job成功 Job名称[{handler.name}] Job执行间隔[{handler.interval}]")
                 except AttributeError as exc:
                     if "build_jobs" in str(exc):
                         Log.error("build_jobs 函数未找到", exc)
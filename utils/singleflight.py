@@ -0,0 +1,29 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """合并相同的并发请求 同一个 key 同时只执行一次 所有调用方共享结果或异常
+
+    执行结束后立即移除 之后的调用会重新执行 需要缓存结果时应在外层缓存
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        :param key: 相同的 key 视为相同的请求
+        :param func: 没有正在执行的请求时调用 返回协程
+        :return: func 返回的协程的结果
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # 某个调用方被取消时不影响其他调用方
+        return await asyncio.shield(task)